@@ -1,30 +1,24 @@
-import time
+from py_amo.services.dedup import DuplicateFinder, SQLiteDedupIndex
 
 
 async def find_doubles_by_phone_number(session):
-    accounts_count = await session.contacts.count()
-    accounts = await session.contacts.get_all(limit=accounts_count)
-    phones: dict[str, list] = {}
-    for account in accounts:
-        try:
-            for cf in account.custom_fields_values:
-                if cf.field_name == "Телефон":
-                    phone = cf.values[0].value
-                    phone = (
-                        phone.replace("+", "")
-                        .replace("-", "")
-                        .replace(" ", "")
-                        .replace("(", "")
-                        .replace(")", "")[1:]
-                    )
-                    if phones.get(phone) is None:
-                        phones[phone] = [account]
-                    else:
-                        phones[phone].append(account)
-        except:
-            pass
-    doubles = {}
-    for phone, accounts in phones.items():
-        if len(accounts) > 1:
-            doubles[phone] = accounts
-    return doubles
+    """
+    Кластеры дублей контактов по телефону и email. ascan отдает кластер при каждом его изменении
+    (кластеры могут сливаться), поэтому итог берется из finder.clusters() после обхода
+    """
+    finder = DuplicateFinder()
+    async for _ in finder.ascan(session.contacts):
+        pass
+    return finder.clusters()
+
+
+async def find_doubles_large_account(session, index_path: str = "doubles.db"):
+    """Для очень больших аккаунтов индекс хранится на диске, кластеры обрабатываются по мере появления"""
+    index = SQLiteDedupIndex(index_path)
+    finder = DuplicateFinder(index=index, name_similarity=0.9)
+    try:
+        async for cluster in finder.ascan(session.contacts):
+            print(cluster.ids, cluster.keys)
+    finally:
+        index.close()
+    return finder.clusters()
@@ -16,5 +16,15 @@ from .exceptions import (
     UnsupportedOperationError
 )
 from .services.filters import FilterBuilder, create_filter
+from .services.rate_limiter import RateLimiter
+from .services.retry import RetryPolicy
+from .services.sync import SyncCursor, CursorStore, MemoryCursorStore, FileCursorStore, SQLiteCursorStore
+from .services.mirror import SQLiteMirror
+from .services.cache import ResponseCache, CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from .services.dedup import DuplicateFinder, MemoryDedupIndex, SQLiteDedupIndex
+from .services.export import ColumnarExport, ParquetExportWriter
+from .services.export_job import ExportJob, ExportSink, JSONLSink, ParquetSink, CallbackSink
+from .services.multi_account import MultiAccountExecutor
+from .services.analytics import LeadsAnalytics
 
 __version__ = "0.2.0"
@@ -5,4 +5,7 @@ from .pipelines_async_repository import PipelinesAsyncRepository
 from .users_async_repository import UsersAsyncRepository
 from .sources_async_repository import SourcesAsyncRepository
 from .statuses_async_repository import PipelineStatusesAsyncRepository
-from .companies_async_repository import CompaniesAsyncRepository
\ No newline at end of file
+from .companies_async_repository import CompaniesAsyncRepository
+from .tasks_async_repository import TasksAsyncRepository
+from .notes_async_repository import NotesAsyncRepository
+from .events_async_repository import EventsAsyncRepository
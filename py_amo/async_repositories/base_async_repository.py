@@ -1,21 +1,44 @@
-from typing import TypeVar, Generic, Optional, List, Dict, Any
+from typing import TypeVar, Generic, Optional, List, Dict, Any, AsyncIterator, Tuple, Union
+from datetime import datetime
 from py_amo.schemas.entity_link_schema import EntityLinksSchema
 from py_amo.schemas.created_entity_schema import CreatedEntity
+from py_amo.schemas.bulk_result_schema import BulkResult, BulkChunkResult, BulkEntityError
+from py_amo.schemas.ids_result_schema import IdsResult
 from py_amo.services.filters import with_kwargs_filter
+from py_amo.services.retry import send_request_async
+from py_amo.services.pagination import is_last_page, plan_last_page
+from py_amo.services.sync import CursorStore, SyncCursor
+from py_amo.services.parsing import construct, loads, parse_page
+from py_amo.services.export import ColumnarExport, ParquetExportWriter
+from py_amo.services.export_job import ExportJob, ExportSink
+from py_amo.services.single_flight import AsyncSingleFlight
+from py_amo.services.slicing import TimeSlicer, Window
+from py_amo.services.loader import AsyncBatchLoader
 from py_amo.exceptions import (
+    PyAmoException,
     EntityNotFoundError,
     get_exception_from_status_code,
     UnsupportedOperationError
 )
+from py_amo.utils.chunks import chunked, chunked_by_length
+from py_amo.utils.date_utils import now_timestamp, to_timestamp
+from urllib.parse import quote
 import json
 import httpx
-from py_amo.utils.async_utils import repository_safe_request
 import asyncio
 
 T = TypeVar("T")
 
 
 class BaseAsyncRepository(Generic[T]):
+
+    MAX_LIMIT = 250
+    BATCH_LIMIT = 250
+    MAX_QUERY_LENGTH = 6000  # Запас до ~8 КБ, которые обычно пропускают прокси и серверы на URL
+    CACHE_DEPENDENTS = ()  # Типы, кэш которых тоже сбрасывается при изменении сущностей репозитория
+    EXPORT_COLUMNS = ("id", "name", "responsible_user_id", "created_at", "updated_at")  # Колонки выгрузки по умолчанию
+    SYNC_FIELD = "updated_at"  # Поле отметки инкрементальной синхронизации (iter_changes)
+
     def __init__(self, session):
         """
         session - AmoSession
@@ -27,6 +50,13 @@ class BaseAsyncRepository(Generic[T]):
         self.schema_input_class = self.SCHEMA_INPUT_CLASS
         self.subdomain = session.get_subdomain()
         self.amo_session = session
+        self.rate_limiter = session.rate_limiter
+        self.retry_policy = session.retry_policy
+        self.cache = session.cache
+        self.trusted = session.trusted
+        self.parse_executor = session.parse_executor
+        self._in_flight = AsyncSingleFlight()
+        self._loaders: Dict[str, AsyncBatchLoader] = {}
 
     def get_base_url(self) -> str:
         return self.base_url
@@ -34,6 +64,10 @@ class BaseAsyncRepository(Generic[T]):
     def get_entity_type(self) -> str:
         return self.entity_type
 
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Все запросы репозитория проходят через общий лимитер и политику повторов сессии"""
+        return await send_request_async(self.session, self.rate_limiter, self.retry_policy, method, url, **kwargs)
+
     async def _handle_response_error(self, response: httpx.Response, operation: str = "API request"):
         """Обработка ошибок HTTP ответов"""
         if response.status_code >= 400:
@@ -41,8 +75,12 @@ class BaseAsyncRepository(Generic[T]):
                 error_data = response.json()
             except (ValueError, json.JSONDecodeError):
                 error_data = {"detail": response.text}
-            
-            message = error_data.get("detail", f"{operation} failed")
+            if not isinstance(error_data, dict):
+                error_data = {"detail": str(error_data)}
+            # Пустое или не-JSON тело (502 от балансировщика и т.п.) - сообщение из статуса
+            message = error_data.get("detail") or error_data.get("title") or (
+                f"{operation} failed: HTTP {response.status_code} {response.reason_phrase or ''}".rstrip()
+            )
             raise get_exception_from_status_code(response.status_code, message, error_data)
 
     async def count(self, **kwargs) -> int:
@@ -50,7 +88,7 @@ class BaseAsyncRepository(Generic[T]):
         params = kwargs.copy()
         params["limit"] = 1
         
-        response = await self.session.get(self.get_base_url(), params=params)
+        response = await self._request("GET", self.get_base_url(), params=params)
         if response.status_code >= 400:
             await self._handle_response_error(response, "Count operation")
         
@@ -60,74 +98,357 @@ class BaseAsyncRepository(Generic[T]):
     async def exists(self, entity_id: int) -> bool:
         """Проверить существование сущности по ID"""
         url = f"{self.get_base_url()}/{entity_id}"
-        response = await self.session.head(url)
+        response = await self._request("HEAD", url)
         return response.status_code == 200
 
+    async def _get_json(
+        self, url: str, params: Dict[str, Any], operation: str, not_found_ok: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        GET-запрос через read-through кэш сессии: сущности с ttl в session.cache
+        (справочники) берутся из кэша, пока запись не устарела.
+        204 - пустой словарь, 404 при not_found_ok - None (не кэшируется).
+
+        Одинаковые (url и params) одновременные запросы объединяются: HTTP-запрос уходит один,
+        остальные вызовы ждут его и получают тот же ответ.
+        """
+        ttl = self.cache.get_ttl(self.entity_type)
+        key = self.cache.make_key(self.subdomain, self.entity_type, url, params)
+        if ttl and (data := self.cache.get(key)) is not None:
+            return data
+
+        async def fetch() -> Optional[Dict[str, Any]]:
+            response = await self._request("GET", url, params=params)
+            if response.status_code == 404 and not_found_ok:
+                return None
+            if response.status_code == 204:
+                data = {}
+            else:
+                if response.status_code >= 400:
+                    await self._handle_response_error(response, operation)
+                data = loads(response.content)
+            if ttl:
+                self.cache.set(key, data, ttl)
+            return data
+
+        return await self._in_flight.do(f"{key}#{not_found_ok}", fetch)
+
+    def _invalidate_cache(self):
+        """Сбросить кэш типа сущностей репозитория и зависимых от него типов"""
+        for entity_type in (self.entity_type, *self.CACHE_DEPENDENTS):
+            if self.cache.get_ttl(entity_type):
+                self.cache.invalidate(self.subdomain, entity_type)
+
+    async def _get_page(self, params: Dict[str, Any], operation: str = "Get all entities") -> Dict[str, Any]:
+        """Запросить одну страницу коллекции. Пустая коллекция (204) - пустой словарь"""
+        return await self._get_json(self.get_base_url(), params, operation)
+
+    def _build(self, item: Dict[str, Any]) -> T:
+        """Схема из данных ответа. В режиме trusted - без валидации (см. parsing.construct)"""
+        if self.trusted:
+            return construct(self.schema_class, item)
+        return self.schema_class(**item)
+
+    def _parse_entities(self, data: Dict[str, Any], raw: bool = False) -> List[T]:
+        row_entities = data.get("_embedded", {}).get(self.get_entity_type(), [])
+        if raw:
+            return row_entities
+        return [self._build(item) for item in row_entities]
+
+    async def _get_entities(
+        self, params: Dict[str, Any], raw: bool = False, operation: str = "Get all entities"
+    ) -> Tuple[Dict[str, Any], List[T]]:
+        """
+        Страница коллекции и ее сущности. Данные страницы нужны для _links/_page (is_last_page).
+
+        С parse_executor разбор JSON и сборка схем страницы выполняются в этом пуле (parsing.parse_page),
+        цикл событий в это время только отправляет запросы и получает ответы.
+        Данные страницы тогда приходят без _embedded. Справочники с кэшем разбираются как обычно.
+        """
+        if self.parse_executor is None or self.cache.get_ttl(self.entity_type):
+            data = await self._get_page(params, operation)
+            return data, self._parse_entities(data, raw)
+        response = await self._request("GET", self.get_base_url(), params=params)
+        if response.status_code == 204:
+            return {}, []
+        if response.status_code >= 400:
+            await self._handle_response_error(response, operation)
+        schema_class = None if raw else self.schema_class
+        return await asyncio.get_running_loop().run_in_executor(
+            self.parse_executor, parse_page, response.content, self.entity_type, schema_class, self.trusted
+        )
+
+    async def _get_all_planned(
+        self, limit: int, first_page: int, params: Dict[str, Any], raw: bool = False
+    ) -> List[T]:
+        """
+        Загрузить до limit сущностей, начиная с first_page.
+
+        Сначала запрашивается первая страница. Если по ее метаданным известно общее кол-во страниц,
+        оставшиеся существующие страницы запрашиваются разом. Иначе - волнами по burst лимитера,
+        до первой пустой или неполной страницы, чтобы не тратить запросы на несуществующие страницы.
+        Темп запросов держит общий лимитер сессии.
+        """
+
+        def fetch(page: int):
+            return self._get_entities({**params, "page": page, "limit": self.MAX_LIMIT}, raw)
+
+        data, entities = await fetch(first_page)
+        if is_last_page(data, len(entities), self.MAX_LIMIT):
+            return entities[:limit]
+
+        last_page, exact = plan_last_page(data, first_page, limit, self.MAX_LIMIT)
+        wave_size = max(last_page - first_page, 1) if exact else max(int(self.rate_limiter.burst), 1)
+        page = first_page + 1
+        while page <= last_page:
+            wave = range(page, min(page + wave_size, last_page + 1))
+            for data, page_entities in await asyncio.gather(*(fetch(wave_page) for wave_page in wave)):
+                entities += page_entities
+                if is_last_page(data, len(page_entities), self.MAX_LIMIT):
+                    return entities[:limit]
+            page = wave.stop
+        return entities[:limit]
+
     @with_kwargs_filter
-    async def get_all(self, **kwargs) -> List[T]:
+    async def get_all(self, raw: bool = False, **kwargs) -> List[T]:
         """
         kwargs:
         - limit: int
         - with_: str (Смотреть в документации)
         - offset: int
+        - raw: bool - вернуть словари из ответа как есть, без схем
+
+        Если limit больше 250, после первой страницы остальные запрашиваются параллельно -
+        только те, что реально существуют (см. _get_all_planned).
         """
+        if (limit := kwargs.get("limit", 0)) > self.MAX_LIMIT:
+            kwargs.pop("limit")
+            first_page = kwargs.pop("page", 1)
+            return await self._get_all_planned(limit, first_page, kwargs, raw)
 
-        if (limit := kwargs.get("limit", 0)) > 250:
+        return (await self._get_entities(kwargs, raw))[1]
 
-            def divide_number(number, max_value):
-                parts = []
-                while number > 0:
-                    part = min(max_value, number)
-                    parts.append(part)
-                    number -= part
-                return parts
+    @with_kwargs_filter
+    async def aiter_pages(self, raw: bool = False, **kwargs) -> AsyncIterator[List[T]]:
+        """
+        Постранично обходит коллекцию, пока в ответе есть _links.next.
+        Каждая страница отдается сразу после получения, в памяти держится только она.
 
-            kwargs.pop("limit")
-            semaphore = asyncio.Semaphore(7)
-            result = await asyncio.gather(
-                *(
-                    repository_safe_request(
-                        self.get_all, semaphore, i, **kwargs, page=i+1, limit=chunk_limit
-                    )
-                    for i, chunk_limit in enumerate(divide_number(limit, 250))
-                )
-            )
-            entities = []
-            for chunk_entities in result:
-                entities += chunk_entities
-            return entities
+        kwargs - те же, что у get_all, но limit - общее кол-во сущностей
+        (без limit обходится вся коллекция), page - страница, с которой начать.
+        """
+        limit = kwargs.pop("limit", None)
+        params = kwargs.copy()
+        params["page"] = params.get("page", 1)
+        params["limit"] = min(limit, self.MAX_LIMIT) if limit else self.MAX_LIMIT
+        remaining = limit
+        while remaining is None or remaining > 0:
+            data, entities = await self._get_entities(params, raw)
+            if remaining is not None:
+                entities = entities[:remaining]
+                remaining -= len(entities)
+            if entities:
+                yield entities
+            if is_last_page(data, len(entities), params["limit"]):
+                return
+            params["page"] += 1
 
-        response = await self.session.get(self.get_base_url(), params=kwargs)
-        if response.status_code >= 400:
-            await self._handle_response_error(response, "Get all entities")
-        
-        data = response.json()
-        row_entities = data.get("_embedded", {}).get(self.get_entity_type(), [])
-        return [self.schema_class(**item) for item in row_entities]
+    async def aiter_all(self, **kwargs) -> AsyncIterator[T]:
+        """Потоковый аналог get_all: отдает сущности по одной, запрашивая страницы по мере обхода"""
+        async for entities in self.aiter_pages(**kwargs):
+            for entity in entities:
+                yield entity
+
+    async def _oldest_timestamp(self, field: str, params: Dict[str, Any]) -> int:
+        """
+        Отметка field самой ранней сущности (с фильтрами params) - один запрос с order[field]=asc.
+        Для пустой коллекции - текущий момент
+        """
+        _, items = await self._get_entities(
+            {**params, f"order[{field}]": "asc", "page": 1, "limit": 1}, True, f"Get oldest {self.entity_type}"
+        )
+        return (items[0].get(field) if items else None) or now_timestamp()
+
+    async def _fetch_slice(
+        self, slicer: TimeSlicer, window: Window, params: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], List[Window]]:
+        """
+        Первая страница окна. Если окно не уместилось в страницу - его части для очереди,
+        а окно в одну секунду дочитывается страницами сразу
+        """
+        params = {**params, **slicer.params(window)}
+        data, items = await self._get_entities(
+            {**params, "page": 1, "limit": self.MAX_LIMIT}, True, f"Get {self.entity_type} time slice"
+        )
+        if is_last_page(data, len(items), self.MAX_LIMIT):
+            return items, []
+        children = slicer.split(window)
+        if children:
+            return items, children
+        async for page in self.aiter_pages(raw=True, **{**params, "page": 2}):
+            items += page
+        return items, []
+
+    async def _aiter_slices(
+        self, slicer: TimeSlicer, concurrency: int, raw: bool, params: Dict[str, Any]
+    ) -> AsyncIterator[List[T]]:
+        running = set()
+        try:
+            while slicer.windows or running:
+                while slicer.windows and len(running) < concurrency:
+                    running.add(asyncio.ensure_future(self._fetch_slice(slicer, slicer.windows.popleft(), params)))
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    items, children = task.result()
+                    slicer.windows.extend(children)
+                    items = slicer.unique(items)
+                    if items:
+                        yield items if raw else [self._build(item) for item in items]
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def aiter_sliced(
+        self,
+        field: str = "created_at",
+        from_date: Optional[Union[datetime, int]] = None,
+        to_date: Optional[Union[datetime, int]] = None,
+        window: Optional[int] = None,
+        concurrency: int = 4,
+        splits: int = 4,
+        raw: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[List[T]]:
+        """
+        Выгрузка коллекции по временным окнам field (created_at или updated_at) вместо глубоких номеров страниц.
+
+        Промежуток [from_date, to_date] (по умолчанию - от начала до момента запуска) режется на окна
+        по window секунд (по умолчанию - на concurrency окон). Без from_date окна нарезаются
+        от самой ранней сущности (см. TimeSlicer.plan_windows). Окна запрашиваются конкурентно,
+        до concurrency одновременно, под общим лимитером. Окно, не уместившееся в одну страницу,
+        делится на splits частей, поэтому плотные периоды дробятся сами.
+
+        Каждая сущность отдается один раз (повторы по id отбрасываются, id держатся в памяти до конца обхода).
+        Граница to_date фиксируется на старте, так что созданные во время выгрузки сущности в нее не попадают.
+        Для updated_at без to_date в конце запрашивается окно от старта до текущего момента: сущности,
+        измененные во время выгрузки, уходят из своих окон и иначе потерялись бы.
+        Страницы отдаются по мере загрузки окон, не в хронологическом порядке.
+        kwargs - дополнительные фильтры, как у get_all.
+        """
+        start = to_timestamp(from_date) or 0
+        snapshot_end = to_timestamp(to_date) or now_timestamp()
+        floor = await self._oldest_timestamp(field, kwargs) if from_date is None else None
+        slicer = TimeSlicer(field, TimeSlicer.plan_windows(start, snapshot_end, window, concurrency, floor), splits)
+        async for page in self._aiter_slices(slicer, concurrency, raw, kwargs):
+            yield page
+        if field == "updated_at" and to_date is None and now_timestamp() > snapshot_end:
+            slicer.windows.append((snapshot_end + 1, now_timestamp()))
+            async for page in self._aiter_slices(slicer, concurrency, raw, kwargs):
+                yield page
+
+    async def get_all_sliced(self, **kwargs) -> List[T]:
+        """Вся коллекция одним списком через aiter_sliced (параметры - те же)"""
+        return [entity async for page in self.aiter_sliced(**kwargs) for entity in page]
+
+    def _new_export(
+        self, columns: Optional[List[str]] = None, custom_fields: Optional[Dict[str, Any]] = None
+    ) -> ColumnarExport:
+        return ColumnarExport(columns or self.EXPORT_COLUMNS, custom_fields, self.schema_class)
+
+    async def export_columns(
+        self, columns: Optional[List[str]] = None, custom_fields: Optional[Dict[str, Any]] = None, **kwargs
+    ) -> ColumnarExport:
+        """
+        Колоночная выгрузка коллекции: страницы разбираются сразу в буферы колонок,
+        схемы на каждую сущность не создаются. Результат переводится в NumPy (to_numpy)
+        или Arrow (to_arrow), для этого нужен pip install py-amo-client[export].
+
+        columns - поля сущности (по умолчанию EXPORT_COLUMNS),
+        custom_fields - доп. поля как колонки: {имя колонки: field_id или field_code},
+        kwargs - фильтры, как у get_all.
+        """
+        export = self._new_export(columns, custom_fields)
+        async for items in self.aiter_pages(raw=True, **kwargs):
+            export.add_page(items)
+        return export
+
+    async def export_parquet(
+        self,
+        path: str,
+        columns: Optional[List[str]] = None,
+        custom_fields: Optional[Dict[str, Any]] = None,
+        row_group_size: int = 100_000,
+        **kwargs,
+    ) -> int:
+        """
+        Выгрузить коллекцию в файл Parquet, записывая по row_group_size строк:
+        в памяти держится не больше одной группы строк. Возвращает количество строк.
+        """
+        writer = ParquetExportWriter(self._new_export(columns, custom_fields), path, row_group_size)
+        try:
+            async for items in self.aiter_pages(raw=True, **kwargs):
+                writer.add_page(items)
+        finally:
+            rows = writer.close()
+        return rows
+
+    def export_job(self, sink: ExportSink, checkpoint_path: str, **kwargs) -> ExportJob:
+        """
+        Возобновляемая выгрузка в sink с чекпоинтом в checkpoint_path (см. ExportJob):
+        await job.arun() выгружает коллекцию, а после падения продолжает с сохраненного места.
+        kwargs - mode, field, from_date, to_date, window, concurrency, splits и фильтры, как у get_all
+        """
+        return ExportJob(self, sink, checkpoint_path, **kwargs)
+
+    def get_sync_key(self) -> str:
+        return f"{self.subdomain}:{self.entity_type}"
+
+    async def aiter_changes(self, store: CursorStore, key: Optional[str] = None, **kwargs) -> AsyncIterator[T]:
+        """
+        Инкрементальная синхронизация: отдает только сущности, измененные после прошлого запуска.
+
+        Отметка (максимальный updated_at и id с этим updated_at; поле отметки - SYNC_FIELD) хранится в store под ключом key
+        (по умолчанию "subdomain:entity_type") и сохраняется после обработки каждой страницы,
+        поэтому прерванный запуск продолжится с последней полностью обработанной страницы.
+        Первый запуск без отметки обходит всю коллекцию.
+
+        Страницы запрашиваются от текущей отметки по возрастанию updated_at, а не по номеру страницы,
+        поэтому изменения во время обхода не приводят к пропуску сущностей.
+        kwargs - дополнительные параметры запроса (with, фильтры).
+        """
+        key = key or self.get_sync_key()
+        cursor = store.load(key) or SyncCursor()
+        page = 1
+        while True:
+            params = {**kwargs, **cursor.filter_params(self.SYNC_FIELD), "page": page, "limit": self.MAX_LIMIT}
+            data, entities = await self._get_entities(params)
+            page_started_at = cursor.updated_at
+            for entity in entities:
+                updated_at = getattr(entity, self.SYNC_FIELD) or 0
+                if cursor.is_seen(entity.id, updated_at):
+                    continue
+                yield entity
+                cursor.advance(entity.id, updated_at)
+            store.save(key, cursor)
+            if is_last_page(data, len(entities), self.MAX_LIMIT):
+                return
+            # Если отметка сдвинулась - запрашиваем заново от нее, иначе (вся страница
+            # с одним updated_at) - следующую страницу с тем же фильтром
+            page = 1 if cursor.updated_at > page_started_at else page + 1
 
     @with_kwargs_filter
-    async def get_by_id(self, entity_id: int, **kwargs) -> Optional[T]:
+    async def get_by_id(self, entity_id: int, raw: bool = False, **kwargs) -> Optional[T]:
         """
         kwargs:
         - with_: str (Смотреть в документации)
         """
         url = f"{self.get_base_url()}/{entity_id}"
-        response = await self.session.get(url, params=kwargs)
-        if response.status_code in [404, 204]:
+        data = await self._get_json(url, kwargs, f"Get {self.entity_type} by id {entity_id}", not_found_ok=True)
+        if not data:
             return None
-        if response.status_code >= 400:
-            await self._handle_response_error(response, f"Get {self.entity_type} by id {entity_id}")
-        
-        return self.schema_class(**response.json())
+        return data if raw else self._build(data)
 
-    async def create(self, entities: List[T]) -> List[CreatedEntity]:
-        headers = {"Content-Type": "application/json"}
-        payload = json.dumps([entity.dict(exclude_none=True) for entity in entities])
-        response = await self.session.post(self.get_base_url(), data=payload, headers=headers)
-        if response.status_code >= 400:
-            await self._handle_response_error(response, f"Create {self.entity_type}")
-        
-        response_data = response.json()
+    def _parse_created(self, response_data: Dict[str, Any]) -> List[CreatedEntity]:
         embedded_key = self.entity_type if self.entity_type != "companies" else "companies"
         created_entities = response_data.get("_embedded", {}).get(embedded_key, [])
         
@@ -141,6 +462,16 @@ class BaseAsyncRepository(Generic[T]):
         ]
         return created_ids
 
+    async def create(self, entities: List[T]) -> List[CreatedEntity]:
+        headers = {"Content-Type": "application/json"}
+        payload = json.dumps([entity.dict(exclude_none=True) for entity in entities])
+        response = await self._request("POST", self.get_base_url(), data=payload, headers=headers)
+        if response.status_code >= 400:
+            await self._handle_response_error(response, f"Create {self.entity_type}")
+
+        self._invalidate_cache()
+        return self._parse_created(response.json())
+
     async def update(self, entity: T) -> T:
         entity_data = entity.dict(exclude_none=True)
         entity_id = entity_data.pop("id", None)
@@ -149,19 +480,125 @@ class BaseAsyncRepository(Generic[T]):
 
         update_data = self.schema_input_class(**entity_data).dict(exclude_none=True)
         url = f"{self.get_base_url()}/{entity_id}"
-        response = await self.session.patch(url, json=update_data)
+        response = await self._request("PATCH", url, json=update_data)
         if response.status_code >= 400:
             await self._handle_response_error(response, f"Update {self.entity_type} with id {entity_id}")
-        
+
+        self._invalidate_cache()
         return self.schema_class(**response.json())
 
     async def delete(self, entity_id: int) -> bool:
         url = f"{self.get_base_url()}/{entity_id}"
-        response = await self.session.delete(url)
+        response = await self._request("DELETE", url)
         if response.status_code >= 400:
             await self._handle_response_error(response, f"Delete {self.entity_type} with id {entity_id}")
+        self._invalidate_cache()
         return response.status_code == 204
 
+    @staticmethod
+    def _bulk_error(error: Exception, index: int, entity_id: Optional[int] = None) -> BulkEntityError:
+        return BulkEntityError(
+            index=index,
+            entity_id=entity_id,
+            message=getattr(error, "message", None) or str(error) or type(error).__name__,
+            status_code=getattr(error, "status_code", None),
+        )
+
+    async def _submit_chunk(
+        self,
+        chunk_index: int,
+        indexes: List[int],
+        method: str,
+        payload: List[Dict[str, Any]],
+        entity_ids: List[Optional[int]],
+    ) -> BulkChunkResult:
+        """Отправить одну пачку в коллекцию. Ошибка пачки не прерывает остальные, а попадает в результат"""
+        try:
+            response = await self._request(method, self.get_base_url(), json=payload)
+            if response.status_code >= 400:
+                await self._handle_response_error(response, f"Bulk {method} {self.entity_type}")
+            entities = self._parse_created(response.json())
+            self._invalidate_cache()
+        except (PyAmoException, httpx.HTTPError) as error:
+            return BulkChunkResult(
+                chunk_index=chunk_index,
+                indexes=indexes,
+                errors=[self._bulk_error(error, index, entity_id) for index, entity_id in zip(indexes, entity_ids)],
+            )
+        return BulkChunkResult(chunk_index=chunk_index, indexes=indexes, entities=entities)
+
+    async def _submit_bulk(self, method: str, payload: List[Dict[str, Any]], entity_ids: List[Optional[int]]) -> BulkResult:
+        chunks = await asyncio.gather(
+            *(
+                self._submit_chunk(
+                    chunk_index,
+                    indexes,
+                    method,
+                    [payload[index] for index in indexes],
+                    [entity_ids[index] for index in indexes],
+                )
+                for chunk_index, indexes in enumerate(chunked(range(len(payload)), self.BATCH_LIMIT))
+            )
+        )
+        return BulkResult(chunks=list(chunks))
+
+    async def create_many(self, entities: List[T]) -> BulkResult:
+        """
+        Создать любое кол-во сущностей: список режется на пачки по BATCH_LIMIT,
+        пачки отправляются конкурентно под общим лимитером сессии.
+
+        Ошибка одной пачки не прерывает остальные - она попадает в errors результата
+        с позициями сущностей во входном списке.
+        """
+        payload = [entity.dict(exclude_none=True) for entity in entities]
+        return await self._submit_bulk("POST", payload, [None] * len(payload))
+
+    async def update_many(self, entities: List[T]) -> BulkResult:
+        """
+        Обновить сущности пачками через PATCH коллекции (до BATCH_LIMIT сущностей в запросе).
+        У каждой сущности должен быть id. Ошибки - по пачкам, как в create_many.
+        """
+        payload = []
+        entity_ids = []
+        for entity in entities:
+            entity_data = entity.dict(exclude_none=True)
+            entity_id = entity_data.pop("id", None)
+            if entity_id is None:
+                raise ValueError("entity needs id for update")
+            update_data = self.schema_input_class(**entity_data).dict(exclude_none=True)
+            update_data["id"] = entity_id
+            payload.append(update_data)
+            entity_ids.append(entity_id)
+        return await self._submit_bulk("PATCH", payload, entity_ids)
+
+    async def delete_many(self, entity_ids: List[int]) -> BulkResult:
+        """
+        Удалить сущности по списку ID. Пакетного удаления в API нет, поэтому запросы
+        идут по одному, конкурентно под общим лимитером. Результат сгруппирован
+        в пачки по BATCH_LIMIT, ошибки - по каждой сущности.
+        """
+
+        async def delete(index: int):
+            try:
+                await self.delete(entity_ids[index])
+            except (PyAmoException, httpx.HTTPError) as error:
+                return self._bulk_error(error, index, entity_ids[index])
+            return CreatedEntity(id=entity_ids[index], entity_type=self.entity_type)
+
+        outcomes = await asyncio.gather(*(delete(index) for index in range(len(entity_ids))))
+        chunks = []
+        for chunk_index, indexes in enumerate(chunked(range(len(entity_ids)), self.BATCH_LIMIT)):
+            chunk = [outcomes[index] for index in indexes]
+            chunks.append(
+                BulkChunkResult(
+                    chunk_index=chunk_index,
+                    indexes=indexes,
+                    entities=[outcome for outcome in chunk if isinstance(outcome, CreatedEntity)],
+                    errors=[outcome for outcome in chunk if isinstance(outcome, BulkEntityError)],
+                )
+            )
+        return BulkResult(chunks=chunks)
+
     async def links(self, entity_id: int) -> EntityLinksSchema:
         """Получить связи сущности.
         
@@ -176,19 +613,92 @@ class BaseAsyncRepository(Generic[T]):
             raise UnsupportedOperationError("links", self.get_entity_type())
 
         url = f"{self.get_base_url()}/{entity_id}/links"
-        response = await self.session.get(url)
+        response = await self._request("GET", url)
         if response.status_code >= 400:
             await self._handle_response_error(response, f"Get links for {self.entity_type} with id {entity_id}")
         
         return EntityLinksSchema(**response.json())
 
-    async def get_by_ids(self, entity_ids: List[int], **kwargs) -> List[T]:
-        """Получить несколько сущностей по списку ID"""
+    async def get_by_ids(self, entity_ids: List[int], **kwargs) -> IdsResult:
+        """
+        Получить сущности по списку ID любой длины.
+
+        id режутся на пачки по лимиту страницы и длине URL (см. _id_chunks), пачки запрашиваются
+        конкурентно под общим лимитером. Результат - найденные сущности в порядке entity_ids
+        (повторы id схлопываются), ненайденные id - в missing_ids.
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
         if not entity_ids:
-            return []
-        
-        # AmoCRM поддерживает фильтр по нескольким ID через запятую
-        params = kwargs.copy()
-        params["filter[id]"] = ",".join(map(str, entity_ids))
-        
-        return await self.get_all(**params)
+            return IdsResult()
+
+        found = {}
+        for chunk in await asyncio.gather(*(self._fetch_ids(chunk, kwargs) for chunk in self._id_chunks(entity_ids))):
+            found.update(chunk)
+        return IdsResult(
+            [found[entity_id] for entity_id in entity_ids if entity_id in found],
+            [entity_id for entity_id in entity_ids if entity_id not in found],
+        )
+
+    def _id_chunks(self, entity_ids: List[int], param: str = "filter[id][]") -> List[List[int]]:
+        """Пачки id для param: не больше MAX_LIMIT штук и не длиннее MAX_QUERY_LENGTH в query string"""
+        param_length = len(quote(param)) + 2  # "=" и "&"
+        return list(
+            chunked_by_length(
+                entity_ids,
+                self.MAX_LIMIT,
+                self.MAX_QUERY_LENGTH,
+                lambda entity_id: param_length + len(str(entity_id)),
+            )
+        )
+
+    async def _fetch_ids(self, entity_ids: List[int], params: Dict[str, Any]) -> Dict[int, T]:
+        """Одна пачка id одним запросом. Возвращает найденные сущности по id"""
+        _, entities = await self._get_entities(
+            {**params, "filter[id][]": entity_ids, "limit": self.MAX_LIMIT},
+            operation=f"Get {self.entity_type} by ids",
+        )
+        return {entity.id: entity for entity in entities}
+
+    async def _get_by_filter_values(self, param: str, values: List[Any], **kwargs) -> List[T]:
+        """
+        Все сущности, у которых фильтр param (например "filter[entity_id][]") совпадает с одним из values.
+        values режутся на пачки как в get_by_ids, каждая пачка обходится постранично,
+        пачки - конкурентно под общим лимитером.
+        """
+        values = list(dict.fromkeys(values))
+
+        async def fetch(chunk: List[Any]) -> List[T]:
+            return [entity async for page in self.aiter_pages(**{**kwargs, param: chunk}) for entity in page]
+
+        entities = []
+        for chunk_entities in await asyncio.gather(*(fetch(chunk) for chunk in self._id_chunks(values, param))):
+            entities += chunk_entities
+        return entities
+
+    async def load(self, entity_id: int, **kwargs) -> Optional[T]:
+        """
+        Загрузить сущность по id, объединяя вызовы в пакетные запросы.
+
+        Вызовы load, сделанные в одном проходе цикла событий (например, через asyncio.gather),
+        уходят общими запросами filter[id][] по пачкам из _id_chunks, каждый вызов получает свою
+        сущность или None. kwargs (with и т.п.) должны совпадать, иначе запросы идут раздельно.
+        Загрузчик живет до отправки своей пачки, поэтому разные kwargs не копятся в памяти.
+        """
+        params_key = json.dumps(kwargs, sort_keys=True, default=str)
+        loader = self._loaders.get(params_key)
+        if loader is None:
+
+            def forget():
+                if self._loaders.get(params_key) is loader:
+                    del self._loaders[params_key]
+
+            loader = self._loaders[params_key] = AsyncBatchLoader(
+                lambda entity_ids: self._fetch_ids(entity_ids, kwargs),
+                self._id_chunks,
+                forget,
+            )
+        return await loader.load(entity_id)
+
+    async def load_many(self, entity_ids: List[int], **kwargs) -> List[Optional[T]]:
+        """load для списка id: результат в порядке entity_ids, ненайденные - None"""
+        return list(await asyncio.gather(*(self.load(entity_id, **kwargs) for entity_id in entity_ids)))
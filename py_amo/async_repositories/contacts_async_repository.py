@@ -1,6 +1,5 @@
 from py_amo.schemas import ContactSchema
 from py_amo.async_repositories import BaseAsyncRepository
-from httpx import AsyncClient
 
 
 class ContactsAsyncRepository(BaseAsyncRepository[ContactSchema]):
@@ -30,12 +29,12 @@ class ContactsAsyncRepository(BaseAsyncRepository[ContactSchema]):
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 YaBrowser/24.7.0.0 Safari/537.36",
             "x-requested-with": "XMLHttpRequest",
         }
-        front_session: AsyncClient = self.session
-        headers["Authorization"] = front_session.headers.get("Authorization")
-        front_session.headers.update(headers=headers)
-        response = await front_session.post(
+        # Клиент общий для всей сессии, поэтому заголовки передаются только в этот запрос
+        response = await self._request(
+            "POST",
             f"https://{self.subdomain}.amocrm.ru/ajax/contacts/list/contacts/",
             params=params,
+            headers=headers,
         )
         response.raise_for_status()
         return response.json().get("count")
@@ -1,7 +1,5 @@
 from py_amo.schemas import PipelineSchema
 from .base_async_repository import BaseAsyncRepository
-from httpx import AsyncClient
-from py_amo.utils import repository_safe_request
 import asyncio
 
 
@@ -11,21 +9,25 @@ class PipelinesAsyncRepository(BaseAsyncRepository[PipelineSchema]):
     ENTITY_TYPE = "pipelines"
     SCHEMA_CLASS = PipelineSchema
     SCHEMA_INPUT_CLASS = PipelineSchema
+    CACHE_DEPENDENTS = ("statuses",)
 
     async def get_all_leads_count(self):
+        # Статусы уже есть в ответе со списком воронок, повторно каждую воронку не запрашиваем
         pipelines = await self.get_all()
-        semaphore = asyncio.Semaphore(5)
         result = await asyncio.gather(
-            *(
-                repository_safe_request(self.get_leads_count, semaphore, i, pipeline.id)
-                for i, pipeline in enumerate(pipelines)
-            )
+            *(self._get_leads_count(pipeline) for pipeline in pipelines)
         )
         return sum(result)
 
     async def get_leads_count(self, pipeline_id: int):
-        print(pipeline_id)
-        pipeline = await self.get_by_id(pipeline_id)
+        """
+        Количество сделок через внутренний эндпоинт веб-интерфейса /ajax/leads/sum/.
+        Он не входит в публичный API и может измениться, для отчетов есть LeadsAnalytics.
+        """
+        return await self._get_leads_count(await self.get_by_id(pipeline_id))
+
+    async def _get_leads_count(self, pipeline: PipelineSchema):
+        pipeline_id = pipeline.id
         data = {
             "leads_by_status": "Y",
             "skip_filter": "Y",
@@ -50,12 +52,12 @@ class PipelinesAsyncRepository(BaseAsyncRepository[PipelineSchema]):
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 YaBrowser/24.7.0.0 Safari/537.36",
             "x-requested-with": "XMLHttpRequest",
         }
-        front_session: AsyncClient = self.session
-        headers["Authorization"] = front_session.headers.get("Authorization")
-        front_session.headers.update(headers=headers)
-        response = await front_session.post(
+        # Клиент общий для всей сессии, поэтому заголовки передаются только в этот запрос
+        response = await self._request(
+            "POST",
             f"https://{self.subdomain}.amocrm.ru/ajax/leads/sum/{pipeline_id}/",
             data=data,
+            headers=headers,
         )
         response.raise_for_status()
         return response.json().get("all_count")
@@ -8,6 +8,7 @@ class PipelineStatusesAsyncRepository(BaseAsyncRepository[PipelineStatusSchema])
     ENTITY_TYPE = "statuses"
     SCHEMA_CLASS = PipelineStatusSchema
     SCHEMA_INPUT_CLASS = PipelineStatusInputSchema
+    CACHE_DEPENDENTS = ("pipelines",)  # Статусы приходят и внутри воронок
 
     def __init__(self, pipeline_id: int, *args, **kwargs):
         self.pipeline_id = pipeline_id
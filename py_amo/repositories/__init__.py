@@ -6,3 +6,6 @@ from .users_repository import UsersRepository
 from .sources_repository import SourcesRepository
 from .statuses_repository import PipelineStatusesRepository
 from .companies_repository import CompaniesRepository
+from .tasks_repository import TasksRepository
+from .notes_repository import NotesRepository
+from .events_repository import EventsRepository
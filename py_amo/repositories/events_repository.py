@@ -0,0 +1,136 @@
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Union
+from py_amo.schemas import EventSchema
+from py_amo.services.filters import create_filter
+from py_amo.services.sync import CursorStore, SyncCursor
+from py_amo.exceptions import UnsupportedOperationError
+from py_amo.utils.date_utils import now_timestamp, time_windows, to_timestamp
+from .base_repository import BaseRepository
+
+
+class EventsRepository(BaseRepository[EventSchema]):
+    """
+    События (история изменений) - только чтение. Отметка iter_changes ведется по created_at,
+    а длинные периоды удобнее выгружать окнами через iter_windows.
+
+    /api/v4/events не принимает order, поэтому iter_changes и поиск самого раннего события
+    не полагаются на порядок ответа, а читают закрытые окна по created_at.
+    """
+
+    REPOSITORY_PATH = "/api/v4/events"
+    ENTITY_TYPE = "events"
+    SCHEMA_CLASS = EventSchema
+    SCHEMA_INPUT_CLASS = EventSchema
+    MAX_LIMIT = 100  # События отдаются страницами до 100 штук
+    SYNC_FIELD = "created_at"
+    EXPORT_COLUMNS = ("id", "type", "entity_id", "entity_type", "created_by", "created_at")
+    OLDEST_PRECISION = 86400  # Точность поиска самого раннего события, секунд
+
+    def _read_only(self, *args, **kwargs):
+        raise UnsupportedOperationError("write", self.get_entity_type())
+
+    create = update = delete = create_many = update_many = delete_many = _read_only
+
+    def _has_events_until(self, field: str, params: Dict[str, Any], timestamp: int) -> bool:
+        _, items = self._get_entities(
+            {**params, f"filter[{field}][to]": timestamp, "page": 1, "limit": 1}, True, "Find oldest event"
+        )
+        return bool(items)
+
+    def _oldest_timestamp(self, field: str, params: Dict[str, Any]) -> int:
+        """
+        Отметка не позже самого раннего события: делением пополам по filter[field][to]
+        с точностью OLDEST_PRECISION (около 15 запросов). Окно до нее запрашивается целиком,
+        поэтому неточность на полноту выгрузки не влияет. Без событий - текущий момент
+        """
+        low, high = 0, now_timestamp()
+        if not self._has_events_until(field, params, high):
+            return high
+        # Событий до low нет, до high - есть
+        while high - low > self.OLDEST_PRECISION:
+            middle = (low + high) // 2
+            if self._has_events_until(field, params, middle):
+                high = middle
+            else:
+                low = middle
+        return low + 1
+
+    def iter_changes(
+        self,
+        store: CursorStore,
+        key: Optional[str] = None,
+        from_date: Optional[Union[datetime, int]] = None,
+        window: int = 86400,
+        **kwargs,
+    ) -> Iterator[EventSchema]:
+        """
+        Инкрементальная синхронизация событий: отдает события, созданные после прошлого запуска.
+
+        Промежуток от отметки до текущего момента читается окнами по window секунд created_at,
+        по порядку. Окно закрыто (события не меняются, а новые создаются позже его конца),
+        поэтому его страницы можно обходить в любом порядке, который вернет amoCRM.
+        Отметка сохраняется в store после каждого окна, прерванный запуск повторит только текущее окно.
+        Первый запуск начинается с from_date, а без него - с самого раннего события.
+        kwargs - дополнительные фильтры (filter[type][], filter[entity][] и т.п.)
+        """
+        key = key or self.get_sync_key()
+        cursor = store.load(key) or SyncCursor()
+        start = cursor.updated_at or to_timestamp(from_date) or self._oldest_timestamp(self.SYNC_FIELD, kwargs)
+        # Текущая секунда еще не закрыта: события с ней могут появиться после запроса
+        for window_start, window_end in time_windows(start, now_timestamp() - 1, window):
+            # Пропуск повторов сверяется с отметкой на начало окна: события окна приходят не по порядку
+            seen = SyncCursor(cursor.updated_at, cursor.ids)
+            params = {**kwargs, **create_filter().filter_by_created_at(window_start, window_end).build()}
+            for page in self.iter_pages(**params):
+                for event in page:
+                    created_at = event.created_at or 0
+                    if seen.is_seen(event.id, created_at):
+                        continue
+                    yield event
+                    cursor.advance(event.id, created_at)
+            if cursor.updated_at < window_end:
+                # Окно прочитано целиком: следующий запуск начнет после него, а не с последнего события
+                cursor = SyncCursor(window_end + 1)
+            store.save(key, cursor)
+
+    def iter_windows(
+        self,
+        from_date: Union[datetime, int],
+        to_date: Union[datetime, int],
+        window: int = 86400,
+        concurrency: int = 4,
+        raw: bool = False,
+        **kwargs,
+    ) -> Iterator[List[EventSchema]]:
+        """
+        События за [from_date, to_date] страницами, с нарезкой периода на окна по window секунд created_at.
+
+        Каждое окно обходится постранично со своей пагинацией, до concurrency окон - параллельно
+        в пуле потоков сессии под общим лимитером. Страницы отдаются по окнам в хронологическом порядке,
+        в памяти держатся только окна, загруженные наперед.
+        kwargs - дополнительные фильтры (filter[type][], filter[entity][] и т.п.)
+        """
+
+        def fetch(bounds) -> List[List[EventSchema]]:
+            params = {**kwargs, **create_filter().filter_by_created_at(*bounds).build()}
+            return list(self.iter_pages(raw=raw, **params))
+
+        executor = self.amo_session.get_executor()
+        pending = deque()
+        try:
+            for bounds in time_windows(from_date, to_date, window):
+                pending.append(executor.submit(fetch, bounds))
+                if len(pending) >= concurrency:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def get_range(
+        self, from_date: Union[datetime, int], to_date: Union[datetime, int], window: int = 86400, **kwargs
+    ) -> List[EventSchema]:
+        """Все события за [from_date, to_date] одним списком (см. iter_windows)"""
+        return [event for page in self.iter_windows(from_date, to_date, window, **kwargs) for event in page]
@@ -8,3 +8,7 @@ class LeadsRepository(BaseRepository[LeadSchema]):
     ENTITY_TYPE = "leads"
     SCHEMA_CLASS = LeadSchema
     SCHEMA_INPUT_CLASS = LeadSchema
+    EXPORT_COLUMNS = (
+        "id", "price", "status_id", "pipeline_id", "responsible_user_id",
+        "loss_reason_id", "created_at", "updated_at", "closed_at",
+    )
@@ -0,0 +1,34 @@
+from typing import Dict, List
+from py_amo.schemas import NoteSchema, NoteInputSchema
+from .base_repository import BaseRepository
+
+
+class NotesRepository(BaseRepository[NoteSchema]):
+    """Примечания сущностей одного типа: leads, contacts, companies или customers"""
+
+    REPOSITORY_PATH = "/api/v4/{}/notes"
+    ENTITY_TYPE = "notes"
+    SCHEMA_CLASS = NoteSchema
+    SCHEMA_INPUT_CLASS = NoteInputSchema
+    EXPORT_COLUMNS = ("id", "entity_id", "note_type", "responsible_user_id", "created_by", "created_at", "updated_at")
+
+    def __init__(self, parent_entity_type: str, *args, **kwargs):
+        self.parent_entity_type = parent_entity_type
+        super().__init__(*args, **kwargs)
+
+    def get_base_url(self):
+        return super().get_base_url().format(self.parent_entity_type)
+
+    def get_sync_key(self) -> str:
+        return f"{self.subdomain}:{self.parent_entity_type}:{self.entity_type}"
+
+    def get_for_entities(self, entity_ids: List[int], **kwargs) -> Dict[int, List[NoteSchema]]:
+        """
+        Примечания сущностей по списку id любой длины, сгруппированные по entity_id.
+        Пачки id запрашиваются параллельно (см. _get_by_filter_values)
+        """
+        notes = self._get_by_filter_values("filter[entity_id][]", entity_ids, **kwargs)
+        result = {entity_id: [] for entity_id in entity_ids}
+        for note in notes:
+            result.setdefault(note.entity_id, []).append(note)
+        return result
@@ -1,6 +1,5 @@
 from py_amo.schemas import PipelineSchema
 from .base_repository import BaseRepository
-from requests import Session
 
 
 class PipelinesRepository(BaseRepository[PipelineSchema]):
@@ -9,8 +8,13 @@ class PipelinesRepository(BaseRepository[PipelineSchema]):
     ENTITY_TYPE = "pipelines"
     SCHEMA_CLASS = PipelineSchema
     SCHEMA_INPUT_CLASS = PipelineSchema
+    CACHE_DEPENDENTS = ("statuses",)
 
     def get_leads_count(self, pipeline_id: int):
+        """
+        Количество сделок через внутренний эндпоинт веб-интерфейса /ajax/leads/sum/.
+        Он не входит в публичный API и может измениться, для отчетов есть LeadsAnalytics.
+        """
         pipeline = self.get_by_id(pipeline_id)
         data = {
             "leads_by_status": "Y",
@@ -36,12 +40,12 @@ class PipelinesRepository(BaseRepository[PipelineSchema]):
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 YaBrowser/24.7.0.0 Safari/537.36",
             "x-requested-with": "XMLHttpRequest",
         }
-        front_session: Session = self.session
-        headers["Authorization"] = front_session.headers.get("Authorization")
-        front_session.headers.update(headers=headers)
-        response = front_session.post(
+        # Сессия общая для всех репозиториев, поэтому заголовки передаются только в этот запрос
+        response = self._request(
+            "POST",
             f"https://{self.subdomain}.amocrm.ru/ajax/leads/sum/{pipeline_id}/",
             data=data,
+            headers=headers,
         )
         response.raise_for_status()
         return response.json().get("all_count")
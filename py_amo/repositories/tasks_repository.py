@@ -0,0 +1,33 @@
+from typing import Dict, List, Optional
+from py_amo.schemas import TaskSchema, TaskInputSchema
+from .base_repository import BaseRepository
+
+
+class TasksRepository(BaseRepository[TaskSchema]):
+
+    REPOSITORY_PATH = "/api/v4/tasks"
+    ENTITY_TYPE = "tasks"
+    SCHEMA_CLASS = TaskSchema
+    SCHEMA_INPUT_CLASS = TaskInputSchema
+    EXPORT_COLUMNS = (
+        "id", "responsible_user_id", "entity_id", "entity_type", "task_type_id",
+        "is_completed", "complete_till", "created_at", "updated_at",
+    )
+
+    def get_for_entities(self, entity_type: str, entity_ids: List[int], **kwargs) -> Dict[int, List[TaskSchema]]:
+        """
+        Задачи сущностей entity_type ("leads", "contacts", "companies") по списку id любой длины,
+        сгруппированные по entity_id. Пачки id запрашиваются параллельно (см. _get_by_filter_values)
+        """
+        tasks = self._get_by_filter_values(
+            "filter[entity_id][]", entity_ids, **{"filter[entity_type]": entity_type, **kwargs}
+        )
+        result = {entity_id: [] for entity_id in entity_ids}
+        for task in tasks:
+            result.setdefault(task.entity_id, []).append(task)
+        return result
+
+    def complete(self, task_id: int, result_text: Optional[str] = None) -> TaskSchema:
+        """Закрыть задачу, при необходимости с текстом результата"""
+        result = {"text": result_text} if result_text else None
+        return self.update(TaskSchema(id=task_id, is_completed=True, result=result))
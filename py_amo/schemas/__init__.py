@@ -1,7 +1,7 @@
 from .lead_schema import LeadSchema
 from .contact_schema import ContactSchema
 from .account_schema import AccountShema
-from .custom_field_schema import CustomFieldShema, CustomFieldValues
+from .custom_field_schema import CustomFieldShema, CustomFieldValues, CustomFieldsAccessor
 from .pipeline_shema import PipelineSchema
 from .user_schema import UserSchema
 from .source_shema import SourceSchema
@@ -9,4 +9,10 @@ from .pipeline_status_schema import PipelineStatusSchema, PipelineStatusInputSch
 from .company_schema import CompanySchema
 from .task_schema import TaskSchema, TaskInputSchema, TaskTypeSchema
 from .note_schema import NoteSchema, NoteInputSchema
-from .event_schema import EventSchema, EventValueAfterSchema, EventValueBeforeSchema
\ No newline at end of file
+from .event_schema import EventSchema, EventValueAfterSchema, EventValueBeforeSchema
+from .bulk_result_schema import BulkResult, BulkChunkResult, BulkEntityError
+from .ids_result_schema import IdsResult
+from .lazy import LazyList
+from .duplicate_cluster_schema import DuplicateCluster
+from .leads_stats_schema import LeadsGroupStat, FunnelStage
+from .account_result_schema import AccountResult
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any
+
+
+class AccountResult(BaseModel):
+    subdomain: str
+    value: Any = None  # Результат задачи (или очередной элемент потока) аккаунта
+    error: Any = None  # Исключение, если задача аккаунта упала
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
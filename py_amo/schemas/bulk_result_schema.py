@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from .created_entity_schema import CreatedEntity
+
+
+class BulkEntityError(BaseModel):
+    index: int  # Позиция сущности во входном списке
+    entity_id: Optional[int] = None
+    message: str
+    status_code: Optional[int] = None
+
+
+class BulkChunkResult(BaseModel):
+    chunk_index: int
+    indexes: List[int]  # Позиции сущностей пачки во входном списке
+    entities: List[CreatedEntity] = []
+    errors: List[BulkEntityError] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class BulkResult(BaseModel):
+    chunks: List[BulkChunkResult] = []
+
+    @property
+    def ok(self) -> bool:
+        return all(chunk.ok for chunk in self.chunks)
+
+    @property
+    def entities(self) -> List[CreatedEntity]:
+        return [entity for chunk in self.chunks for entity in chunk.entities]
+
+    @property
+    def errors(self) -> List[BulkEntityError]:
+        return [error for chunk in self.chunks for error in chunk.errors]
+
+    @property
+    def failed_chunks(self) -> List[BulkChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from .tag_schema import TagSchema
-from .custom_field_schema import CustomFieldShema
+from .custom_field_schema import CustomFieldShema, CustomFieldsMixin
+from .lazy import LazyList
 from .catalog_element_schema import CatalogElementSchema
 
 class ContactInfoSchema(BaseModel):
@@ -14,13 +15,13 @@ class LeadInfoSchema(BaseModel):
     id: Optional[int] = None
 
 class EmbeddedSchema(BaseModel):
-    tags: Optional[List[TagSchema]] = None
-    contacts: Optional[List[ContactInfoSchema]] = None
-    customers: Optional[List[CustomerInfoSchema]] = None
-    leads: Optional[List[LeadInfoSchema]] = None
-    catalog_elements: Optional[List[CatalogElementSchema]] = None
+    tags: Optional[LazyList[TagSchema]] = None
+    contacts: Optional[LazyList[ContactInfoSchema]] = None
+    customers: Optional[LazyList[CustomerInfoSchema]] = None
+    leads: Optional[LazyList[LeadInfoSchema]] = None
+    catalog_elements: Optional[LazyList[CatalogElementSchema]] = None
 
-class CompanySchema(BaseModel):
+class CompanySchema(CustomFieldsMixin):
     id: Optional[int] = None
     name: Optional[str] = None
     responsible_user_id: Optional[int] = None
@@ -30,7 +31,7 @@ class CompanySchema(BaseModel):
     created_at: Optional[int] = None
     updated_at: Optional[int] = None
     closest_task_at: Optional[int] = None
-    custom_fields_values: Optional[List[CustomFieldShema]] = None
+    custom_fields_values: Optional[LazyList[CustomFieldShema]] = None
     is_deleted: Optional[bool] = None
     account_id: Optional[int] = None
     emb: Optional[EmbeddedSchema] = Field(alias="_embedded")
\ No newline at end of file
@@ -1,9 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from .custom_field_schema import CustomFieldShema
+from .custom_field_schema import CustomFieldShema, CustomFieldsMixin
+from .lazy import LazyList
 
 
-class ContactSchema(BaseModel):
+class ContactSchema(CustomFieldsMixin):
     id: Optional[int] = None
     name: Optional[str] = None
     first_name: Optional[str] = None
@@ -16,6 +17,6 @@ class ContactSchema(BaseModel):
     updated_at: Optional[int] = None
     is_deleted: Optional[bool] = None
     closest_task_at: Optional[int] = None
-    custom_fields_values: Optional[list[CustomFieldShema]] = None
+    custom_fields_values: Optional[LazyList[CustomFieldShema]] = None
     account_id: Optional[int] = None
     emb: Optional[dict] = Field(alias="_embedded")
@@ -1,9 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from typing import Optional
 
 
 class CustomFieldValues(BaseModel):
-    value: Optional[str | int] = None
+    value: Optional[str | int | dict | list] = None  # dict - у адреса, юр. лица и подобных полей
     enum_id: Optional[int] = None
     enum_code: Optional[str] = None
 
@@ -15,3 +15,135 @@ class CustomFieldShema(BaseModel):
     field_type: Optional[str] = None
     values: Optional[list[CustomFieldValues]] = None
     account_id: Optional[int] = None
+
+
+class CustomFieldsAccessor:
+    """
+    Доступ к дополнительным полям сущности по field_id, field_code и field_name за O(1).
+
+    Индексы строятся один раз при первом обращении к entity.cf и перестраиваются,
+    только если custom_fields_values заменили целиком.
+
+    - cf[field_id] - поле (CustomFieldShema), KeyError, если его нет; cf.get(field_id) - поле или None
+    - cf.by_code("PHONE"), cf.by_name("Телефон") - поле или None
+    - cf.value(field_id) - первое значение поля или None
+    - cf[field_id] = значение (или список значений, словарей {"enum_id": ...}, CustomFieldValues) -
+      меняет custom_fields_values сущности, а cf.payload() отдает только измененные поля
+      в формате для update: [{"field_id": ..., "values": [...]}]
+    """
+
+    def __init__(self, entity):
+        self._entity = entity
+        self._source = None
+        self._changed = {}
+        self._build()
+
+    def _build(self):
+        fields = self._entity.custom_fields_values
+        self._source = fields
+        self._by_id = {}
+        self._by_code = {}
+        self._by_name = {}
+        for field in fields or []:
+            self._index(field)
+
+    def _index(self, field: CustomFieldShema):
+        if field.field_id is not None:
+            self._by_id[field.field_id] = field
+        if field.field_code:
+            self._by_code[field.field_code] = field
+        if field.field_name:
+            self._by_name[field.field_name] = field
+
+    def _check_source(self):
+        if self._entity.custom_fields_values is not self._source:
+            self._build()
+
+    def get(self, field_id: int, default: Optional[CustomFieldShema] = None) -> Optional[CustomFieldShema]:
+        self._check_source()
+        return self._by_id.get(field_id, default)
+
+    def __getitem__(self, field_id: int) -> CustomFieldShema:
+        self._check_source()
+        return self._by_id[field_id]
+
+    def __contains__(self, field_id: int) -> bool:
+        self._check_source()
+        return field_id in self._by_id
+
+    def by_code(self, field_code: str) -> Optional[CustomFieldShema]:
+        self._check_source()
+        return self._by_code.get(field_code)
+
+    def by_name(self, field_name: str) -> Optional[CustomFieldShema]:
+        self._check_source()
+        return self._by_name.get(field_name)
+
+    def value(self, field_id: int, default=None):
+        field = self.get(field_id)
+        if field is None or not field.values:
+            return default
+        return field.values[0].value
+
+    @staticmethod
+    def _make_values(value) -> list:
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        values = []
+        for item in value:
+            if isinstance(item, CustomFieldValues):
+                values.append(item)
+            elif isinstance(item, dict):
+                values.append(CustomFieldValues(**item))
+            else:
+                values.append(CustomFieldValues(value=item))
+        return values
+
+    def _set(self, field: Optional[CustomFieldShema], new_field: CustomFieldShema, value):
+        if field is None:
+            field = new_field
+            if self._entity.custom_fields_values is None:
+                self._entity.custom_fields_values = []
+            self._entity.custom_fields_values.append(field)
+            self._source = self._entity.custom_fields_values
+            self._index(field)
+        field.values = self._make_values(value)
+        self._changed[field.field_id if field.field_id is not None else field.field_code] = field
+
+    def __setitem__(self, field_id: int, value):
+        self._check_source()
+        self._set(self._by_id.get(field_id), CustomFieldShema(field_id=field_id), value)
+
+    def set_by_code(self, field_code: str, value):
+        """Установить значение поля по коду. Если поля у сущности нет, оно добавится с field_code (PHONE, EMAIL)"""
+        self._check_source()
+        self._set(self._by_code.get(field_code), CustomFieldShema(field_code=field_code), value)
+
+    def payload(self) -> list:
+        """Измененные через cf поля в формате custom_fields_values для update"""
+        payload = []
+        for field in self._changed.values():
+            item = {"field_id": field.field_id} if field.field_id is not None else {"field_code": field.field_code}
+            item["values"] = [value.dict(exclude_none=True) for value in field.values]
+            payload.append(item)
+        return payload
+
+    def __iter__(self):
+        self._check_source()
+        return iter(self._entity.custom_fields_values or [])
+
+    def __len__(self):
+        self._check_source()
+        return len(self._entity.custom_fields_values or [])
+
+
+class CustomFieldsMixin(BaseModel):
+    """Добавляет схеме с custom_fields_values индексированный доступ entity.cf"""
+
+    _cf: Optional[CustomFieldsAccessor] = PrivateAttr(default=None)
+
+    @property
+    def cf(self) -> CustomFieldsAccessor:
+        if self._cf is None:
+            self._cf = CustomFieldsAccessor(self)
+        return self._cf
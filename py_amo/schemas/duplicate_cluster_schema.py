@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class DuplicateCluster(BaseModel):
+    entity_type: str
+    ids: List[int]  # id сущностей-дублей по возрастанию
+    keys: List[str]  # Совпавшие ключи, например "phone:9001234567", "email:a@b.ru"
@@ -0,0 +1,16 @@
+from typing import Iterable, List
+
+
+class IdsResult(list):
+    """
+    Результат get_by_ids: найденные сущности в порядке входного списка id
+    (обычный список) и id, которых в amoCRM не нашлось.
+    """
+
+    def __init__(self, entities: Iterable = (), missing_ids: Iterable[int] = ()):
+        super().__init__(entities)
+        self.missing_ids: List[int] = list(missing_ids)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing_ids
@@ -0,0 +1,120 @@
+from functools import lru_cache
+from typing import Any, Iterable, Type
+from pydantic import BaseModel
+
+
+class LazyList(list):
+    """
+    Список вложенных схем, которые собираются из данных ответа только при первом обращении.
+
+    Поле с аннотацией LazyList[Schema] принимает список словарей без валидации элементов.
+    Пока к элементам не обращались, в списке лежат исходные словари, len и bool работают без разбора.
+    Первое чтение элементов (индекс, итерация, сравнение) один раз превращает все словари в Schema,
+    дальше список ведет себя как обычный список схем.
+    """
+
+    ITEM_SCHEMA: Type[BaseModel] = None
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(items)
+        self._materialized = True
+
+    @classmethod
+    def __class_getitem__(cls, schema_class: Type[BaseModel]) -> Type["LazyList"]:
+        return _lazy_list_class(schema_class)
+
+    @classmethod
+    def lazy(cls, items: Iterable) -> "LazyList":
+        lazy_list = cls(items)
+        lazy_list._materialized = False
+        return lazy_list
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._materialized
+
+    def _materialize(self):
+        if self._materialized:
+            return
+        # Сначала собираются все элементы: если какой-то не валиден, список остается неразобранным
+        # и следующее обращение снова выбросит ValidationError, а не отдаст словари
+        items = [
+            self.ITEM_SCHEMA(**item) if isinstance(item, dict) else item for item in list.__iter__(self)
+        ]
+        list.__setitem__(self, slice(None), items)
+        self._materialized = True
+
+    def __reduce__(self):
+        # Классы LazyList[Schema] создаются динамически, поэтому pickle восстанавливает их через схему.
+        # Неразобранные словари так и передаются словарями
+        return _restore_lazy_list, (self.ITEM_SCHEMA, list(list.__iter__(self)), self._materialized)
+
+    @classmethod
+    def validate(cls, value: Any) -> "LazyList":
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (list, tuple)):
+            return cls.lazy(value)
+        raise ValueError(f"list expected, got {type(value).__name__}")
+
+    @classmethod
+    def __get_validators__(cls):
+        # pydantic 1
+        yield cls.validate
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any):
+        # pydantic 2: исходные словари сериализуются как есть, без сборки схем
+        from pydantic_core import core_schema
+
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(cls._serialize, info_arg=True),
+        )
+
+    @staticmethod
+    def _serialize(value: "LazyList", info: Any) -> list:
+        # Разбор перед выгрузкой: результат model_dump не зависит от того, читали ли список раньше
+        value._materialize()
+        return [
+            item.model_dump(mode=info.mode, by_alias=info.by_alias, exclude_none=info.exclude_none)
+            if isinstance(item, BaseModel)
+            else item
+            for item in list.__iter__(value)
+        ]
+
+
+def _materializing(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._materialize()
+        # Сравнение и сложение с другим LazyList: его элементы тоже должны быть схемами
+        for arg in args:
+            if isinstance(arg, LazyList):
+                arg._materialize()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "__getitem__", "__iter__", "__reversed__", "__contains__", "__repr__",
+    "__eq__", "__ne__", "__lt__", "__le__", "__gt__", "__ge__",
+    "__add__", "__mul__", "__rmul__",
+    "index", "count", "remove", "pop", "copy", "sort",
+):
+    setattr(LazyList, _name, _materializing(_name))
+LazyList.__hash__ = None
+
+
+@lru_cache(maxsize=None)
+def _lazy_list_class(schema_class: Type[BaseModel]) -> Type[LazyList]:
+    return type(f"Lazy{schema_class.__name__}List", (LazyList,), {"ITEM_SCHEMA": schema_class})
+
+
+def _restore_lazy_list(schema_class: Type[BaseModel], items: list, materialized: bool) -> LazyList:
+    lazy_list = LazyList[schema_class](items)
+    lazy_list._materialized = materialized
+    return lazy_list
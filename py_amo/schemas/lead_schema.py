@@ -1,9 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from .custom_field_schema import CustomFieldShema
+from .custom_field_schema import CustomFieldShema, CustomFieldsMixin
+from .lazy import LazyList
 
 
-class LeadSchema(BaseModel):
+class LeadSchema(CustomFieldsMixin):
     id: Optional[int] = None
     name: Optional[str] = None
     price: Optional[int] = None
@@ -20,7 +21,7 @@ class LeadSchema(BaseModel):
     updated_at: Optional[int] = None
     closest_task_at: Optional[int] = None
     is_deleted: Optional[bool] = None
-    custom_fields_values: Optional[list[CustomFieldShema]] = None
+    custom_fields_values: Optional[LazyList[CustomFieldShema]] = None
     score: Optional[int] = None
     account_id: Optional[int] = None
     embedded: Optional[dict] = Field(alias="_embedded", default=None)
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class LeadsGroupStat(BaseModel):
+    pipeline_id: Optional[int] = None
+    pipeline_name: Optional[str] = None
+    status_id: Optional[int] = None
+    status_name: Optional[str] = None
+    responsible_user_id: Optional[int] = None
+    count: int
+    price_sum: int
+
+
+class FunnelStage(BaseModel):
+    pipeline_id: int
+    status_id: int
+    status_name: Optional[str] = None
+    responsible_user_id: Optional[int] = None
+    count: int  # Сделок сейчас в этом статусе
+    reached: int  # Сделок, дошедших до этого статуса или дальше
+    conversion: Optional[float] = None  # reached / reached предыдущего этапа, у первого этапа - None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Optional, List
 from .pipeline_status_schema import PipelineStatusSchema
 
@@ -12,9 +12,11 @@ class PipelineSchema(BaseModel):
     is_archive: Optional[bool] = None
     account_id: Optional[int] = None
     emb: Optional[dict] = Field(alias="_embedded")
+    _statuses: Optional[List[PipelineStatusSchema]] = PrivateAttr(default=None)
 
     @property
     def statuses(self) -> Optional[List[PipelineStatusSchema]]:
-        if self.emb and "statuses" in self.emb:
-            return [PipelineStatusSchema(**status) for status in self.emb["statuses"]]
-        return None
+        """Статусы из _embedded, разбираются при первом обращении и дальше переиспользуются"""
+        if self._statuses is None and self.emb and "statuses" in self.emb:
+            self._statuses = [PipelineStatusSchema(**status) for status in self.emb["statuses"]]
+        return self._statuses
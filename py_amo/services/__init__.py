@@ -1 +1,14 @@
 from .amo_session import AsyncAmoSession, AmoSession
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .sync import SyncCursor, CursorStore, MemoryCursorStore, FileCursorStore, SQLiteCursorStore
+from .mirror import SQLiteMirror, normalize_phone, normalize_email
+from .cache import ResponseCache, CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from .single_flight import SingleFlight, AsyncSingleFlight
+from .loader import AsyncBatchLoader
+from .parsing import construct, loads, dumps
+from .dedup import DuplicateFinder, DedupIndex, MemoryDedupIndex, SQLiteDedupIndex
+from .export import ColumnarExport, ExportColumn, ParquetExportWriter
+from .analytics import LeadsAnalytics
+from .export_job import ExportJob, ExportSink, JSONLSink, ParquetSink, CallbackSink
+from .multi_account import MultiAccountExecutor
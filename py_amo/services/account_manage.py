@@ -1,13 +1,27 @@
 from py_amo.schemas import AccountShema
+from .retry import send_request
 
 
 class AccountManager:
 
     def get_me(self):
+        """Данные аккаунта. Кэшируются на session.cache.get_ttl("account") секунд"""
+        url = self.get_url() + "/api/v4/account"
         params = {"with": "amojo_id"}
-        response = self.get_requests_session().get(
-            self.get_url() + "/api/v4/account", params=params
-        )
-        response.raise_for_status()
-        data = response.json()
+        ttl = self.cache.get_ttl("account")
+        key = self.cache.make_key(self.subdomain, "account", url, params)
+        data = self.cache.get(key) if ttl else None
+        if data is None:
+            response = send_request(
+                self.get_requests_session(),
+                self.rate_limiter,
+                self.retry_policy,
+                "GET",
+                url,
+                params=params,
+            )
+            response.raise_for_status()
+            data = response.json()
+            if ttl:
+                self.cache.set(key, data, ttl)
         return AccountShema(**data)
@@ -1,5 +1,12 @@
+import threading
 import requests
+from concurrent.futures import Executor, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional
 from .account_manage import AccountManager
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .cache import ResponseCache
 import httpx
 from py_amo.repositories import (
     PipelinesRepository,
@@ -8,7 +15,10 @@ from py_amo.repositories import (
     UsersRepository,
     SourcesRepository,
     PipelineStatusesRepository,
-    CompaniesRepository
+    CompaniesRepository,
+    TasksRepository,
+    NotesRepository,
+    EventsRepository,
 )
 from py_amo.async_repositories import (
     PipelinesAsyncRepository,
@@ -17,15 +27,52 @@ from py_amo.async_repositories import (
     UsersAsyncRepository,
     SourcesAsyncRepository,
     PipelineStatusesAsyncRepository,
-    CompaniesAsyncRepository
+    CompaniesAsyncRepository,
+    TasksAsyncRepository,
+    NotesAsyncRepository,
+    EventsAsyncRepository,
 )
 
 
 class BaseAmoSession(AccountManager):
 
-    def __init__(self, token: str, subdomain: str):
+    def __init__(
+        self,
+        token: str,
+        subdomain: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        trusted: bool = False,
+        parse_executor: Optional[Executor] = None,
+    ):
+        """
+        rate_limiter - общий для всех репозиториев сессии лимитер запросов.
+        По умолчанию 7 запросов в секунду - лимит amoCRM на аккаунт.
+
+        retry_policy - повторы при 429/5xx и сетевых ошибках.
+        Чтобы отключить повторы, передайте RetryPolicy(max_attempts=1).
+
+        cache - кэш справочников (воронки, статусы, пользователи, источники, аккаунт).
+        По умолчанию LRU в памяти с DEFAULT_TTL, см. ResponseCache.
+
+        trusted - собирать схемы из ответов amoCRM без валидации pydantic (см. parsing.construct):
+        на pydantic 2 сборка страницы сделок примерно на четверть быстрее валидации, на pydantic 1 - в разы.
+        Можно включить и для отдельного репозитория: session.leads.trusted = True.
+
+        parse_executor - пул (ProcessPoolExecutor или ThreadPoolExecutor), в котором разбираются страницы
+        коллекций: JSON ответа и сборка схем целой страницы. С пулом процессов разбор больших выгрузок
+        идет на нескольких ядрах. Пул принадлежит вызывающему коду, сессия его не закрывает.
+        Можно задать и для отдельного репозитория: session.leads.parse_executor = pool.
+        """
         self.token = token
         self.subdomain = subdomain
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache or ResponseCache()
+        self.trusted = trusted
+        self.parse_executor = parse_executor
+        self._repositories = {}
 
     def get_headers(self):
         return {"Authorization": f"Bearer {self.token}"}
@@ -36,40 +83,125 @@ class BaseAmoSession(AccountManager):
     def get_subdomain(self):
         return self.subdomain
 
+    def _get_repository(self, repository_class, *args):
+        """Репозитории создаются один раз на сессию и дальше переиспользуются"""
+        key = (repository_class, args)
+        repository = self._repositories.get(key)
+        if repository is None:
+            repository = self._repositories.setdefault(key, repository_class(*args, self))
+        return repository
+
 
 class AmoSession(BaseAmoSession):
 
+    def __init__(
+        self,
+        token: str,
+        subdomain: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        trusted: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        max_workers: Optional[int] = None,
+        parse_executor: Optional[Executor] = None,
+    ):
+        """
+        pool_connections, pool_maxsize - параметры пула соединений requests (HTTPAdapter).
+        pool_maxsize ограничивает кол-во соединений, которые держатся открытыми
+        при одновременных запросах из нескольких потоков.
+
+        max_workers - размер пула потоков для параллельной загрузки страниц (по умолчанию pool_maxsize).
+        """
+        super().__init__(token, subdomain, rate_limiter, retry_policy, cache, trusted, parse_executor)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_workers = max_workers or pool_maxsize
+        self._requests_session = None
+        self._requests_session_lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def get_requests_session(self):
-        session = requests.Session()
-        session.headers.update({"Authorization": f"Bearer {self.token}"})
-        return session
+        """Одна keep-alive сессия с пулом соединений на всю AmoSession, создается при первом запросе"""
+        if self._requests_session is None:
+            with self._requests_session_lock:
+                if self._requests_session is None:
+                    session = requests.Session()
+                    session.headers.update({"Authorization": f"Bearer {self.token}"})
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._requests_session = session
+        return self._requests_session
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Пул потоков сессии для параллельных запросов, создается при первом обращении"""
+        if self._executor is None:
+            with self._requests_session_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"py_amo-{self.subdomain}",
+                    )
+        return self._executor
+
+    def close(self):
+        """Закрыть открытые соединения. Сессией можно пользоваться и дальше - соединения откроются заново"""
+        with self._requests_session_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self._requests_session is not None:
+            self._requests_session.close()
 
     @property
     def leads(self):
-        return LeadsRepository(self)
+        return self._get_repository(LeadsRepository)
 
     @property
     def contacts(self):
-        return ContactsRepository(self)
+        return self._get_repository(ContactsRepository)
 
     @property
     def pipelines(self):
-        return PipelinesRepository(self)
+        return self._get_repository(PipelinesRepository)
 
     @property
     def users(self):
-        return UsersRepository(self)
+        return self._get_repository(UsersRepository)
 
     @property
     def sources(self):
-        return SourcesRepository(self)
+        return self._get_repository(SourcesRepository)
     
     @property
     def companies(self):
-        return CompaniesRepository(self)
+        return self._get_repository(CompaniesRepository)
 
     def pipeline_statuses(self, pipeline_id: int):
-        return PipelineStatusesRepository(pipeline_id, self)
+        return self._get_repository(PipelineStatusesRepository, pipeline_id)
+
+    @property
+    def tasks(self):
+        return self._get_repository(TasksRepository)
+
+    @property
+    def events(self):
+        return self._get_repository(EventsRepository)
+
+    def notes(self, entity_type: str):
+        """Примечания сущностей entity_type: leads, contacts, companies или customers"""
+        return self._get_repository(NotesRepository, entity_type)
 
 
 class AsyncAmoSession(BaseAmoSession):
@@ -77,36 +209,102 @@ class AsyncAmoSession(BaseAmoSession):
     Будьте аккуратны с асинхронным клиентом! Не забывайте про ограничения кол-ва запросов в секунду со стороны амо!
     """
 
-    def __init__(self, token, subdomain):
-        super().__init__(token, subdomain)
-        self.async_session = httpx.AsyncClient(headers=self.get_headers(), timeout=30)
+    def __init__(
+        self,
+        token,
+        subdomain,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        trusted: bool = False,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        timeout: float = 30,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        write_timeout: Optional[float] = None,
+        pool_timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        parse_executor: Optional[Executor] = None,
+    ):
+        """
+        limits - httpx.Limits: сколько соединений держать открытыми (max_connections, max_keepalive_connections).
+        По умолчанию - как у httpx: 100 соединений, из них 20 keep-alive.
+        http2 - мультиплексировать запросы в одном HTTP/2 соединении (нужен пакет h2: pip install httpx[http2]).
+        timeout - общий таймаут, connect/read/write/pool_timeout переопределяют его по отдельности.
+        transport - готовый транспорт httpx, например общий для многих сессий (см. MultiAccountExecutor).
+        С ним limits и http2 задаются у транспорта.
+
+        Сессию лучше использовать как async with, чтобы соединения закрывались корректно.
+        Кэш - только с неблокирующим хранилищем (MemoryCacheBackend), RedisCacheBackend здесь не подходит.
+        """
+        if cache is not None and cache.backend.BLOCKING:
+            raise ValueError(
+                f"{type(cache.backend).__name__} blocks the event loop: use it with AmoSession only"
+            )
+        super().__init__(token, subdomain, rate_limiter, retry_policy, cache, trusted, parse_executor)
+        timeouts = {
+            "connect": connect_timeout,
+            "read": read_timeout,
+            "write": write_timeout,
+            "pool": pool_timeout,
+        }
+        self.async_session = httpx.AsyncClient(
+            headers=self.get_headers(),
+            timeout=httpx.Timeout(timeout, **{k: v for k, v in timeouts.items() if v is not None}),
+            limits=limits or httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=http2,
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Дождаться закрытия всех соединений клиента"""
+        await self.async_session.aclose()
 
     def get_async_session(self):
         return self.async_session
 
     @property
     def leads(self):
-        return LeadsAsyncRepository(self)
+        return self._get_repository(LeadsAsyncRepository)
 
     @property
     def contacts(self):
-        return ContactsAsyncRepository(self)
+        return self._get_repository(ContactsAsyncRepository)
 
     @property
     def pipelines(self):
-        return PipelinesAsyncRepository(self)
+        return self._get_repository(PipelinesAsyncRepository)
 
     @property
     def users(self):
-        return UsersAsyncRepository(self)
+        return self._get_repository(UsersAsyncRepository)
 
     @property
     def sources(self):
-        return SourcesAsyncRepository(self)
+        return self._get_repository(SourcesAsyncRepository)
     
     @property
     def companies(self):
-        return CompaniesAsyncRepository(self)
+        return self._get_repository(CompaniesAsyncRepository)
 
     def pipeline_statuses(self, pipeline_id: int):
-        return PipelineStatusesAsyncRepository(pipeline_id, self)
+        return self._get_repository(PipelineStatusesAsyncRepository, pipeline_id)
+
+    @property
+    def tasks(self):
+        return self._get_repository(TasksAsyncRepository)
+
+    @property
+    def events(self):
+        return self._get_repository(EventsAsyncRepository)
+
+    def notes(self, entity_type: str):
+        """Примечания сущностей entity_type: leads, contacts, companies или customers"""
+        return self._get_repository(NotesAsyncRepository, entity_type)
@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Sequence
+from py_amo.schemas import PipelineSchema, PipelineStatusSchema, LeadsGroupStat, FunnelStage
+from .export import ColumnarExport, _require
+
+try:
+    import numpy
+except ImportError:  # pip install py-amo-client[export]
+    numpy = None
+
+WON_STATUS_ID = 142
+LOST_STATUS_ID = 143
+
+
+class LeadsAnalytics:
+    """
+    Сводки по сделкам на колоночной выгрузке (export_columns) и метаданных воронок.
+    Нужны только публичные методы API: список сделок и список воронок со статусами
+    (воронки берутся через кэш справочников сессии).
+
+    Агрегации считаются группировкой массивов NumPy, без цикла по сделкам на Python.
+    """
+
+    COLUMNS = ("id", "pipeline_id", "status_id", "responsible_user_id", "price")
+    GROUP_KEYS = ("pipeline_id", "status_id", "responsible_user_id")
+
+    def __init__(self, export: ColumnarExport, pipelines: Sequence[PipelineSchema]):
+        np = _require(numpy, "numpy")
+        arrays = export.to_numpy()
+        self.columns: Dict[str, "numpy.ndarray"] = {
+            name: arrays[name].astype(np.int64, copy=False) for name in self.COLUMNS if name in arrays
+        }
+        self.pipelines: Dict[int, PipelineSchema] = {pipeline.id: pipeline for pipeline in pipelines}
+        self.statuses: Dict[tuple, PipelineStatusSchema] = {
+            (pipeline.id, status.id): status for pipeline in pipelines for status in pipeline.statuses or []
+        }
+
+    @classmethod
+    def load(cls, session, **kwargs) -> "LeadsAnalytics":
+        """Выгрузить сделки (kwargs - фильтры, как у get_all) и воронки через AmoSession"""
+        export = session.leads.export_columns(columns=list(cls.COLUMNS), **kwargs)
+        return cls(export, session.pipelines.get_all())
+
+    @classmethod
+    async def aload(cls, session, **kwargs) -> "LeadsAnalytics":
+        """То же для AsyncAmoSession"""
+        export = await session.leads.export_columns(columns=list(cls.COLUMNS), **kwargs)
+        return cls(export, await session.pipelines.get_all())
+
+    def __len__(self):
+        return len(self.columns["status_id"])
+
+    def group_by(self, *keys: str) -> List[LeadsGroupStat]:
+        """
+        Количество сделок и сумма price по комбинациям keys
+        (любые из pipeline_id, status_id, responsible_user_id). Без keys - итог по всем сделкам.
+        """
+        np = numpy
+        for key in keys:
+            if key not in self.GROUP_KEYS:
+                raise ValueError(f"unknown group key {key}, expected one of {self.GROUP_KEYS}")
+        price = self.columns["price"]
+        if not keys:
+            return [LeadsGroupStat(count=len(self), price_sum=int(price.sum()))]
+        if not len(self):
+            return []
+        groups, inverse = np.unique(
+            np.stack([self.columns[key] for key in keys], axis=1), axis=0, return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse, minlength=len(groups))
+        price_sums = np.zeros(len(groups), dtype=np.int64)
+        np.add.at(price_sums, inverse, price)
+
+        stats = []
+        for group, count, price_sum in zip(groups.tolist(), counts.tolist(), price_sums.tolist()):
+            values = dict(zip(keys, group))
+            pipeline = self.pipelines.get(values.get("pipeline_id"))
+            status = self.statuses.get((values.get("pipeline_id"), values.get("status_id")))
+            stats.append(
+                LeadsGroupStat(
+                    **values,
+                    pipeline_name=pipeline.name if pipeline is not None else None,
+                    status_name=status.name if status is not None else None,
+                    count=count,
+                    price_sum=price_sum,
+                )
+            )
+        return stats
+
+    def by_pipeline(self) -> List[LeadsGroupStat]:
+        return self.group_by("pipeline_id")
+
+    def by_status(self) -> List[LeadsGroupStat]:
+        return self.group_by("pipeline_id", "status_id")
+
+    def by_responsible(self) -> List[LeadsGroupStat]:
+        return self.group_by("pipeline_id", "status_id", "responsible_user_id")
+
+    def _stages(self, pipeline_id: int) -> List[PipelineStatusSchema]:
+        pipeline = self.pipelines.get(pipeline_id)
+        if pipeline is None:
+            raise ValueError(f"pipeline {pipeline_id} not found")
+        statuses = [status for status in pipeline.statuses or [] if status.id != LOST_STATUS_ID]
+        return sorted(statuses, key=lambda status: (status.sort or 0, status.id))
+
+    def funnel(self, pipeline_id: int, by_responsible: bool = False) -> List[FunnelStage]:
+        """
+        Воронка по текущим статусам сделок: reached этапа - сделки в нем и в любом следующем
+        (по sort статусов), conversion - доля дошедших с предыдущего этапа.
+        История переходов в сделках не хранится, поэтому нереализованные сделки (143)
+        считаются только на первом этапе - известно лишь, что они вошли в воронку.
+        by_responsible - отдельная воронка для каждого ответственного.
+        """
+        np = numpy
+        stages = self._stages(pipeline_id)
+        if not stages:
+            return []
+        in_pipeline = self.columns["pipeline_id"] == pipeline_id
+        status_ids = self.columns["status_id"][in_pipeline]
+        if by_responsible:
+            users, user_index = np.unique(self.columns["responsible_user_id"][in_pipeline], return_inverse=True)
+            user_index = user_index.reshape(-1)
+        else:
+            users, user_index = np.array([0]), np.zeros(len(status_ids), dtype=np.int64)
+
+        stage_ids = np.array([status.id for status in stages], dtype=np.int64)
+        order = np.argsort(stage_ids)
+        position = np.searchsorted(stage_ids[order], status_ids)
+        position = np.minimum(position, len(stage_ids) - 1)
+        known = stage_ids[order][position] == status_ids
+        stage_index = order[position]
+
+        # counts[пользователь, этап]
+        counts = np.bincount(
+            user_index[known] * len(stages) + stage_index[known], minlength=len(users) * len(stages)
+        ).reshape(len(users), len(stages))
+        reached = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1].copy()
+        lost = np.bincount(user_index[status_ids == LOST_STATUS_ID], minlength=len(users))
+        reached[:, 0] += lost
+
+        result = []
+        for row, user_id in enumerate(users.tolist()):
+            for column, status in enumerate(stages):
+                previous = int(reached[row, column - 1]) if column else 0
+                result.append(
+                    FunnelStage(
+                        pipeline_id=pipeline_id,
+                        status_id=status.id,
+                        status_name=status.name,
+                        responsible_user_id=user_id if by_responsible else None,
+                        count=int(counts[row, column]),
+                        reached=int(reached[row, column]),
+                        conversion=int(reached[row, column]) / previous if previous else None,
+                    )
+                )
+        return result
+
+    def win_rate(self, pipeline_id: Optional[int] = None) -> Optional[float]:
+        """Доля успешных (142) среди закрытых сделок, по воронке или по всем"""
+        status_ids = self.columns["status_id"]
+        if pipeline_id is not None:
+            status_ids = status_ids[self.columns["pipeline_id"] == pipeline_id]
+        won = int((status_ids == WON_STATUS_ID).sum())
+        closed = won + int((status_ids == LOST_STATUS_ID).sum())
+        return won / closed if closed else None
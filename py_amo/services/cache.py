@@ -0,0 +1,149 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+from .parsing import dumps, loads
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище кэша ответов. Значения - строки (JSON ответа), ttl - в секундах.
+    Ключи начинаются с "subdomain:entity_type:", по этому префиксу кэш сбрасывается.
+
+    BLOCKING - методы ждут сеть или диск. Такое хранилище блокировало бы цикл событий,
+    поэтому AsyncAmoSession его не принимает.
+    """
+
+    BLOCKING = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU-кэш в памяти процесса: не больше maxsize записей, устаревшие записи удаляются при чтении"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._items if key.startswith(prefix)]:
+                del self._items[key]
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Общий кэш для нескольких процессов и машин. client - синхронный клиент redis-py
+    (или совместимый: get, set(ex=), scan_iter, delete). Пакет redis ставится отдельно.
+
+    Только для AmoSession: вызовы синхронного клиента остановили бы цикл событий AsyncAmoSession.
+    """
+
+    BLOCKING = True
+
+    def __init__(self, client, namespace: str = "py_amo"):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self._key(key))
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key: str, value: str, ttl: float):
+        self.client.set(self._key(key), value, ex=max(int(ttl), 1))
+
+    def delete_prefix(self, prefix: str):
+        keys = list(self.client.scan_iter(match=f"{self._key(prefix)}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ResponseCache:
+    """
+    Read-through кэш GET-ответов справочных сущностей, общий для всех репозиториев сессии.
+
+    - ttl - время жизни записей по entity_type. Сущности без ttl (сделки, контакты и т.п.)
+      не кэшируются, 0 отключает кэш для типа. Заданные значения дополняют DEFAULT_TTL.
+    - backend - где хранить записи. По умолчанию LRU в памяти на maxsize записей,
+      для общего кэша нескольких воркеров - RedisCacheBackend.
+
+    Создание, изменение и удаление сущностей через репозитории сессии сбрасывает кэш их типа.
+    Чтобы отключить кэш полностью, передайте ResponseCache(ttl=ResponseCache.DISABLED).
+    """
+
+    DEFAULT_TTL = {
+        "account": 3600,
+        "pipelines": 300,
+        "statuses": 300,
+        "users": 600,
+        "sources": 600,
+    }
+    DISABLED = {entity_type: 0 for entity_type in DEFAULT_TTL}
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[Dict[str, float]] = None,
+        maxsize: int = 1024,
+    ):
+        self.backend = backend if backend is not None else MemoryCacheBackend(maxsize)
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+
+    def get_ttl(self, entity_type: str) -> float:
+        return self.ttl.get(entity_type, 0)
+
+    @staticmethod
+    def make_key(subdomain: str, entity_type: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return f"{subdomain}:{entity_type}:{url}?{query}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        return loads(value) if value is not None else None
+
+    def set(self, key: str, data: Any, ttl: float):
+        self.backend.set(key, dumps(data), ttl)
+
+    def invalidate(self, subdomain: str, entity_type: str):
+        self.backend.delete_prefix(f"{subdomain}:{entity_type}:")
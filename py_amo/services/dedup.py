@@ -0,0 +1,205 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from py_amo.schemas.duplicate_cluster_schema import DuplicateCluster
+from py_amo.utils.normalizers import normalize_phone, normalize_email, normalize_name
+
+
+class DedupIndex(ABC):
+    """
+    Хеш-индекс "ключ -> первая сущность с этим ключом" для поиска дублей.
+    payload - дополнительные данные первой сущности (например, нормализованное имя для нечеткого сравнения).
+    """
+
+    @abstractmethod
+    def setdefault(self, key: str, entity_id: int, payload: str = "") -> Optional[Tuple[int, str]]:
+        """Запомнить entity_id под key, если ключа еще нет. Если есть - вернуть (entity_id, payload) первой сущности"""
+
+    def close(self):
+        pass
+
+
+class MemoryDedupIndex(DedupIndex):
+    """Индекс в памяти процесса. Памяти нужно на каждый уникальный телефон, email и имя"""
+
+    def __init__(self):
+        self._items: Dict[str, Tuple[int, str]] = {}
+
+    def setdefault(self, key: str, entity_id: int, payload: str = "") -> Optional[Tuple[int, str]]:
+        existing = self._items.get(key)
+        if existing is None:
+            self._items[key] = (entity_id, payload)
+        return existing
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SQLiteDedupIndex(DedupIndex):
+    """
+    Индекс в файле SQLite для очень больших аккаунтов: в памяти не держится ничего, кроме кэша страниц SQLite.
+    Вставки фиксируются пачками по commit_every.
+    """
+
+    def __init__(self, path: str, commit_every: int = 10000):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS dedup_keys (key TEXT PRIMARY KEY, entity_id INTEGER NOT NULL, payload TEXT)"
+        )
+
+    def setdefault(self, key: str, entity_id: int, payload: str = "") -> Optional[Tuple[int, str]]:
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO dedup_keys (key, entity_id, payload) VALUES (?, ?, ?)",
+                (key, entity_id, payload),
+            )
+            if cursor.rowcount:
+                self._pending += 1
+                if self._pending >= self.commit_every:
+                    self._connection.commit()
+                    self._pending = 0
+                return None
+            row = self._connection.execute(
+                "SELECT entity_id, payload FROM dedup_keys WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0], row[1] or ""
+
+    def close(self):
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+
+class DuplicateFinder:
+    """
+    Потоковый поиск дублей контактов и компаний.
+
+    Для каждой сущности считаются ключи: нормализованные телефоны ("phone:9001234567"),
+    email ("email:a@b.ru") и, если задан name_similarity, имя. Сущности с общим ключом объединяются
+    в кластеры (union-find), кластер отдается каждый раз, когда он появился или вырос.
+
+    Сами сущности в памяти не держатся: индекс ключей - в index (для миллионов записей - SQLiteDedupIndex),
+    union-find - только по id, у которых нашлись дубли.
+
+    name_similarity - порог похожести имен от 0 до 1 (difflib). Имена сравниваются только внутри блока -
+    с первой сущностью, у которой совпадают первые name_block_size букв каждого слова.
+    """
+
+    def __init__(
+        self,
+        entity_type: str = "contacts",
+        index: Optional[DedupIndex] = None,
+        name_similarity: Optional[float] = None,
+        name_block_size: int = 3,
+        phone_field_code: str = "PHONE",
+        email_field_code: str = "EMAIL",
+    ):
+        self.entity_type = entity_type
+        self.index = index if index is not None else MemoryDedupIndex()
+        self.name_similarity = name_similarity
+        self.name_block_size = name_block_size
+        self.phone_field_code = phone_field_code
+        self.email_field_code = email_field_code
+        self._parent: Dict[int, int] = {}
+        self._members: Dict[int, List[int]] = {}
+        self._keys: Dict[int, List[str]] = {}
+
+    def _field_values(self, entity, field_code: str) -> Iterator[Any]:
+        field = entity.cf.by_code(field_code)
+        for value in (field.values if field is not None else None) or []:
+            if value.value:
+                yield value.value
+
+    def entity_keys(self, entity) -> Iterator[Tuple[str, str]]:
+        """Ключи сущности для индекса: (ключ, payload)"""
+        for phone in self._field_values(entity, self.phone_field_code):
+            phone = normalize_phone(phone)
+            if phone:
+                yield f"phone:{phone}", ""
+        for email in self._field_values(entity, self.email_field_code):
+            email = normalize_email(email)
+            if email:
+                yield f"email:{email}", ""
+        if self.name_similarity is not None and entity.name:
+            name = normalize_name(entity.name)
+            if name:
+                block = " ".join(word[: self.name_block_size] for word in name.split())
+                yield f"name:{block}", name
+
+    def _find(self, entity_id: int) -> int:
+        root = entity_id
+        while self._parent.get(root, root) != root:
+            root = self._parent[root]
+        while entity_id != root:
+            next_id = self._parent[entity_id]
+            self._parent[entity_id] = root
+            entity_id = next_id
+        return root
+
+    def _union(self, first_id: int, second_id: int, key: str) -> int:
+        first_root, second_root = self._find(first_id), self._find(second_id)
+        if first_root == second_root:
+            return first_root
+        # Меньший кластер присоединяется к большему
+        if len(self._members.get(first_root, ())) < len(self._members.get(second_root, ())):
+            first_root, second_root = second_root, first_root
+        self._parent.setdefault(first_root, first_root)
+        self._parent[second_root] = first_root
+        self._members.setdefault(first_root, [first_root]).extend(self._members.pop(second_root, [second_root]))
+        keys = self._keys.setdefault(first_root, [])
+        keys.extend(self._keys.pop(second_root, []))
+        if key not in keys:
+            keys.append(key)
+        return first_root
+
+    def _cluster(self, root: int) -> DuplicateCluster:
+        return DuplicateCluster(
+            entity_type=self.entity_type,
+            ids=sorted(self._members[root]),
+            keys=list(self._keys.get(root, [])),
+        )
+
+    def add(self, entity) -> Optional[DuplicateCluster]:
+        """Добавить сущность. Если она оказалась дублем - вернуть ее кластер"""
+        root = None
+        for key, payload in self.entity_keys(entity):
+            existing = self.index.setdefault(key, entity.id, payload)
+            if existing is None or existing[0] == entity.id:
+                continue
+            existing_id, existing_payload = existing
+            if payload:
+                if SequenceMatcher(None, payload, existing_payload).ratio() < self.name_similarity:
+                    continue
+                key = f"name:{existing_payload}"
+            root = self._union(existing_id, entity.id, key)
+        return self._cluster(self._find(root)) if root is not None else None
+
+    def feed(self, entities: Iterable[Any]) -> Iterator[DuplicateCluster]:
+        """Добавить сущности по одной, отдавая кластеры по мере появления и роста"""
+        for entity in entities:
+            cluster = self.add(entity)
+            if cluster is not None:
+                yield cluster
+
+    def scan(self, repository, **kwargs) -> Iterator[DuplicateCluster]:
+        """Обойти коллекцию репозитория (iter_all) и отдавать кластеры по мере обхода"""
+        self.entity_type = repository.get_entity_type()
+        yield from self.feed(repository.iter_all(**kwargs))
+
+    async def ascan(self, repository, **kwargs) -> AsyncIterator[DuplicateCluster]:
+        """Асинхронный аналог scan для репозиториев AsyncAmoSession"""
+        self.entity_type = repository.get_entity_type()
+        async for entity in repository.aiter_all(**kwargs):
+            cluster = self.add(entity)
+            if cluster is not None:
+                yield cluster
+
+    def clusters(self) -> List[DuplicateCluster]:
+        """Итоговые кластеры дублей"""
+        return [self._cluster(root) for root in self._members]
@@ -0,0 +1,251 @@
+import json
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, Union, get_args, get_origin
+from pydantic import BaseModel
+from .parsing import UNION_TYPES, _model_fields
+
+try:
+    import numpy
+except ImportError:  # numpy и pyarrow - необязательные зависимости: pip install py-amo-client[export]
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def _exact_int(value: Any) -> int:
+    """Целое без потери точности: 2000.0 и "2000" приводятся, 1999.99 - нет (ValueError)"""
+    result = int(value)
+    if not isinstance(value, str) and result != value:
+        raise ValueError(f"{value!r} is not an integer")
+    return result
+
+
+# Тип колонки -> (typecode array.array, dtype numpy, приведение значения)
+NUMERIC_KINDS = {
+    int: ("q", "int64", _exact_int),
+    float: ("d", "float64", float),
+    bool: ("b", "bool", bool),
+}
+
+
+def _to_text(value: Any) -> Optional[str]:
+    """Значение колонки объектов как строка Arrow: строки - как есть, остальное - JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _require(module, name: str):
+    if module is None:
+        raise ImportError(f"{name} is required for export: pip install py-amo-client[export]")
+    return module
+
+
+def _column_kind(annotation: Any) -> Optional[type]:
+    """int, float или bool для числовых полей схемы, None - для всех остальных (колонка объектов)"""
+    if get_origin(annotation) in UNION_TYPES:
+        kinds = {_column_kind(arg) for arg in get_args(annotation) if arg is not type(None)}
+        return kinds.pop() if len(kinds) == 1 else None
+    return annotation if annotation in NUMERIC_KINDS else None
+
+
+class ExportColumn:
+    """
+    Буфер одной колонки. Числовые значения копятся в array.array (8 байт на значение
+    вместо объекта Python), пропуски отмечаются в validity. Остальные значения - в списке.
+    Значение, которое не приводится к типу числовой колонки без потерь (строка "abc",
+    дробное число в целой колонке), записывается пропуском, а не обрезается.
+
+    Тип колонки в Arrow определяется только ее kind, а не значениями: колонка объектов всегда строковая
+    (не строки - в JSON), поэтому у всех частей выгрузки одна схема, даже если доп. поле
+    в одной части пришло числом, а в другой - строкой.
+    """
+
+    __slots__ = ("kind", "values", "validity")
+
+    def __init__(self, kind: Optional[type] = None):
+        self.kind = kind
+        self.values = array(NUMERIC_KINDS[kind][0]) if kind is not None else []
+        self.validity = bytearray()
+
+    def append(self, value: Any):
+        if value is not None:
+            try:
+                self.values.append(value)
+                self.validity.append(1)
+                return
+            except (TypeError, OverflowError):
+                pass
+            try:
+                # Например, число, пришедшее строкой
+                self.values.append(NUMERIC_KINDS[self.kind][2](value))
+                self.validity.append(1)
+                return
+            except (TypeError, ValueError, OverflowError):
+                # Значение, которое не приводится к типу колонки, записывается пропуском
+                pass
+        self.validity.append(0)
+        self.values.append(0 if self.kind is not None else None)
+
+    def __len__(self):
+        return len(self.validity)
+
+    def to_numpy(self, fill_value: Any = 0):
+        np = _require(numpy, "numpy")
+        if self.kind is None:
+            result = np.empty(len(self.values), dtype=object)
+            result[:] = self.values
+            return result
+        # Копия: пока numpy держит буфер array.array, тот нельзя дописывать
+        result = np.frombuffer(self.values, dtype=NUMERIC_KINDS[self.kind][1]).copy()
+        if fill_value != 0:
+            result[self.null_mask()] = fill_value
+        return result
+
+    def null_mask(self):
+        np = _require(numpy, "numpy")
+        return np.frombuffer(self.validity, dtype=np.uint8) == 0
+
+    def arrow_type(self):
+        pa = _require(pyarrow, "pyarrow")
+        return pa.from_numpy_dtype(NUMERIC_KINDS[self.kind][1]) if self.kind is not None else pa.string()
+
+    def to_arrow(self):
+        pa = _require(pyarrow, "pyarrow")
+        if self.kind is None:
+            return pa.array([_to_text(value) for value in self.values], type=pa.string())
+        mask = self.null_mask()
+        return pa.array(self.to_numpy(), type=self.arrow_type(), mask=mask if mask.any() else None)
+
+
+class ColumnarExport:
+    """
+    Колоночная выгрузка сущностей без сборки схем: сырые словари страниц API
+    сразу раскладываются по буферам колонок.
+
+    - columns - поля сущности верхнего уровня (price, status_id, created_at...).
+      Тип колонки берется из аннотации поля в schema_class: int, float и bool хранятся
+      компактно, остальное - как объекты Python.
+    - custom_fields - доп. поля как колонки: {имя колонки: field_id или field_code}.
+      В колонку попадает первое значение поля (value).
+
+    Результат - словарь массивов NumPy (to_numpy), таблица Arrow (to_arrow) или файл Parquet (write_parquet).
+    Схема Arrow (arrow_schema) задается колонками, а не данными: в to_numpy колонки объектов
+    хранят значения как есть, в Arrow и Parquet - строками.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        custom_fields: Optional[Dict[str, Union[int, str]]] = None,
+        schema_class: Optional[Type[BaseModel]] = None,
+    ):
+        fields = _model_fields(schema_class) if schema_class is not None else {}
+        self.columns: Dict[str, ExportColumn] = {}
+        for name in columns:
+            field = fields.get(name)
+            annotation = (getattr(field, "annotation", None) or field.outer_type_) if field is not None else None
+            self.columns[name] = ExportColumn(_column_kind(annotation))
+        self._scalar_columns = list(self.columns.items())
+        self.custom_fields = dict(custom_fields or {})
+        self._custom_columns: Dict[Union[int, str], List[ExportColumn]] = {}
+        for name, field_key in self.custom_fields.items():
+            if name in self.columns:
+                raise ValueError(f"column {name} is both an entity field and a custom field")
+            column = self.columns[name] = ExportColumn()
+            self._custom_columns.setdefault(field_key, []).append(column)
+
+    def add(self, item: Dict[str, Any]):
+        """Добавить одну сущность - словарь из ответа API"""
+        for name, column in self._scalar_columns:
+            column.append(item.get(name))
+        if not self._custom_columns:
+            return
+        values = {}
+        for field in item.get("custom_fields_values") or ():
+            field_values = field.get("values") or ()
+            value = field_values[0].get("value") if field_values else None
+            values[field.get("field_id")] = values[field.get("field_code")] = value
+        for field_key, columns in self._custom_columns.items():
+            value = values.get(field_key)
+            for column in columns:
+                column.append(value)
+
+    def add_page(self, items: Iterable[Dict[str, Any]]):
+        for item in items:
+            self.add(item)
+
+    def clear(self):
+        """Очистить буферы, сохранив набор колонок"""
+        for column in self.columns.values():
+            column.values = array(column.values.typecode) if column.kind is not None else []
+            column.validity = bytearray()
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def to_numpy(self, fill_value: Any = 0) -> Dict[str, Any]:
+        """
+        Колонки как массивы NumPy. Пропуски в числовых колонках заменяются на fill_value,
+        маска пропусков - ExportColumn.null_mask() (self.columns[имя].null_mask())
+        """
+        return {name: column.to_numpy(fill_value) for name, column in self.columns.items()}
+
+    def arrow_schema(self):
+        """Схема Arrow выгрузки: одна и та же для любых данных"""
+        pa = _require(pyarrow, "pyarrow")
+        return pa.schema([(name, column.arrow_type()) for name, column in self.columns.items()])
+
+    def to_arrow(self):
+        """Колонки как pyarrow.Table со схемой arrow_schema, пропуски - null"""
+        pa = _require(pyarrow, "pyarrow")
+        return pa.table([column.to_arrow() for column in self.columns.values()], schema=self.arrow_schema())
+
+    def write_parquet(self, path: str, **kwargs):
+        """Записать выгрузку в файл Parquet. kwargs передаются в pyarrow.parquet.write_table"""
+        _require(pyarrow, "pyarrow")
+        pyarrow.parquet.write_table(self.to_arrow(), path, **kwargs)
+
+
+class ParquetExportWriter:
+    """
+    Потоковая запись выгрузки в Parquet: когда в буфере набирается row_group_size строк,
+    они пишутся отдельной группой строк и буфер очищается. В памяти держится не больше одной группы.
+    """
+
+    def __init__(self, export: ColumnarExport, path: str, row_group_size: int = 100_000, **kwargs):
+        _require(pyarrow, "pyarrow")
+        self.export = export
+        self.path = path
+        self.row_group_size = row_group_size
+        self.writer_kwargs = kwargs
+        self.rows = 0
+        self._writer = None
+
+    def add_page(self, items: Iterable[Dict[str, Any]]):
+        self.export.add_page(items)
+        if len(self.export) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not len(self.export):
+            return
+        table = self.export.to_arrow()
+        if self._writer is None:
+            # Схема файла - схема колонок выгрузки, а не первой группы строк
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, self.export.arrow_schema(), **self.writer_kwargs)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        self.export.clear()
+
+    def close(self) -> int:
+        """Дописать остаток и закрыть файл. Возвращает количество записанных строк"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.rows
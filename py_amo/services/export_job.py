@@ -0,0 +1,463 @@
+import asyncio
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+from .export import _require, pyarrow
+from .pagination import is_last_page
+from .parsing import dumps, loads
+from .slicing import TimeSlicer, Window, add_range, missing_ranges
+from py_amo.utils.date_utils import now_timestamp, to_timestamp
+
+
+class ExportSink(ABC):
+    """
+    Приемник выгрузки: получает сущности страницами (словари ответа API).
+
+    Состояние приемника (например, сколько байт файла уже записано) сохраняется в чекпоинте задачи.
+    При продолжении задачи open получает это состояние и отбрасывает все, что было записано после него,
+    поэтому после падения данные не дублируются.
+    """
+
+    def open(self, repository, state: Optional[Dict[str, Any]]):
+        """Подготовиться к записи. state - состояние из чекпоинта или None для новой задачи"""
+
+    @abstractmethod
+    def write(self, items: List[Dict[str, Any]]):
+        """Записать страницу сущностей"""
+
+    def seen_ids(self) -> Iterable[int]:
+        """
+        id сущностей, записанных до перезапуска (после open). По ним продолжение выгрузки по окнам
+        отсеивает повторы. По умолчанию приемник их не знает
+        """
+        return ()
+
+    def flush(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Сохранить записанное надежно и вернуть состояние для чекпоинта.
+        None - часть записанного еще в буфере (приемник копит данные), чекпоинт пока не сдвигается.
+        force - сохранить буфер в любом случае
+        """
+        return {}
+
+    def close(self):
+        pass
+
+
+class JSONLSink(ExportSink):
+    """Файл JSON Lines: одна сущность на строку. В чекпоинте - длина уже записанной части файла"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def open(self, repository, state: Optional[Dict[str, Any]]):
+        offset = (state or {}).get("offset", 0)
+        if offset and os.path.exists(self.path):
+            self._file = open(self.path, "r+b")
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        else:
+            self._file = open(self.path, "wb")
+
+    def write(self, items: List[Dict[str, Any]]):
+        self._file.write("".join(dumps(item) + "\n" for item in items).encode("utf-8"))
+
+    def seen_ids(self) -> Iterable[int]:
+        offset = self._file.tell()
+        if not offset:
+            return ()
+        self._file.seek(0)
+        try:
+            return [loads(line).get("id") for line in self._file.read(offset).splitlines() if line]
+        finally:
+            self._file.seek(offset)
+
+    def flush(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {"offset": self._file.tell()}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink(ExportSink):
+    """
+    Каталог файлов Parquet part-00000.parquet, part-00001.parquet... по rows_per_file строк
+    (колоночная выгрузка, см. ColumnarExport). В чекпоинте - количество готовых файлов.
+    Все части пишутся с одной схемой - ColumnarExport.arrow_schema, поэтому каталог читается
+    как один набор данных (pyarrow.dataset.dataset(directory)). Нужен pip install py-amo-client[export]
+    """
+
+    PART_PATTERN = re.compile(r"part-(\d+)\.parquet$")
+
+    def __init__(
+        self,
+        directory: str,
+        columns: Optional[Sequence[str]] = None,
+        custom_fields: Optional[Dict[str, Union[int, str]]] = None,
+        rows_per_file: int = 100_000,
+    ):
+        self.directory = directory
+        self.columns = columns
+        self.custom_fields = custom_fields
+        self.rows_per_file = rows_per_file
+        self._parts = 0
+        self._export = None
+        self._schema = None
+
+    def open(self, repository, state: Optional[Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        self._parts = (state or {}).get("parts", 0)
+        for name in os.listdir(self.directory):
+            match = self.PART_PATTERN.match(name)
+            if match and int(match.group(1)) >= self._parts:
+                os.remove(os.path.join(self.directory, name))
+        self._export = repository._new_export(self.columns, self.custom_fields)
+        self._schema = self._export.arrow_schema()
+        pa = _require(pyarrow, "pyarrow")
+        for part in range(self._parts):
+            # Готовые части с другой схемой (другие колонки или старая версия) не продолжаются
+            if not pa.parquet.read_schema(self._part_path(part)).remove_metadata().equals(self._schema):
+                raise ValueError(f"{self._part_path(part)} has another schema: reset the export job")
+
+    def _part_path(self, part: int) -> str:
+        return os.path.join(self.directory, f"part-{part:05d}.parquet")
+
+    def write(self, items: List[Dict[str, Any]]):
+        self._export.add_page(items)
+
+    def seen_ids(self) -> Iterable[int]:
+        if "id" not in self._export.columns:
+            return ()
+        pa = _require(pyarrow, "pyarrow")
+        ids = []
+        for part in range(self._parts):
+            ids += pa.parquet.read_table(self._part_path(part), columns=["id"]).column("id").to_pylist()
+        return ids
+
+    def flush(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        if len(self._export) and (force or len(self._export) >= self.rows_per_file):
+            # to_arrow всегда отдает таблицу со схемой self._schema
+            pyarrow.parquet.write_table(self._export.to_arrow(), self._part_path(self._parts))
+            self._parts += 1
+            self._export.clear()
+        if len(self._export):
+            return None
+        return {"parts": self._parts}
+
+
+class CallbackSink(ExportSink):
+    """
+    Передает каждую страницу в callback(items). Откатить уже переданное нельзя,
+    поэтому после падения callback может получить последние страницы повторно,
+    а повторы по id отсеиваются только в пределах одного запуска
+    """
+
+    def __init__(self, callback: Callable[[List[Dict[str, Any]]], Any]):
+        self.callback = callback
+
+    def write(self, items: List[Dict[str, Any]]):
+        self.callback(items)
+
+
+class ExportJob:
+    """
+    Возобновляемая выгрузка коллекции репозитория в приемник (JSONLSink, ParquetSink, CallbackSink).
+
+    Прогресс сохраняется в файл checkpoint_path (атомарно) каждый раз, когда приемник надежно сохранил
+    данные. Если выгрузка упала (сеть, RateLimitError после всех повторов, остановка процесса),
+    повторный run с тем же чекпоинтом продолжит с сохраненного места: готовые страницы и окна
+    заново не запрашиваются, а лишнее, записанное после чекпоинта, приемник отбрасывает.
+
+    - mode="pages" - страницы по номерам по порядку, прогресс - номер следующей страницы.
+    - mode="windows" - непересекающиеся окна по field (created_at или updated_at), как в iter_sliced:
+      до concurrency окон одновременно, прогресс - склеенные отрезки времени, данные которых сохранены
+      (их немного при любом числе окон). Окно, не уместившееся в страницу, не пишется, а делится
+      на splits частей. Границы (from_date или самая ранняя сущность, to_date или момент первого запуска)
+      хранятся в чекпоинте. Как и в iter_sliced, каждая id пишется один раз, а для updated_at без to_date
+      в конце выгружается окно до текущего момента - сущности, измененные во время выгрузки.
+
+    params - фильтры, как у get_all. Чекпоинт привязан к репозиторию, режиму и фильтрам:
+    чужой чекпоинт вызовет ValueError. Завершенная задача при повторном run ничего не запрашивает,
+    начать заново - reset().
+    """
+
+    MODES = ("pages", "windows")
+
+    def __init__(
+        self,
+        repository,
+        sink: ExportSink,
+        checkpoint_path: str,
+        mode: str = "windows",
+        field: str = "created_at",
+        from_date: Optional[Union[datetime, int]] = None,
+        to_date: Optional[Union[datetime, int]] = None,
+        window: Optional[int] = None,
+        concurrency: int = 4,
+        splits: int = 4,
+        **params,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}")
+        self.repository = repository
+        self.sink = sink
+        self.checkpoint_path = checkpoint_path
+        self.mode = mode
+        self.concurrency = concurrency
+        self.params = params
+        self.options = {
+            "mode": mode,
+            "field": field,
+            "from_date": to_timestamp(from_date),
+            "to_date": to_timestamp(to_date),
+            "window": window,
+            "splits": splits,
+        }
+        self.state: Optional[Dict[str, Any]] = None
+        self._unflushed: List[Window] = []
+        self._pending_rows = 0
+        self._next_page = 1
+
+    def _signature(self) -> Dict[str, Any]:
+        signature = {
+            "url": self.repository.get_base_url(),
+            "options": self.options,
+            "params": self.params,
+        }
+        return json.loads(json.dumps(signature, sort_keys=True, default=str))
+
+    def _needs_floor(self) -> bool:
+        return self.mode == "windows" and self.options["from_date"] is None
+
+    def _new_state(self, floor: Optional[int] = None) -> Dict[str, Any]:
+        """floor - отметка самой ранней сущности, если from_date не задан (см. TimeSlicer.plan_windows)"""
+        state = {"signature": self._signature(), "rows": 0, "sink": None, "done": False}
+        if self.mode == "pages":
+            state["next_page"] = 1
+            return state
+        state["range"] = [self.options["from_date"] or 0, self.options["to_date"] or now_timestamp()]
+        state["floor"] = floor
+        state["completed"] = []
+        state["caught_up"] = False
+        return state
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Состояние из чекпоинта или None, если чекпоинта нет"""
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        if state.get("signature") != self._signature():
+            raise ValueError(f"checkpoint {self.checkpoint_path} belongs to another export")
+        return state
+
+    def _save(self):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reset(self):
+        """Удалить чекпоинт: следующий run начнет выгрузку с начала"""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.state = None
+
+    @property
+    def done(self) -> bool:
+        return bool(self.state and self.state["done"])
+
+    def _commit(self, progress: Dict[str, Any], force: bool = False):
+        """Сбросить приемник и, если он сохранил все записанное, сдвинуть чекпоинт"""
+        sink_state = self.sink.flush(force)
+        if sink_state is None:
+            return
+        self.state.update(progress, sink=sink_state, rows=self.state["rows"] + self._pending_rows)
+        self._pending_rows = 0
+        for window in self._unflushed:
+            add_range(self.state["completed"], window)
+        self._unflushed.clear()
+        self._save()
+
+    def _write(self, items: List[Dict[str, Any]]):
+        if items:
+            self.sink.write(items)
+            self._pending_rows += len(items)
+
+    def _start(self, state: Dict[str, Any]) -> bool:
+        self.state = state
+        if self.state["done"]:
+            return False
+        self.sink.open(self.repository, self.state["sink"])
+        self._unflushed = []
+        self._pending_rows = 0
+        self._next_page = self.state.get("next_page", 1)
+        return True
+
+    def _pending_windows(self) -> List[Window]:
+        """Окна для еще не сохраненных частей промежутка выгрузки"""
+        start, end = self.state["range"]
+        floor = self.state["floor"]
+        windows = []
+        for gap_start, gap_end in missing_ranges(start, end, self.state["completed"]):
+            windows += TimeSlicer.plan_windows(
+                gap_start, gap_end, self.options["window"], self.concurrency, floor if floor and floor > gap_start else None
+            )
+        return windows
+
+    def _new_slicer(self) -> TimeSlicer:
+        slicer = TimeSlicer(self.options["field"], self._pending_windows(), self.options["splits"])
+        # Повторы по id отсеиваются и с записанным до перезапуска
+        slicer.mark_seen(self.sink.seen_ids())
+        return slicer
+
+    def _catch_up(self, slicer: TimeSlicer) -> bool:
+        """
+        Для updated_at без to_date - один раз расширить промежуток до текущего момента, как iter_sliced.
+        Новая граница сохраняется в чекпоинте вместе с первыми готовыми окнами
+        """
+        if self.options["field"] != "updated_at" or self.options["to_date"] is not None or self.state["caught_up"]:
+            return False
+        self.state["caught_up"] = True
+        now = now_timestamp()
+        if now <= self.state["range"][1]:
+            return False
+        self.state["range"][1] = now
+        slicer.windows.extend(self._pending_windows())
+        return True
+
+    def _progress(self) -> Dict[str, Any]:
+        return {"next_page": self._next_page} if self.mode == "pages" else {}
+
+    def _commit_on_error(self):
+        # Сохранить то, что уже получено. Ошибку самого приемника здесь не поднимаем -
+        # важнее исходная ошибка выгрузки
+        try:
+            self._commit(self._progress(), force=True)
+        except Exception:
+            pass
+
+    def _finish(self):
+        self._commit({}, force=True)
+        self.state["done"] = True
+        self._save()
+
+    def _complete_window(self, slicer: TimeSlicer, window: Window, items: List[Dict[str, Any]], children: List[Window]):
+        if children:
+            # Данные переполненного окна придут из его частей
+            slicer.windows.extend(children)
+            return
+        self._write(slicer.unique(items))
+        self._unflushed.append(window)
+
+    def _page_params(self, page: int) -> Dict[str, Any]:
+        return {**self.params, "page": page, "limit": self.repository.MAX_LIMIT}
+
+    def run(self) -> int:
+        """Выполнить или продолжить выгрузку через синхронный репозиторий. Возвращает количество строк"""
+        state = self.load()
+        if state is None:
+            floor = self.repository._oldest_timestamp(self.options["field"], self.params) if self._needs_floor() else None
+            state = self._new_state(floor)
+        if not self._start(state):
+            return self.state["rows"]
+        try:
+            if self.mode == "pages":
+                self._run_pages()
+            else:
+                self._run_windows()
+            self._finish()
+        except BaseException:
+            self._commit_on_error()
+            raise
+        finally:
+            self.sink.close()
+        return self.state["rows"]
+
+    def _run_pages(self):
+        while True:
+            data, items = self.repository._get_entities(self._page_params(self._next_page), True, "Export job page")
+            self._write(items)
+            self._next_page += 1
+            last = is_last_page(data, len(items), self.repository.MAX_LIMIT)
+            self._commit(self._progress(), force=last)
+            if last:
+                return
+
+    def _run_windows(self):
+        slicer = self._new_slicer()
+        executor = self.repository.amo_session.get_executor()
+        running = {}
+        try:
+            while slicer.windows or running or self._catch_up(slicer):
+                while slicer.windows and len(running) < self.concurrency:
+                    window = slicer.windows.popleft()
+                    running[executor.submit(self.repository._fetch_slice, slicer, window, self.params)] = window
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = running.pop(future)
+                    items, children = future.result()
+                    self._complete_window(slicer, window, items, children)
+                self._commit({})
+        finally:
+            for future in running:
+                future.cancel()
+
+    async def arun(self) -> int:
+        """Выполнить или продолжить выгрузку через асинхронный репозиторий. Возвращает количество строк"""
+        state = self.load()
+        if state is None:
+            floor = await self.repository._oldest_timestamp(self.options["field"], self.params) if self._needs_floor() else None
+            state = self._new_state(floor)
+        if not self._start(state):
+            return self.state["rows"]
+        try:
+            if self.mode == "pages":
+                await self._arun_pages()
+            else:
+                await self._arun_windows()
+            self._finish()
+        except BaseException:
+            self._commit_on_error()
+            raise
+        finally:
+            self.sink.close()
+        return self.state["rows"]
+
+    async def _arun_pages(self):
+        while True:
+            data, items = await self.repository._get_entities(self._page_params(self._next_page), True, "Export job page")
+            self._write(items)
+            self._next_page += 1
+            last = is_last_page(data, len(items), self.repository.MAX_LIMIT)
+            self._commit(self._progress(), force=last)
+            if last:
+                return
+
+    async def _arun_windows(self):
+        slicer = self._new_slicer()
+        running = {}
+        try:
+            while slicer.windows or running or self._catch_up(slicer):
+                while slicer.windows and len(running) < self.concurrency:
+                    window = slicer.windows.popleft()
+                    running[asyncio.ensure_future(self.repository._fetch_slice(slicer, window, self.params))] = window
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    window = running.pop(task)
+                    items, children = task.result()
+                    self._complete_window(slicer, window, items, children)
+                self._commit({})
+        finally:
+            for task in running:
+                task.cancel()
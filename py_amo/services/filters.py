@@ -16,6 +16,8 @@ class FilterOperator(Enum):
     NOT_IN = "not_in"
     LIKE = "like"
     NOT_LIKE = "not_like"
+    FROM = "from"
+    TO = "to"
 
 
 class FilterBuilder:
@@ -53,20 +55,20 @@ class FilterBuilder:
         """Фильтр по ответственному"""
         return self.add_filter("responsible_user_id", user_id)
     
-    def filter_by_created_at(self, from_date: datetime = None, to_date: datetime = None) -> 'FilterBuilder':
-        """Фильтр по дате создания"""
+    def filter_by_created_at(self, from_date: Union[datetime, int] = None, to_date: Union[datetime, int] = None) -> 'FilterBuilder':
+        """Фильтр по дате создания (datetime или timestamp, границы включительно)"""
         if from_date:
-            self.add_filter("created_at", from_date, FilterOperator.GREATER_THAN_OR_EQUAL)
+            self.add_filter("created_at", from_date, FilterOperator.FROM)
         if to_date:
-            self.add_filter("created_at", to_date, FilterOperator.LESS_THAN_OR_EQUAL)
+            self.add_filter("created_at", to_date, FilterOperator.TO)
         return self
     
-    def filter_by_updated_at(self, from_date: datetime = None, to_date: datetime = None) -> 'FilterBuilder':
-        """Фильтр по дате обновления"""
+    def filter_by_updated_at(self, from_date: Union[datetime, int] = None, to_date: Union[datetime, int] = None) -> 'FilterBuilder':
+        """Фильтр по дате обновления (datetime или timestamp, границы включительно)"""
         if from_date:
-            self.add_filter("updated_at", from_date, FilterOperator.GREATER_THAN_OR_EQUAL)
+            self.add_filter("updated_at", from_date, FilterOperator.FROM)
         if to_date:
-            self.add_filter("updated_at", to_date, FilterOperator.LESS_THAN_OR_EQUAL)
+            self.add_filter("updated_at", to_date, FilterOperator.TO)
         return self
     
     def filter_by_pipeline(self, pipeline_id: Union[int, List[int]]) -> 'FilterBuilder':
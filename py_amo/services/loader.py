@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class AsyncBatchLoader:
+    """
+    Объединение одиночных загрузок в пакетные запросы (в стиле DataLoader).
+
+    Ключи, запрошенные через load в одном проходе цикла событий, собираются вместе,
+    повторы схлопываются, затем split режет их на пачки и каждая пачка отправляется
+    одним вызовом batch_load. batch_load возвращает словарь ключ -> значение,
+    ключи без значения получают None. Ошибка пачки достается только ключам этой пачки.
+
+    on_dispatch вызывается, когда собранные ключи ушли в batch_load (например, чтобы забыть загрузчик).
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        split: Optional[Callable[[List[Hashable]], Iterable[List[Hashable]]]] = None,
+        on_dispatch: Optional[Callable[[], Any]] = None,
+    ):
+        self.batch_load = batch_load
+        self.split = split or (lambda keys: [keys])
+        self.on_dispatch = on_dispatch
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        # Отмена одного ожидающего не должна отменять загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        if self.on_dispatch is not None:
+            self.on_dispatch()
+        for keys in self.split(list(pending)):
+            asyncio.ensure_future(self._load_chunk({key: pending[key] for key in keys}))
+
+    async def _load_chunk(self, futures: Dict[Hashable, asyncio.Future]):
+        try:
+            results = await self.batch_load(list(futures))
+        except Exception as error:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(results.get(key))
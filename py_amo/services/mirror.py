@@ -0,0 +1,332 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional
+from py_amo.schemas import LeadSchema, ContactSchema, CompanySchema
+from py_amo.utils.normalizers import normalize_phone, normalize_email
+from .sync import CursorStore, MemoryCursorStore, SQLiteCursorStore, SyncCursor
+from py_amo.utils.date_utils import now_timestamp
+
+
+def _sql_value(value: Any) -> Any:
+    """Значение доп. поля для SQLite: составные значения (адрес, юр. лицо) - строкой JSON"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return value
+
+
+class SQLiteMirror:
+    """
+    Локальная копия сделок, контактов и компаний в SQLite.
+
+    Каждая сущность хранится строкой в таблице leads/contacts/companies: основные поля
+    отдельными колонками с индексами и полный JSON в колонке data. Значения custom_fields_values
+    разворачиваются в таблицу custom_field_values (по строке на значение) с индексами по полю и значению,
+    телефоны и email дополнительно хранятся в нормализованном виде.
+
+    Наполняется полной выгрузкой (fill / afill) и дальше обновляется инкрементальной
+    синхронизацией (refresh / arefresh), отметки которой по умолчанию хранятся в той же базе.
+    """
+
+    SCHEMAS = {
+        "leads": LeadSchema,
+        "contacts": ContactSchema,
+        "companies": CompanySchema,
+    }
+    COMMON_COLUMNS = ("name", "responsible_user_id", "group_id", "created_at", "updated_at", "closest_task_at")
+    COLUMNS = {
+        "leads": COMMON_COLUMNS + ("price", "status_id", "pipeline_id", "closed_at"),
+        "contacts": COMMON_COLUMNS + ("first_name", "last_name"),
+        "companies": COMMON_COLUMNS,
+    }
+    INDEXES = {
+        "leads": (("responsible_user_id",), ("updated_at",), ("pipeline_id", "status_id")),
+        "contacts": (("responsible_user_id",), ("updated_at",), ("name",)),
+        "companies": (("responsible_user_id",), ("updated_at",), ("name",)),
+    }
+    NORMALIZERS = {
+        "PHONE": normalize_phone,
+        "EMAIL": normalize_email,
+    }
+
+    def __init__(self, path: str = ":memory:", cursor_store: Optional[CursorStore] = None):
+        """
+        path - файл базы, ":memory:" - база в памяти процесса.
+        cursor_store - где хранить отметки refresh. По умолчанию таблица sync_cursors той же базы.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._create_tables()
+        if cursor_store is None:
+            cursor_store = MemoryCursorStore() if path == ":memory:" else SQLiteCursorStore(path)
+        self.cursor_store = cursor_store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _create_tables(self):
+        with self._lock, self._connection:
+            for entity_type, columns in self.COLUMNS.items():
+                column_defs = ", ".join(columns)
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {entity_type} "
+                    f"(id INTEGER PRIMARY KEY, {column_defs}, data TEXT NOT NULL)"
+                )
+                for index_columns in self.INDEXES[entity_type]:
+                    index_name = f"ix_{entity_type}_{'_'.join(index_columns)}"
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {entity_type} ({', '.join(index_columns)})"
+                    )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS custom_field_values ("
+                "entity_type TEXT NOT NULL, entity_id INTEGER NOT NULL, "
+                "field_id INTEGER, field_code TEXT, field_name TEXT, "
+                "enum_id INTEGER, enum_code TEXT, value, normalized TEXT)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cfv_entity ON custom_field_values (entity_type, entity_id)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cfv_field_value ON custom_field_values (entity_type, field_id, value)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cfv_code_normalized "
+                "ON custom_field_values (entity_type, field_code, normalized)"
+            )
+
+    def _check_entity_type(self, entity_type: str):
+        if entity_type not in self.SCHEMAS:
+            raise ValueError(f"Entity type '{entity_type}' is not mirrored, expected one of {list(self.SCHEMAS)}")
+
+    def _custom_field_rows(self, entity_type: str, entity_id: int, entity) -> List[tuple]:
+        rows = []
+        for field in entity.custom_fields_values or []:
+            normalize = self.NORMALIZERS.get(field.field_code)
+            for value in field.values or []:
+                normalized = normalize(value.value) if normalize and value.value is not None else None
+                rows.append(
+                    (
+                        entity_type,
+                        entity_id,
+                        field.field_id,
+                        field.field_code,
+                        field.field_name,
+                        value.enum_id,
+                        value.enum_code,
+                        _sql_value(value.value),
+                        normalized,
+                    )
+                )
+        return rows
+
+    def upsert(self, entity_type: str, entities: Iterable[Any]) -> int:
+        """Записать сущности (новые или обновленные) одной транзакцией. Возвращает кол-во записанных"""
+        self._check_entity_type(entity_type)
+        columns = self.COLUMNS[entity_type]
+        entity_rows = []
+        field_rows = []
+        for entity in entities:
+            if entity.id is None:
+                continue
+            data = json.dumps(entity.dict(by_alias=True), ensure_ascii=False)
+            entity_rows.append((entity.id, *(getattr(entity, column, None) for column in columns), data))
+            field_rows += self._custom_field_rows(entity_type, entity.id, entity)
+        if not entity_rows:
+            return 0
+
+        placeholders = ", ".join("?" * (len(columns) + 2))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {entity_type} (id, {', '.join(columns)}, data) VALUES ({placeholders})",
+                entity_rows,
+            )
+            self._connection.executemany(
+                "DELETE FROM custom_field_values WHERE entity_type = ? AND entity_id = ?",
+                [(entity_type, row[0]) for row in entity_rows],
+            )
+            self._connection.executemany(
+                "INSERT INTO custom_field_values VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                field_rows,
+            )
+        return len(entity_rows)
+
+    def delete(self, entity_type: str, entity_ids: Iterable[int]) -> None:
+        """Удалить сущности из копии, например после delete_many или по вебхуку об удалении"""
+        self._check_entity_type(entity_type)
+        params = [(entity_id,) for entity_id in entity_ids]
+        with self._lock, self._connection:
+            self._connection.executemany(f"DELETE FROM {entity_type} WHERE id = ?", params)
+            self._connection.executemany(
+                "DELETE FROM custom_field_values WHERE entity_type = ? AND entity_id = ?",
+                [(entity_type, entity_id) for (entity_id,) in params],
+            )
+
+    def get_sync_key(self, repository) -> str:
+        return f"mirror:{repository.get_sync_key()}"
+
+    @staticmethod
+    def _fill_cursor(entities: Iterable[Any], cursor: SyncCursor, started_at: int):
+        # Сущности, измененные после старта выгрузки, могли быть прочитаны до изменения -
+        # отметка ставится ниже старта, и refresh их перечитает
+        for entity in entities:
+            if entity.updated_at is not None and entity.updated_at < started_at:
+                cursor.advance(entity.id, entity.updated_at)
+
+    def _save_fill_cursor(self, repository, cursor: SyncCursor, kwargs: dict):
+        if any(key.startswith(("filter", "query")) for key in kwargs):
+            # Выгружена только часть коллекции - отметка для всей коллекции была бы неверной
+            return
+        key = self.get_sync_key(repository)
+        current = self.cursor_store.load(key)
+        if current is None or current.updated_at < cursor.updated_at:
+            self.cursor_store.save(key, cursor)
+
+    def fill(self, repository, **kwargs) -> int:
+        """
+        Полная выгрузка: постранично обойти коллекцию репозитория (LeadsRepository и т.п.)
+        и записать каждую страницу. kwargs передаются в iter_pages. Возвращает кол-во записанных сущностей.
+
+        После выгрузки ставится отметка refresh - наибольший updated_at среди сущностей, измененных
+        до старта выгрузки, поэтому первый refresh запрашивает только изменения. С фильтрами в kwargs
+        выгружается часть коллекции, и отметка не ставится.
+        """
+        entity_type = repository.get_entity_type()
+        self._check_entity_type(entity_type)
+        started_at = now_timestamp()
+        cursor = SyncCursor()
+        written = 0
+        for entities in repository.iter_pages(**kwargs):
+            written += self.upsert(entity_type, entities)
+            self._fill_cursor(entities, cursor, started_at)
+        self._save_fill_cursor(repository, cursor, kwargs)
+        return written
+
+    async def afill(self, repository, **kwargs) -> int:
+        """Асинхронный аналог fill для репозиториев AsyncAmoSession"""
+        entity_type = repository.get_entity_type()
+        self._check_entity_type(entity_type)
+        started_at = now_timestamp()
+        cursor = SyncCursor()
+        written = 0
+        async for entities in repository.aiter_pages(**kwargs):
+            written += self.upsert(entity_type, entities)
+            self._fill_cursor(entities, cursor, started_at)
+        self._save_fill_cursor(repository, cursor, kwargs)
+        return written
+
+    def refresh(self, repository, **kwargs) -> int:
+        """
+        Дозаписать сущности, измененные с прошлого refresh (через iter_changes репозитория).
+        Первый запуск без отметки выгружает всю коллекцию. Возвращает кол-во записанных сущностей.
+        """
+        entity_type = repository.get_entity_type()
+        self._check_entity_type(entity_type)
+        key = self.get_sync_key(repository)
+        written = 0
+        page = []
+        for entity in repository.iter_changes(self.cursor_store, key, **kwargs):
+            page.append(entity)
+            if len(page) == repository.MAX_LIMIT:
+                written += self.upsert(entity_type, page)
+                page = []
+        return written + self.upsert(entity_type, page)
+
+    async def arefresh(self, repository, **kwargs) -> int:
+        """Асинхронный аналог refresh для репозиториев AsyncAmoSession"""
+        entity_type = repository.get_entity_type()
+        self._check_entity_type(entity_type)
+        key = self.get_sync_key(repository)
+        written = 0
+        page = []
+        async for entity in repository.aiter_changes(self.cursor_store, key, **kwargs):
+            page.append(entity)
+            if len(page) == repository.MAX_LIMIT:
+                written += self.upsert(entity_type, page)
+                page = []
+        return written + self.upsert(entity_type, page)
+
+    def _load(self, entity_type: str, rows: Iterable[tuple]) -> List[Any]:
+        schema_class = self.SCHEMAS[entity_type]
+        return [schema_class(**json.loads(row[0])) for row in rows]
+
+    def get_by_id(self, entity_type: str, entity_id: int) -> Optional[Any]:
+        self._check_entity_type(entity_type)
+        with self._lock:
+            rows = self._connection.execute(f"SELECT data FROM {entity_type} WHERE id = ?", (entity_id,)).fetchall()
+        entities = self._load(entity_type, rows)
+        return entities[0] if entities else None
+
+    def count(self, entity_type: str) -> int:
+        self._check_entity_type(entity_type)
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {entity_type}").fetchone()[0]
+
+    def find(self, entity_type: str, **filters) -> List[Any]:
+        """
+        Сущности с заданными значениями колонок, например find("leads", pipeline_id=1, status_id=142).
+        Доступны колонки из COLUMNS, значение-список ищется через IN.
+        """
+        self._check_entity_type(entity_type)
+        conditions = []
+        params = []
+        for column, value in filters.items():
+            if column != "id" and column not in self.COLUMNS[entity_type]:
+                raise ValueError(f"Unknown column '{column}' for {entity_type}")
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params += value
+            else:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connection.execute(f"SELECT data FROM {entity_type}{where} ORDER BY id", params).fetchall()
+        return self._load(entity_type, rows)
+
+    def find_by_custom_field(
+        self,
+        entity_type: str,
+        value: Any,
+        field_id: Optional[int] = None,
+        field_code: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Сущности, у которых в поле field_id (или field_code) есть значение value.
+        Для полей PHONE и EMAIL сравнение идет по нормализованному значению.
+        """
+        self._check_entity_type(entity_type)
+        if field_id is None and field_code is None:
+            raise ValueError("field_id or field_code is required")
+        if field_code in self.NORMALIZERS:
+            condition = "field_code = ? AND normalized = ?"
+            params = [field_code, self.NORMALIZERS[field_code](value)]
+        elif field_id is not None:
+            condition = "field_id = ? AND value = ?"
+            params = [field_id, _sql_value(value)]
+        else:
+            condition = "field_code = ? AND value = ?"
+            params = [field_code, _sql_value(value)]
+        query = (
+            f"SELECT data FROM {entity_type} WHERE id IN ("
+            f"SELECT entity_id FROM custom_field_values WHERE entity_type = ? AND {condition}"
+            f") ORDER BY id"
+        )
+        with self._lock:
+            rows = self._connection.execute(query, [entity_type, *params]).fetchall()
+        return self._load(entity_type, rows)
+
+    def find_by_phone(self, phone: str, entity_type: str = "contacts") -> List[Any]:
+        """Сущности с телефоном phone в любом формате записи"""
+        return self.find_by_custom_field(entity_type, phone, field_code="PHONE")
+
+    def find_by_email(self, email: str, entity_type: str = "contacts") -> List[Any]:
+        return self.find_by_custom_field(entity_type, email, field_code="EMAIL")
@@ -0,0 +1,224 @@
+import asyncio
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import httpx
+from py_amo.schemas import AccountResult
+from .amo_session import AsyncAmoSession
+from .rate_limiter import RateLimiter
+
+Job = Callable[[AsyncAmoSession], Awaitable[Any]]
+StreamJob = Callable[[AsyncAmoSession], AsyncIterator[Any]]
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx, общий для сессий многих аккаунтов: один пул соединений на всех.
+    Закрытие отдельной сессии его не закрывает - он закрывается вместе с MultiAccountExecutor
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+class MultiAccountExecutor:
+    """
+    Одна и та же работа на многих аккаунтах amoCRM (например, у агентства с сотнями клиентов).
+
+    - У каждого аккаунта своя AsyncAmoSession со своим лимитером: лимит amoCRM считается на аккаунт.
+    - Задачи аккаунтов стоят в отдельных очередях и запускаются по кругу, поэтому аккаунт
+      с большим количеством задач не задерживает остальные.
+    - concurrency - сколько задач выполняется одновременно на всех аккаунтах,
+      per_account - на одном аккаунте.
+    - max_connections - общий предел открытых соединений: сессии, созданные через add_account,
+      используют один пул соединений httpx.
+    - processes - размер пула процессов для CPU-тяжелой обработки (run_cpu), 0 - без пула.
+      С parse_pages=True в этом же пуле разбираются страницы ответов всех сессий (parse_executor).
+
+    Результаты отдаются по мере готовности как AccountResult с subdomain аккаунта.
+    Ошибка задачи не прерывает остальные, а попадает в AccountResult.error.
+    """
+
+    def __init__(
+        self,
+        accounts: Iterable[Tuple[str, str]] = (),
+        concurrency: int = 16,
+        per_account: int = 1,
+        max_connections: int = 64,
+        processes: int = 0,
+        parse_pages: bool = False,
+        http2: bool = False,
+        rate_limiter_factory: Callable[[], RateLimiter] = RateLimiter,
+        **session_kwargs,
+    ):
+        """
+        accounts - пары (token, subdomain), как у AsyncAmoSession(token, subdomain).
+        rate_limiter_factory - создает отдельный лимитер для каждого аккаунта,
+        например lambda: RateLimiter(rps=5).
+        session_kwargs - остальные параметры AsyncAmoSession для всех аккаунтов (retry_policy, trusted...).
+        Общий rate_limiter в них передавать нельзя: лимит amoCRM считается на аккаунт.
+        """
+        if concurrency < 1 or per_account < 1:
+            raise ValueError("concurrency and per_account must be positive")
+        if "rate_limiter" in session_kwargs:
+            raise ValueError("rate_limiter is per account: pass rate_limiter_factory or add_account(..., rate_limiter=...)")
+        if parse_pages and not processes:
+            raise ValueError("parse_pages requires processes")
+        self.concurrency = concurrency
+        self.per_account = per_account
+        self.processes = processes
+        self.parse_pages = parse_pages
+        self.rate_limiter_factory = rate_limiter_factory
+        self.session_kwargs = session_kwargs
+        self.transport = SharedTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                http2=http2,
+            )
+        )
+        self.sessions: Dict[str, AsyncAmoSession] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        for token, subdomain in accounts:
+            self.add_account(token, subdomain)
+
+    def add_account(self, token: str, subdomain: str, **kwargs) -> AsyncAmoSession:
+        """Добавить аккаунт. kwargs дополняют session_kwargs (например, свой rate_limiter)"""
+        self._check_new(subdomain)
+        kwargs = {**self.session_kwargs, **kwargs}
+        kwargs.setdefault("rate_limiter", self.rate_limiter_factory())
+        if self.parse_pages:
+            kwargs.setdefault("parse_executor", self.get_process_pool())
+        session = AsyncAmoSession(token, subdomain, transport=self.transport, **kwargs)
+        return self.add_session(session)
+
+    def add_session(self, session: AsyncAmoSession) -> AsyncAmoSession:
+        """Добавить готовую сессию (она использует свой пул соединений)"""
+        self._check_new(session.get_subdomain())
+        self.sessions[session.get_subdomain()] = session
+        return session
+
+    def _check_new(self, subdomain: str):
+        if subdomain in self.sessions:
+            raise ValueError(f"account {subdomain} is already added")
+
+    def get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Пул процессов, создается при первом обращении. None, если processes=0"""
+        if self._process_pool is None and self.processes:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._process_pool
+
+    async def run_cpu(self, func: Callable, *args) -> Any:
+        """
+        Выполнить func(*args) в пуле процессов, не блокируя цикл событий.
+        func и аргументы должны передаваться через pickle. Без пула - в пуле потоков цикла
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.get_process_pool(), func, *args)
+
+    async def _schedule(
+        self, jobs: Iterable[Tuple[str, Callable]], streaming: bool
+    ) -> AsyncIterator[AccountResult]:
+        queues: Dict[str, deque] = {}
+        for subdomain, job in jobs:
+            if subdomain not in self.sessions:
+                raise KeyError(f"unknown account {subdomain}")
+            queues.setdefault(subdomain, deque()).append(job)
+        ring = deque(queues)
+        running: Dict[str, int] = defaultdict(int)
+        tasks = set()
+        finished = object()
+        # Ограниченная очередь: потоковые задачи не убегают далеко вперед потребителя
+        output: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def run(subdomain: str, job: Callable):
+            session = self.sessions[subdomain]
+            try:
+                if streaming:
+                    async for value in job(session):
+                        await output.put(AccountResult(subdomain=subdomain, value=value))
+                else:
+                    await output.put(AccountResult(subdomain=subdomain, value=await job(session)))
+            except Exception as error:
+                await output.put(AccountResult(subdomain=subdomain, error=error))
+            # Отмененная задача метку не ставит: ее уже никто не ждет
+            await output.put((finished, subdomain))
+
+        def start_ready() -> int:
+            # Круг по аккаунтам: каждый аккаунт с задачами получает слот по очереди
+            total = sum(running.values())
+            started = True
+            while started and total < self.concurrency:
+                started = False
+                for _ in range(len(ring)):
+                    if total >= self.concurrency:
+                        break
+                    subdomain = ring[0]
+                    ring.rotate(-1)
+                    if queues[subdomain] and running[subdomain] < self.per_account:
+                        running[subdomain] += 1
+                        total += 1
+                        task = asyncio.ensure_future(run(subdomain, queues[subdomain].popleft()))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        started = True
+            return total
+
+        try:
+            active = start_ready()
+            while active:
+                item = await output.get()
+                if isinstance(item, tuple) and item[0] is finished:
+                    running[item[1]] -= 1
+                    active = start_ready()
+                    continue
+                yield item
+        finally:
+            for task in list(tasks):
+                task.cancel()
+
+    def _jobs(self, job: Callable, subdomains: Optional[Iterable[str]]) -> List[Tuple[str, Callable]]:
+        return [(subdomain, job) for subdomain in (subdomains if subdomains is not None else self.sessions)]
+
+    async def map(self, job: Job, subdomains: Optional[Iterable[str]] = None) -> AsyncIterator[AccountResult]:
+        """
+        Выполнить await job(session) на каждом аккаунте (или на subdomains),
+        результаты - по мере готовности
+        """
+        async for result in self._schedule(self._jobs(job, subdomains), streaming=False):
+            yield result
+
+    async def map_many(self, jobs: Iterable[Tuple[str, Job]]) -> AsyncIterator[AccountResult]:
+        """Выполнить набор задач (subdomain, job), по несколько на аккаунт - с чередованием аккаунтов"""
+        async for result in self._schedule(jobs, streaming=False):
+            yield result
+
+    async def stream(self, job: StreamJob, subdomains: Optional[Iterable[str]] = None) -> AsyncIterator[AccountResult]:
+        """
+        job(session) - асинхронный генератор (например, обход session.leads.aiter_pages()),
+        каждое его значение отдается отдельным AccountResult по мере получения
+        """
+        async for result in self._schedule(self._jobs(job, subdomains), streaming=True):
+            yield result
+
+    async def gather(self, job: Job, subdomains: Optional[Iterable[str]] = None) -> Dict[str, AccountResult]:
+        """Выполнить job на всех аккаунтах и вернуть результаты по subdomain"""
+        return {result.subdomain: result async for result in self.map(job, subdomains)}
+
+    async def aclose(self):
+        """Закрыть все сессии, общий пул соединений и пул процессов"""
+        await asyncio.gather(*(session.aclose() for session in self.sessions.values()))
+        await self.transport.transport.aclose()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
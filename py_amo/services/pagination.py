@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional, Tuple
+
+
+def count_pages(limit: int, page_size: int) -> int:
+    """Сколько страниц по page_size нужно, чтобы набрать limit сущностей"""
+    return -(-limit // page_size)
+
+
+def get_total_pages(data: Dict[str, Any], page_size: int) -> Optional[int]:
+    """
+    Общее кол-во страниц из метаданных ответа, если amoCRM его вернул.
+
+    В зависимости от сущности это _page_count, _total_items или
+    словарь _page с page_count/total. Если ничего нет - None.
+    """
+    page_info = data.get("_page")
+    if not isinstance(page_info, dict):
+        page_info = {}
+    page_count = data.get("_page_count") or page_info.get("page_count")
+    if page_count:
+        return int(page_count)
+    total = data.get("_total_items") or page_info.get("total")
+    if total:
+        return count_pages(int(total), page_size)
+    return None
+
+
+def is_last_page(data: Dict[str, Any], entities_count: int, page_size: int) -> bool:
+    """Страница последняя, если она неполная или в ответе нет _links.next"""
+    return entities_count < page_size or not data.get("_links", {}).get("next")
+
+
+def plan_last_page(data: Dict[str, Any], first_page: int, limit: int, page_size: int) -> Tuple[int, bool]:
+    """
+    По первой странице определить номер последней страницы, которую стоит запрашивать.
+
+    Возвращает (last_page, exact). exact=True, если номер известен из метаданных ответа
+    и все оставшиеся страницы можно запрашивать сразу. Иначе last_page - верхняя граница по limit,
+    а страницы нужно запрашивать волнами до первой неполной.
+    """
+    last_page = first_page + count_pages(limit, page_size) - 1
+    total_pages = get_total_pages(data, page_size)
+    if total_pages is None:
+        return last_page, False
+    return min(last_page, total_pages), True
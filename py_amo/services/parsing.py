@@ -0,0 +1,214 @@
+import copy
+import inspect
+import json
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel, PrivateAttr
+from py_amo.schemas.lazy import LazyList
+
+PYDANTIC_V2 = hasattr(BaseModel, "model_validate")
+
+if PYDANTIC_V2:
+    from pydantic_core import PydanticUndefined
+else:
+    from pydantic.fields import Undefined as PydanticUndefined
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость: pip install py-amo-client[fast]
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Разобрать JSON: orjson, если установлен, иначе стандартный json"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
+
+
+Converter = Optional[Callable[[Any], Any]]
+UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+
+
+def _compile(annotation: Any) -> Converter:
+    """
+    Функция, собирающая значение поля с аннотацией annotation без валидации,
+    или None, если значение используется как есть (в нем нет вложенных схем)
+    """
+    origin = get_origin(annotation)
+    if origin in UNION_TYPES:
+        for arg in get_args(annotation):
+            converter = _compile(arg)
+            if converter is not None:
+                return converter
+        return None
+    if origin in (list, tuple, set):
+        item_converter = _compile((get_args(annotation) or (Any,))[0])
+        if item_converter is None:
+            return None
+        return lambda value: [item_converter(item) for item in value] if isinstance(value, list) else value
+    if isinstance(annotation, type) and issubclass(annotation, LazyList):
+        return annotation.validate
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: construct(annotation, value) if isinstance(value, dict) else value
+    return None
+
+
+def _model_fields(schema_class: Type[BaseModel]) -> Dict[str, Any]:
+    return getattr(schema_class, "model_fields", None) or schema_class.__fields__
+
+
+_MISSING = object()
+Default = Optional[Callable[[], Any]]
+Plan = Tuple[Dict[str, None], Tuple[str, ...], set, Tuple[Tuple[str, str, Converter, Default], ...]]
+_plans: Dict[Type[BaseModel], Plan] = {}
+
+
+def _default(field: Any) -> Default:
+    """Значение по умолчанию поля: None, если оно None (так у почти всех полей схем), иначе функция"""
+    factory = getattr(field, "default_factory", None)
+    if factory is not None:
+        return factory
+    default = field.default
+    if default is None or default is Ellipsis or default is PydanticUndefined:
+        # Обязательное поле без значения в ответе остается None, как и раньше
+        return None
+    return lambda: copy.deepcopy(default)
+
+
+def _get_plan(schema_class: Type[BaseModel]) -> Plan:
+    """
+    План сборки схемы, считается один раз на класс: словарь полей в порядке схемы (копируется для каждой
+    сущности, чтобы порядок полей был как после валидации), простые поля (без алиаса, вложенных схем
+    и значения по умолчанию) - они копируются из данных как есть, их множество
+    и остальные поля как (имя поля, ключ в данных, сборщик значения, значение по умолчанию)
+    """
+    plan = _plans.get(schema_class)
+    if plan is None:
+        fields = _model_fields(schema_class)
+        simple, other = [], []
+        for name, field in fields.items():
+            key = field.alias or name
+            converter = _compile(getattr(field, "annotation", None) or field.outer_type_)
+            default = _default(field)
+            if key == name and converter is None and default is None:
+                simple.append(name)
+            else:
+                other.append((name, key, converter, default))
+        plan = _plans[schema_class] = (dict.fromkeys(fields), tuple(simple), set(simple), tuple(other))
+    return plan
+
+
+def _build_v1(schema_class: Type[BaseModel], values: Dict[str, Any], fields_set: set) -> BaseModel:
+    # То же, что делает BaseModel.construct в pydantic 1, но без копирования значений по умолчанию
+    model = schema_class.__new__(schema_class)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__fields_set__", fields_set)
+    model._init_private_attributes()
+    return model
+
+
+class _PrivateProbe(BaseModel):
+    _probe: Any = PrivateAttr(default=None)
+
+
+# model_post_init, которую pydantic 2 дает схеме с приватными атрибутами и без своей model_post_init
+_DEFAULT_POST_INIT = inspect.unwrap(_PrivateProbe.model_post_init) if PYDANTIC_V2 else None
+_IMMUTABLE = (type(None), bool, int, float, str)
+_private_defaults: Dict[Type[BaseModel], Optional[Dict[str, Any]]] = {}
+
+
+def _get_private_defaults(schema_class: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """
+    Значения по умолчанию приватных атрибутов схемы (например, _cf и _statuses), если их можно
+    посчитать один раз и копировать в каждую сущность. None, если у схемы своя model_post_init
+    или значение по умолчанию изменяемое - тогда вызывается model_post_init, как в model_construct
+    """
+    if schema_class in _private_defaults:
+        return _private_defaults[schema_class]
+    defaults = None
+    if inspect.unwrap(schema_class.model_post_init) is _DEFAULT_POST_INIT:
+        defaults = {}
+        for name, attribute in schema_class.__private_attributes__.items():
+            if attribute.default_factory is not None:
+                defaults = None
+                break
+            if attribute.default is PydanticUndefined:
+                continue
+            if not isinstance(attribute.default, _IMMUTABLE):
+                defaults = None
+                break
+            defaults[name] = attribute.default
+    _private_defaults[schema_class] = defaults
+    return defaults
+
+
+def _build_v2(schema_class: Type[BaseModel], values: Dict[str, Any], fields_set: set) -> BaseModel:
+    # То же, что делает BaseModel.model_construct в pydantic 2, но без разбора алиасов
+    # и значений по умолчанию для каждой сущности - они уже в плане.
+    # Совпадение с валидацией для всех схем проверяет tests/test_parsing.py
+    model = schema_class.__new__(schema_class)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(model, "__pydantic_extra__", None)
+    if not schema_class.__pydantic_post_init__:
+        object.__setattr__(model, "__pydantic_private__", None)
+        return model
+    private = _get_private_defaults(schema_class)
+    object.__setattr__(model, "__pydantic_private__", dict(private) if private is not None else None)
+    if private is None:
+        model.model_post_init(None)
+    return model
+
+
+_build = _build_v2 if PYDANTIC_V2 else _build_v1
+
+
+def construct(schema_class: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """
+    Собрать схему из данных amoCRM без валидации, включая вложенные схемы.
+    Типы не проверяются и не приводятся - подходит только для ответов API, которым можно доверять.
+    Поля, которых нет в данных, получают значения по умолчанию, ключи не из схемы отбрасываются.
+    """
+    template, simple, simple_set, other = _get_plan(schema_class)
+    get = data.get
+    values = template.copy()
+    for name in simple:
+        values[name] = get(name)
+    fields_set = simple_set.intersection(data)
+    for name, key, converter, default in other:
+        value = get(key, _MISSING)
+        if value is _MISSING and key != name:
+            value = get(name, _MISSING)
+        if value is _MISSING:
+            values[name] = default() if default is not None else None
+            continue
+        fields_set.add(name)
+        if value is not None and converter is not None:
+            value = converter(value)
+        values[name] = value
+    return _build(schema_class, values, fields_set)
+
+
+def parse_page(
+    content: bytes, entity_type: str, schema_class: Optional[Type[BaseModel]] = None, trusted: bool = False
+) -> Tuple[Dict[str, Any], List[Any]]:
+    """
+    Разобрать тело ответа страницы коллекции: (метаданные страницы без _embedded, сущности).
+    Без schema_class сущности остаются словарями, с trusted схемы собираются через construct.
+
+    Функция модульного уровня, чтобы ее можно было выполнять в ProcessPoolExecutor:
+    в процесс передаются только байты ответа, обратно - сущности страницы и ее _links/_page.
+    """
+    data = loads(content)
+    items = (data.pop("_embedded", None) or {}).get(entity_type, [])
+    if schema_class is not None:
+        build = (lambda item: construct(schema_class, item)) if trusted else (lambda item: schema_class(**item))
+        items = [build(item) for item in items]
+    return data, items
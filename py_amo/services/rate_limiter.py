@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разобрать заголовок Retry-After (секунды или HTTP-дата) в кол-во секунд"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """
+    Адаптивный token bucket, общий для всех репозиториев одной сессии.
+
+    - rps - сколько запросов в секунду разрешено (у amoCRM - 7 на аккаунт)
+    - burst - сколько запросов можно отправить разом после простоя
+    - min_rps - ниже этой скорости лимитер не опускается
+
+    На каждый 429 скорость уменьшается вдвое, а если пришел Retry-After -
+    запросы не отправляются до его истечения. Когда ошибки прекращаются,
+    каждые recovery_interval секунд скорость растет на recovery_step, пока не вернется к rps.
+
+    Один экземпляр можно использовать и из потоков (acquire), и из корутин (acquire_async).
+    """
+
+    def __init__(
+        self,
+        rps: float = 7,
+        burst: Optional[float] = None,
+        min_rps: float = 1,
+        recovery_interval: float = 10,
+        recovery_step: float = 1,
+    ):
+        if rps <= 0:
+            raise ValueError("rps must be positive")
+        self.max_rps = float(rps)
+        self.burst = float(burst if burst is not None else rps)
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.min_rps = min(float(min_rps), self.max_rps)
+        self.recovery_interval = recovery_interval
+        self.recovery_step = recovery_step
+        self.rate = self.max_rps
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_adjusted_at = self._updated_at
+        self._lock = threading.Lock()
+
+    def _recover(self, now: float):
+        if self.rate >= self.max_rps:
+            return
+        if now - self._last_adjusted_at >= self.recovery_interval:
+            self.rate = min(self.max_rps, self.rate + self.recovery_step)
+            self._last_adjusted_at = now
+
+    def _reserve(self) -> float:
+        """Взять токен, если он есть. Иначе вернуть, сколько секунд подождать"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._recover(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Дождаться разрешения на запрос (блокирует поток)"""
+        while (delay := self._reserve()) > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Дождаться разрешения на запрос, не блокируя event loop"""
+        while (delay := self._reserve()) > 0:
+            await asyncio.sleep(delay)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Сообщить лимитеру о 429: снизить скорость и, если указано, переждать retry_after"""
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.min_rps, self.rate / 2)
+            self._last_adjusted_at = now
+            # После паузы разрешаем ровно один запрос, дальше - в новом темпе
+            self._tokens = 1.0
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+            self._updated_at = self._blocked_until
@@ -0,0 +1,142 @@
+import asyncio
+import random
+import time
+from typing import Iterable, Optional
+import httpx
+import requests
+from .rate_limiter import RateLimiter, parse_retry_after
+
+
+class RetryPolicy:
+    """
+    Политика повторов для временных ошибок (429, 5xx, обрыв соединения).
+
+    - max_attempts - сколько всего попыток, включая первую (1 - без повторов)
+    - backoff_base / backoff_max - экспоненциальная задержка base * 2^n, но не больше max
+    - jitter - случайная задержка в диапазоне [0, backoff], чтобы клиенты не повторяли синхронно
+    - deadline - сколько секунд от начала вызова можно потратить на повторы
+    - retry_methods - какие методы безопасно повторять. PATCH повторяется с тем же телом
+
+    Retry-After из ответа всегда имеет приоритет над рассчитанной задержкой.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        jitter: bool = True,
+        deadline: Optional[float] = 120,
+        retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+        retry_methods: Iterable[str] = ("GET", "HEAD", "PATCH"),
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+
+    def get_backoff(self, attempt: int) -> float:
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        started_at: float,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Задержка перед следующей попыткой или None, если повторять нельзя.
+
+        attempt - номер неудавшейся попытки, начиная с 0.
+        started_at - time.monotonic() начала вызова.
+        """
+        if method.upper() not in self.retry_methods or attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.get_backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None and time.monotonic() - started_at + delay > self.deadline:
+            return None
+        return delay
+
+
+def _after_response(
+    response,
+    rate_limiter: RateLimiter,
+    retry_policy: RetryPolicy,
+    method: str,
+    attempt: int,
+    started_at: float,
+) -> Optional[float]:
+    """Учесть ответ в лимитере и вернуть задержку перед повтором (None - повтор не нужен)"""
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if response.status_code == 429:
+        rate_limiter.on_rate_limited(retry_after)
+    if response.status_code not in retry_policy.retry_statuses:
+        return None
+    return retry_policy.next_delay(method, attempt, started_at, retry_after)
+
+
+def send_request(
+    client: requests.Session,
+    rate_limiter: RateLimiter,
+    retry_policy: RetryPolicy,
+    method: str,
+    url: str,
+    **kwargs,
+) -> requests.Response:
+    """Отправить запрос через лимитер, повторяя временные ошибки по retry_policy"""
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        rate_limiter.acquire()
+        try:
+            response = client.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            delay = retry_policy.next_delay(method, attempt, started_at)
+            if delay is None:
+                raise
+        else:
+            delay = _after_response(response, rate_limiter, retry_policy, method, attempt, started_at)
+            if delay is None:
+                return response
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+async def send_request_async(
+    client: httpx.AsyncClient,
+    rate_limiter: RateLimiter,
+    retry_policy: RetryPolicy,
+    method: str,
+    url: str,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Асинхронный аналог send_request.
+    Ожидание между попытками - asyncio.sleep, остальные запросы в это время продолжают работать.
+    """
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        await rate_limiter.acquire_async()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            delay = retry_policy.next_delay(method, attempt, started_at)
+            if delay is None:
+                raise
+        else:
+            delay = _after_response(response, rate_limiter, retry_policy, method, attempt, started_at)
+            if delay is None:
+                return response
+        await asyncio.sleep(delay)
+        attempt += 1
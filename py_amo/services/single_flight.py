@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов из разных потоков.
+
+    Пока вызов с ключом key выполняется, остальные вызовы с тем же ключом не запускают func,
+    а ждут и получают тот же результат (или то же исключение).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Future()
+        if not is_leader:
+            return call.result()
+
+        try:
+            result = func()
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Асинхронный аналог SingleFlight: одинаковые одновременные вызовы из корутин
+    ждут одну задачу. Отмена одного ожидающего не отменяет запрос для остальных.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
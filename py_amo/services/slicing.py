@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from collections import deque
+from math import ceil
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .filters import create_filter, FilterOperator
+from py_amo.utils.date_utils import time_windows
+
+Window = Tuple[int, int]
+
+SLICE_FIELDS = ("created_at", "updated_at")
+
+
+class TimeSlicer:
+    """
+    Состояние выгрузки коллекции по временным окнам поля field (created_at или updated_at).
+
+    Очередь windows - окна [start, end] (границы включительно), которые еще предстоит запросить.
+    Окно, в котором не уместилась одна страница, делится на splits частей, и части встают в очередь.
+    Окно в одну секунду делить некуда - его дочитывают страницами.
+    Дочерние окна заново отдают сущности с первой страницы родителя, поэтому
+    сущности пропускаются через unique: каждая id отдается один раз.
+    """
+
+    def __init__(self, field: str, windows: Iterable[Window], splits: int = 4):
+        if field not in SLICE_FIELDS:
+            raise ValueError(f"field must be one of {SLICE_FIELDS}")
+        if splits < 2:
+            raise ValueError("splits must be at least 2")
+        self.field = field
+        self.splits = splits
+        self.windows = deque(windows)
+        self._seen = set()
+
+    @staticmethod
+    def initial_windows(from_date: int, to_date: int, parts: int) -> List[Window]:
+        """Промежуток [from_date, to_date], разделенный на parts окон для старта параллельной выгрузки"""
+        return time_windows(from_date, to_date, max(ceil((to_date - from_date + 1) / max(parts, 1)), 1))
+
+    @staticmethod
+    def plan_windows(
+        from_date: int, to_date: int, window: Optional[int], parts: int, floor: Optional[int] = None
+    ) -> List[Window]:
+        """
+        Окна для [from_date, to_date]: по window секунд или, без window, parts окон.
+
+        floor - отметка самой ранней сущности коллекции. Промежуток до нее запрашивается одним окном
+        (оно пустое, а если нет - делится само), и окна по window нарезаются только от floor.
+        Без этого выгрузка без from_date начиналась бы с 1970 года и тратила запрос на каждое пустое окно.
+        """
+        if floor is not None and floor > from_date:
+            if floor > to_date:
+                return [(from_date, to_date)]
+            head, from_date = [(from_date, floor - 1)], floor
+        else:
+            head = []
+        if window:
+            return head + time_windows(from_date, to_date, window)
+        return head + TimeSlicer.initial_windows(from_date, to_date, parts)
+
+    def params(self, window: Window) -> Dict[str, Any]:
+        start, end = window
+        builder = create_filter()
+        if start:
+            builder.add_filter(self.field, start, FilterOperator.FROM)
+        return builder.add_filter(self.field, end, FilterOperator.TO).build()
+
+    def split(self, window: Window) -> List[Window]:
+        start, end = window
+        if start >= end:
+            return []
+        return time_windows(start, end, ceil((end - start + 1) / self.splits))
+
+    def mark_seen(self, ids: Iterable[int]):
+        """Считать id уже отданными (например, записанными до перезапуска выгрузки)"""
+        self._seen.update(ids)
+
+    def unique(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Сущности (словари ответа), которые еще не отдавались"""
+        result = []
+        for item in items:
+            entity_id = item.get("id")
+            if entity_id not in self._seen:
+                self._seen.add(entity_id)
+                result.append(item)
+        return result
+
+
+def add_range(ranges: List[List[int]], window: Window):
+    """
+    Добавить окно [start, end] в отсортированный список непересекающихся отрезков, склеивая соседние.
+    Готовые окна выгрузки идут почти подряд, поэтому список остается коротким при любом числе окон
+    """
+    start, end = window
+    index = bisect_left(ranges, [start, end])
+    if index and ranges[index - 1][1] >= start - 1:
+        index -= 1
+        start = ranges[index][0]
+        end = max(end, ranges.pop(index)[1])
+    while index < len(ranges) and ranges[index][0] <= end + 1:
+        end = max(end, ranges.pop(index)[1])
+    ranges.insert(index, [start, end])
+
+
+def missing_ranges(from_date: int, to_date: int, ranges: List[List[int]]) -> List[Window]:
+    """Части [from_date, to_date], не покрытые отрезками ranges (отсортированными, как после add_range)"""
+    result = []
+    position = from_date
+    for start, end in ranges:
+        if end < position:
+            continue
+        if start > to_date:
+            break
+        if start > position:
+            result.append((position, start - 1))
+        position = end + 1
+    if position <= to_date:
+        result.append((position, to_date))
+    return result
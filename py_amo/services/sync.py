@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Any, Dict, Iterable, Optional
+from .filters import create_filter, FilterOperator
+
+
+class SyncCursor:
+    """
+    Отметка инкрементальной синхронизации.
+
+    - updated_at - максимальный updated_at среди уже обработанных сущностей
+    - ids - id сущностей с этим updated_at, которые уже обработаны.
+      Фильтр amoCRM по updated_at включает границу, по ids такие сущности пропускаются.
+    """
+
+    def __init__(self, updated_at: int = 0, ids: Iterable[int] = ()):
+        self.updated_at = updated_at
+        self.ids = set(ids)
+
+    def is_seen(self, entity_id: int, updated_at: int) -> bool:
+        return updated_at < self.updated_at or (updated_at == self.updated_at and entity_id in self.ids)
+
+    def advance(self, entity_id: int, updated_at: int):
+        if updated_at > self.updated_at:
+            self.updated_at = updated_at
+            self.ids = {entity_id}
+        elif updated_at == self.updated_at:
+            self.ids.add(entity_id)
+
+    def filter_params(self, field: str = "updated_at") -> Dict[str, Any]:
+        """
+        Параметры запроса: сущности начиная с отметки, по возрастанию field.
+        field - поле отметки: updated_at, у событий (в них нет updated_at) - created_at
+        """
+        builder = create_filter().order_by(field, "asc")
+        if self.updated_at:
+            builder.add_filter(field, self.updated_at, FilterOperator.FROM)
+        return builder.build()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"updated_at": self.updated_at, "ids": sorted(self.ids)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SyncCursor":
+        return cls(data.get("updated_at", 0), data.get("ids", ()))
+
+    def __repr__(self):
+        return f"SyncCursor(updated_at={self.updated_at}, ids={len(self.ids)})"
+
+
+class CursorStore(ABC):
+    """Хранилище отметок синхронизации. key - имя синхронизации, например "subdomain:leads" """
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[SyncCursor]:
+        ...
+
+    @abstractmethod
+    def save(self, key: str, cursor: SyncCursor):
+        ...
+
+
+class MemoryCursorStore(CursorStore):
+    """Хранит отметки в памяти процесса. Подходит для тестов и долгоживущих воркеров"""
+
+    def __init__(self):
+        self._cursors: Dict[str, Dict[str, Any]] = {}
+
+    def load(self, key: str) -> Optional[SyncCursor]:
+        data = self._cursors.get(key)
+        return SyncCursor.from_dict(data) if data is not None else None
+
+    def save(self, key: str, cursor: SyncCursor):
+        self._cursors[key] = cursor.to_dict()
+
+
+class FileCursorStore(CursorStore):
+    """Хранит отметки в JSON-файле. Файл перезаписывается атомарно"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, key: str) -> Optional[SyncCursor]:
+        data = self._read().get(key)
+        return SyncCursor.from_dict(data) if data is not None else None
+
+    def save(self, key: str, cursor: SyncCursor):
+        with self._lock:
+            data = self._read()
+            data[key] = cursor.to_dict()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+
+
+class SQLiteCursorStore(CursorStore):
+    """Хранит отметки в таблице sync_cursors базы SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_cursors ("
+                "key TEXT PRIMARY KEY, updated_at INTEGER NOT NULL, ids TEXT NOT NULL)"
+            )
+
+    def load(self, key: str) -> Optional[SyncCursor]:
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            row = connection.execute(
+                "SELECT updated_at, ids FROM sync_cursors WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SyncCursor(row[0], json.loads(row[1]))
+
+    def save(self, key: str, cursor: SyncCursor):
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_cursors (key, updated_at, ids) VALUES (?, ?, ?)",
+                (key, cursor.updated_at, json.dumps(sorted(cursor.ids))),
+            )
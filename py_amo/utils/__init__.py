@@ -1,5 +1,6 @@
 from .async_utils import repository_safe_request
-from .date_utils import datetime_to_timestamp, timestamp_to_datetime, now_timestamp, format_date_for_filter
+from .chunks import chunked, chunked_by_length
+from .date_utils import datetime_to_timestamp, timestamp_to_datetime, now_timestamp, format_date_for_filter, time_windows, to_timestamp
 from .validators import (
     validate_entity_id, 
     validate_entity_ids, 
@@ -8,3 +9,4 @@ from .validators import (
     validate_entity_type, 
     validate_required_fields
 )
+from .normalizers import normalize_phone, normalize_email, normalize_name
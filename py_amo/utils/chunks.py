@@ -0,0 +1,40 @@
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Разбить последовательность на пачки не больше size элементов"""
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def chunked_by_length(
+    items: Iterable[T], size: int, max_length: int, get_length: Callable[[T], int]
+) -> Iterator[List[T]]:
+    """
+    Разбить последовательность на пачки не больше size элементов
+    и суммарной длины (по get_length) не больше max_length, например чтобы уложиться в длину URL
+    """
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+    chunk = []
+    length = 0
+    for item in items:
+        item_length = get_length(item)
+        if chunk and (len(chunk) == size or length + item_length > max_length):
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(item)
+        length += item_length
+    if chunk:
+        yield chunk
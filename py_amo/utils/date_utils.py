@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Optional, Union
+from typing import List, Optional, Tuple, Union
 
 
 def datetime_to_timestamp(dt: datetime) -> int:
@@ -9,6 +9,13 @@ def datetime_to_timestamp(dt: datetime) -> int:
     return int(dt.timestamp())
 
 
+def to_timestamp(value: Optional[Union[datetime, int]]) -> Optional[int]:
+    """datetime или timestamp -> timestamp, None остается None"""
+    if isinstance(value, datetime):
+        return datetime_to_timestamp(value)
+    return int(value) if value is not None else None
+
+
 def timestamp_to_datetime(timestamp: Union[int, str]) -> Optional[datetime]:
     """Конвертирует timestamp из AmoCRM API в datetime"""
     if timestamp is None:
@@ -28,4 +35,21 @@ def now_timestamp() -> int:
 
 def format_date_for_filter(dt: datetime) -> str:
     """Форматирует дату для использования в фильтрах AmoCRM"""
-    return str(datetime_to_timestamp(dt)) 
\ No newline at end of file
+    return str(datetime_to_timestamp(dt)) 
+
+
+def time_windows(
+    from_date: Union[datetime, int], to_date: Union[datetime, int], size: int
+) -> List[Tuple[int, int]]:
+    """
+    Разбить промежуток [from_date, to_date] на окна по size секунд.
+    Границы окон включительно и не пересекаются - как в фильтрах amoCRM from/to
+    """
+    if size <= 0:
+        raise ValueError("Window size must be positive")
+    start, end = to_timestamp(from_date), to_timestamp(to_date)
+    windows = []
+    while start <= end:
+        windows.append((start, min(start + size - 1, end)))
+        start += size
+    return windows
@@ -0,0 +1,26 @@
+import re
+from typing import Any
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_WORDS = re.compile(r"[^\w]+")
+
+
+def normalize_phone(phone: Any) -> str:
+    """
+    Привести телефон к виду для поиска: только цифры, российские номера из 11 цифр
+    с 7 или 8 в начале - без первой цифры. "+7 (900) 123-45-67" и "89001234567" дают "9001234567".
+    """
+    digits = _NON_DIGITS.sub("", str(phone))
+    if len(digits) == 11 and digits[0] in "78":
+        return digits[1:]
+    return digits
+
+
+def normalize_email(email: Any) -> str:
+    return str(email).strip().lower()
+
+
+def normalize_name(name: Any) -> str:
+    """Имя для сравнения: нижний регистр, ё -> е, без знаков препинания, слова по алфавиту"""
+    words = _NON_WORDS.sub(" ", str(name).lower().replace("ё", "е")).split()
+    return " ".join(sorted(words))
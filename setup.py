@@ -12,5 +12,10 @@ setup(
     packages=find_packages(),
     install_requires=[
     ],
+    extras_require={
+        "http2": ["httpx[http2]"],
+        "fast": ["orjson"],
+        "export": ["numpy", "pyarrow"],
+    },
     python_requires=">=3.9",
 )
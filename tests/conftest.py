@@ -0,0 +1,357 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from py_amo.async_repositories import base_async_repository, events_async_repository
+from py_amo.repositories import base_repository, events_repository
+from py_amo.services import cache as response_cache, export_job, mirror, rate_limiter, retry
+from py_amo.services.amo_session import AmoSession, AsyncAmoSession
+from py_amo.services.rate_limiter import RateLimiter
+
+PAGE_SIZE = 5  # Маленькие страницы, чтобы окна и страницы делились на десятках сделок
+BASE = 1_700_000_000  # Отметки сделок - недалеко от BASE, как у реального аккаунта
+
+
+class FakeAmo:
+    """
+    Коллекции сделок и событий amoCRM в памяти: фильтры filter[id][] и filter[field][from/to] по created_at
+    и updated_at (границы включительно), order[field], page и limit, _links.next, пока есть следующая страница.
+    События, как /api/v4/events, не принимают order (400) и отдаются по id, а не по времени.
+    Воронки (/api/v4/leads/pipelines) отдаются как есть, со статусами в _embedded.
+    Сделки можно создавать (POST) и изменять (PATCH) пачками и удалять по одной (DELETE /leads/{id}).
+
+    queries - параметры всех запросов, requests - (метод, путь) всех запросов, served - id сущностей во всех ответах.
+    on_request(amo, query) вызывается перед ответом, например чтобы изменить сделки во время обхода.
+    fail(...) ставит в очередь ответы с ошибкой - они отдаются следующим запросам вместо данных.
+    """
+
+    def __init__(self, leads: Iterable[Dict[str, Any]] = ()):
+        self.leads = {lead["id"]: dict(lead) for lead in leads}
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.pipelines: Dict[int, Dict[str, Any]] = {}
+        self.queries: List[Dict[str, Any]] = []
+        self.requests: List[Tuple[str, str]] = []
+        self.served: List[int] = []
+        self.on_request: Optional[Callable[["FakeAmo", Dict[str, Any]], None]] = None
+        self.failures = deque()
+        self._lock = threading.Lock()
+
+    def put(self, id: int, created_at: int, updated_at: Optional[int] = None, **fields):
+        self.leads[id] = {
+            "id": id, "name": f"Lead {id}", "created_at": created_at, "updated_at": updated_at or created_at, **fields
+        }
+
+    def put_event(self, id: str, created_at: int, **fields):
+        self.events[id] = {"id": id, "type": "lead_added", "entity_id": 1, "entity_type": "lead", "created_at": created_at, **fields}
+
+    def put_pipeline(self, id: int, statuses: Iterable[Tuple[int, str, int]], **fields):
+        """statuses - (id, название, sort) статусов воронки"""
+        embedded = [{"id": status_id, "name": name, "sort": sort, "pipeline_id": id} for status_id, name, sort in statuses]
+        self.pipelines[id] = {"id": id, "name": f"Pipeline {id}", **fields, "_embedded": {"statuses": embedded}}
+
+    def fail(
+        self,
+        status: int,
+        times: int = 1,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        when: Optional[Callable[[str, str, Any], bool]] = None,
+    ):
+        """
+        Следующие times запросов получат status (тело body, без него - пустое).
+        when(method, path, payload) - ошибку получат только подходящие запросы, остальные обслуживаются как обычно
+        """
+        self.failures.extend([(status, body, headers or {}, when)] * times)
+
+    def respond(
+        self, query: Dict[str, Any], path: str = "/api/v4/leads", method: str = "GET", payload: Any = None
+    ) -> Tuple[int, Optional[Dict[str, Any]], Dict[str, str]]:
+        """Статус, тело (None - пустое) и заголовки ответа"""
+        entity_type, *entity_id = path.rstrip("/").split("/")[3:]
+        if entity_id == ["pipelines"]:
+            entity_type, entity_id = "pipelines", []
+        with self._lock:
+            self.queries.append(query)
+            self.requests.append((method, path))
+            if self.on_request is not None:
+                self.on_request(self, query)
+            for failure in self.failures:
+                status, body, headers, when = failure
+                if when is None or when(method, path, payload):
+                    self.failures.remove(failure)
+                    return status, body, headers
+            if method == "GET":
+                status, body = self._collection(entity_type, query)
+            else:
+                status, body = self._write(method, int(entity_id[0]) if entity_id else None, payload)
+            return status, body, {}
+
+    def _write(self, method: str, entity_id: Optional[int], payload: Any) -> Tuple[int, Optional[Dict[str, Any]]]:
+        if method == "DELETE":
+            return (204, None) if self.leads.pop(entity_id, None) is not None else (404, None)
+        written = []
+        for request_id, item in enumerate(payload):
+            if method == "POST":
+                item = {"id": max(self.leads, default=0) + 1, "created_at": 0, "updated_at": 0, **item}
+            elif item.get("id") not in self.leads:
+                return 400, {"title": "Bad Request", "status": 400, "detail": f"lead {item.get('id')} not found"}
+            lead = self.leads[item["id"]] = {**self.leads.get(item["id"], {}), **item}
+            written.append({"id": lead["id"], "request_id": str(request_id), "_links": {"self": {"href": f"/leads/{lead['id']}"}}})
+        return 200, {"_links": {}, "_embedded": {"leads": written}}
+
+    def _collection(self, entity_type: str, query: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        items = list({"leads": self.leads, "events": self.events, "pipelines": self.pipelines}[entity_type].values())
+        if "filter[id][]" in query:
+            ids = query["filter[id][]"]
+            ids = {ids} if isinstance(ids, str) else set(ids)
+            items = [item for item in items if str(item["id"]) in ids]
+        for field in ("created_at", "updated_at"):
+            if f"filter[{field}][from]" in query:
+                items = [item for item in items if item[field] >= int(query[f"filter[{field}][from]"])]
+            if f"filter[{field}][to]" in query:
+                items = [item for item in items if item[field] <= int(query[f"filter[{field}][to]"])]
+        order = [(key[6:-1], value) for key, value in query.items() if key.startswith("order[")]
+        if order and entity_type == "events":
+            return 400, {"title": "Bad Request", "status": 400, "detail": "order is not supported"}
+        if order:
+            field, direction = order[0]
+            items.sort(key=lambda item: (item[field], item["id"]), reverse=direction == "desc")
+        else:
+            items.sort(key=lambda item: item["id"])
+        page, limit = int(query.get("page", 1)), int(query.get("limit", 250))
+        chunk = items[(page - 1) * limit:page * limit]
+        if not chunk:
+            return 204, None
+        self.served += [item["id"] for item in chunk]
+        links = {"self": {"href": "self"}}
+        if page * limit < len(items):
+            links["next"] = {"href": "next"}
+        return 200, {"_page": page, "_links": links, "_embedded": {entity_type: [dict(item) for item in chunk]}}
+
+
+def parse_query(pairs: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """Параметры запроса: повторенный параметр (filter[id][]=1&filter[id][]=2) - список значений"""
+    query: Dict[str, Any] = {}
+    for key, value in pairs:
+        if key in query:
+            previous = query[key]
+            query[key] = (previous if isinstance(previous, list) else [previous]) + [value]
+        else:
+            query[key] = value
+    return query
+
+
+class FakeAdapter(BaseAdapter):
+    """Транспорт requests, который отвечает из FakeAmo"""
+
+    def __init__(self, amo: FakeAmo):
+        super().__init__()
+        self.amo = amo
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        payload = json.loads(request.body) if request.body else None
+        status, body, headers = self.amo.respond(parse_query(parse_qsl(url.query)), url.path, request.method, payload)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json", **headers})
+        response._content = json.dumps(body).encode() if body is not None else b""
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def mock_transport(amo: FakeAmo) -> httpx.MockTransport:
+    """Транспорт httpx, который отвечает из FakeAmo"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content) if request.content else None
+        query = parse_query(request.url.params.multi_items())
+        status, body, headers = amo.respond(query, request.url.path, request.method, payload)
+        return httpx.Response(status, headers=headers) if body is None else httpx.Response(status, headers=headers, json=body)
+
+    return httpx.MockTransport(handler)
+
+
+class Clock:
+    """Управляемый now_timestamp репозиториев"""
+
+    def __init__(self, now: int):
+        self.now = now
+
+    def __call__(self) -> int:
+        return self.now
+
+
+_asyncio_sleep = asyncio.sleep  # Настоящий: в модулях лимитера и повторов asyncio.sleep подменяется
+
+
+class FakeTime:
+    """
+    Управляемые time.monotonic, time.sleep и asyncio.sleep лимитера, повторов и кэша ответов:
+    sleep не ждет, а сдвигает время. sleeps - все запрошенные паузы по порядку
+    """
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.sleep(seconds)
+        await _asyncio_sleep(0)
+
+
+@pytest.fixture
+def amo() -> FakeAmo:
+    return FakeAmo()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock(BASE + 10_000)
+    monkeypatch.setattr(base_repository, "now_timestamp", clock)
+    monkeypatch.setattr(base_async_repository, "now_timestamp", clock)
+    monkeypatch.setattr(export_job, "now_timestamp", clock)
+    monkeypatch.setattr(mirror, "now_timestamp", clock)
+    monkeypatch.setattr(events_repository, "now_timestamp", clock)
+    monkeypatch.setattr(events_async_repository, "now_timestamp", clock)
+    return clock
+
+
+@pytest.fixture
+def fake_time(monkeypatch) -> FakeTime:
+    fake_time = FakeTime()
+    for module in (rate_limiter, retry, response_cache):
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=fake_time.monotonic, sleep=fake_time.sleep))
+    for module in (rate_limiter, retry):
+        monkeypatch.setattr(module, "asyncio", SimpleNamespace(sleep=fake_time.async_sleep))
+    return fake_time
+
+
+def make_session(amo: FakeAmo, **kwargs) -> AmoSession:
+    """AmoSession, запросы которой обслуживает amo. Страницы сделок и событий - по PAGE_SIZE"""
+    kwargs.setdefault("rate_limiter", RateLimiter(rps=10_000))
+    session = AmoSession("token", "test", **kwargs)
+    session.get_requests_session().mount("https://", FakeAdapter(amo))
+    session.leads.MAX_LIMIT = session.events.MAX_LIMIT = PAGE_SIZE
+    return session
+
+
+def make_async_session(amo: FakeAmo, **kwargs) -> AsyncAmoSession:
+    """AsyncAmoSession, запросы которой обслуживает amo. Страницы сделок и событий - по PAGE_SIZE"""
+    kwargs.setdefault("rate_limiter", RateLimiter(rps=10_000))
+    session = AsyncAmoSession("token", "test", transport=mock_transport(amo), **kwargs)
+    session.leads.MAX_LIMIT = session.events.MAX_LIMIT = PAGE_SIZE
+    return session
+
+
+@pytest.fixture
+def session_kwargs() -> Dict[str, Any]:
+    """Дополнительные аргументы сессий фикстур session и client. Модуль тестов может ее переопределить"""
+    return {}
+
+
+@pytest.fixture
+def session(amo, session_kwargs):
+    session = make_session(amo, **session_kwargs)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def async_session(amo, session_kwargs):
+    session = make_async_session(amo, **session_kwargs)
+    yield session
+    asyncio.run(session.aclose())
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, amo, session_kwargs):
+    """Синхронный и асинхронный клиент с одинаковым интерфейсом обхода (см. Client)"""
+    if request.param == "sync":
+        session = make_session(amo, **session_kwargs)
+        yield Client(session)
+        session.close()
+    else:
+        session = make_async_session(amo, **session_kwargs)
+        yield Client(session)
+        asyncio.run(session.aclose())
+
+
+class Client:
+    """Обход сделок одинаково для AmoSession и AsyncAmoSession: асинхронные генераторы собираются в asyncio.run"""
+
+    def __init__(self, session):
+        self.session = session
+        self.is_async = isinstance(session, AsyncAmoSession)
+
+    def paired(self, target: Any, method: str, *args, **kwargs) -> Any:
+        """
+        Вызов пары методов вне репозиториев (fill/afill, load/aload): target.method(...) с синхронной сессией,
+        asyncio.run(target.a<method>(...)) - с асинхронной
+        """
+        if not self.is_async:
+            return getattr(target, method)(*args, **kwargs)
+        return asyncio.run(getattr(target, f"a{method}")(*args, **kwargs))
+
+    def call(self, entity_type: str, method: str, *args, **kwargs) -> Any:
+        """Результат метода репозитория; у асинхронной сессии корутина выполняется в asyncio.run"""
+        result = getattr(getattr(self.session, entity_type), method)(*args, **kwargs)
+        return asyncio.run(result) if self.is_async else result
+
+    def sliced_pages(self, **kwargs) -> List[List[Dict[str, Any]]]:
+        kwargs.setdefault("raw", True)
+        if not self.is_async:
+            return list(self.session.leads.iter_sliced(**kwargs))
+
+        async def collect():
+            return [page async for page in self.session.leads.aiter_sliced(**kwargs)]
+
+        return asyncio.run(collect())
+
+    def changes(self, store, limit: Optional[int] = None, entity_type: str = "leads", **kwargs) -> List[Any]:
+        """id из iter_changes. С limit обход прерывается после limit сущностей, как при падении"""
+        repository = getattr(self.session, entity_type)
+        if not self.is_async:
+            result = []
+            changes = repository.iter_changes(store, **kwargs)
+            for entity in changes:
+                result.append(entity.id)
+                if len(result) == limit:
+                    changes.close()
+                    break
+            return result
+
+        async def collect():
+            result = []
+            changes = repository.aiter_changes(store, **kwargs)
+            async for entity in changes:
+                result.append(entity.id)
+                if len(result) == limit:
+                    break
+            await changes.aclose()
+            return result
+
+        return asyncio.run(collect())
@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import BASE
+from py_amo import LeadsAnalytics
+
+# id: (pipeline_id, status_id, responsible_user_id, price)
+LEADS = {
+    1: (1, 10, 100, 1000),
+    2: (1, 20, 100, 2000),
+    3: (1, 20, 200, 500),
+    4: (1, 142, 200, 3000),
+    5: (1, 143, 100, 700),
+    6: (2, 30, 100, 100),
+    7: (2, 142, 100, 50),
+}
+
+
+@pytest.fixture
+def analytics(client, amo):
+    amo.put_pipeline(1, [(10, "Новая", 10), (20, "Переговоры", 20), (142, "Успешно", 10000), (143, "Закрыто", 10001)])
+    amo.put_pipeline(2, [(30, "Первичный контакт", 10), (142, "Успешно", 10000), (143, "Закрыто", 10001)])
+    for lead_id, (pipeline_id, status_id, user_id, price) in LEADS.items():
+        amo.put(lead_id, BASE + lead_id, pipeline_id=pipeline_id, status_id=status_id, responsible_user_id=user_id, price=price)
+    return client.paired(LeadsAnalytics, "load", client.session)
+
+
+def stages(funnel):
+    return [(stage.responsible_user_id, stage.status_id, stage.count, stage.reached, stage.conversion) for stage in funnel]
+
+
+def test_group_by(analytics):
+    assert len(analytics) == 7
+    assert [(stat.count, stat.price_sum) for stat in analytics.group_by()] == [(7, 7350)]
+    assert [(stat.pipeline_name, stat.status_name, stat.count, stat.price_sum) for stat in analytics.by_status()] == [
+        ("Pipeline 1", "Новая", 1, 1000),
+        ("Pipeline 1", "Переговоры", 2, 2500),
+        ("Pipeline 1", "Успешно", 1, 3000),
+        ("Pipeline 1", "Закрыто", 1, 700),
+        ("Pipeline 2", "Первичный контакт", 1, 100),
+        ("Pipeline 2", "Успешно", 1, 50),
+    ]
+    assert [(stat.responsible_user_id, stat.count) for stat in analytics.group_by("responsible_user_id")] == [(100, 5), (200, 2)]
+    with pytest.raises(ValueError, match="unknown group key"):
+        analytics.group_by("price")
+
+
+def test_funnel(analytics):
+    # Нереализованная сделка учитывается только на первом этапе
+    assert stages(analytics.funnel(1)) == [(None, 10, 1, 5, None), (None, 20, 2, 3, 0.6), (None, 142, 1, 1, 1 / 3)]
+    assert stages(analytics.funnel(1, by_responsible=True)) == [
+        (100, 10, 1, 3, None), (100, 20, 1, 1, 1 / 3), (100, 142, 0, 0, 0.0),
+        (200, 10, 0, 2, None), (200, 20, 1, 2, 1.0), (200, 142, 1, 1, 0.5),
+    ]
+    with pytest.raises(ValueError, match="pipeline 99 not found"):
+        analytics.funnel(99)
+
+
+def test_win_rate(analytics):
+    assert analytics.win_rate() == 2 / 3
+    assert analytics.win_rate(pipeline_id=1) == 0.5
+    assert analytics.win_rate(pipeline_id=99) is None
+
+
+def test_load_passes_filters(client, amo, analytics):
+    filtered = client.paired(LeadsAnalytics, "load", client.session, **{"filter[created_at][from]": BASE + 5})
+    assert len(filtered) == 3
+    assert [(stat.pipeline_id, stat.count) for stat in filtered.by_pipeline()] == [(1, 1), (2, 2)]
@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import BASE
+from py_amo import RetryPolicy
+from py_amo.schemas import LeadSchema
+
+
+@pytest.fixture
+def session_kwargs():
+    return {"retry_policy": RetryPolicy(max_attempts=1)}
+
+
+@pytest.fixture(autouse=True)
+def small_batches(client):
+    client.session.leads.BATCH_LIMIT = 2
+
+
+def errors_of(result):
+    return [(error.index, error.entity_id, error.status_code, error.message) for error in result.errors]
+
+
+def test_create_many_reports_failed_chunk(client, amo):
+    amo.fail(502, when=lambda method, path, payload: any(item["name"] == "c" for item in payload))
+
+    result = client.call("leads", "create_many", [LeadSchema(name=name) for name in "abcde"])
+    assert not result.ok
+    assert [chunk.indexes for chunk in result.failed_chunks] == [[2, 3]]
+    # Пустое тело ответа: сообщение из статуса, а не пустая строка
+    assert errors_of(result) == [
+        (2, None, 502, "Bulk POST leads failed: HTTP 502 Bad Gateway"),
+        (3, None, 502, "Bulk POST leads failed: HTTP 502 Bad Gateway"),
+    ]
+    assert len(result.entities) == 3
+    assert sorted(lead["name"] for lead in amo.leads.values()) == ["a", "b", "e"]
+
+
+def test_update_many_reports_failed_chunk(client, amo):
+    for lead_id in range(1, 6):
+        amo.put(lead_id, BASE)
+    amo.fail(400, body={"title": "Bad Request", "status": 400}, when=lambda method, path, payload: payload[0]["id"] == 5)
+
+    result = client.call("leads", "update_many", [LeadSchema(id=lead_id, name=f"new {lead_id}") for lead_id in range(1, 6)])
+    assert [chunk.ok for chunk in result.chunks] == [True, True, False]
+    assert errors_of(result) == [(4, 5, 400, "Bad Request")]
+    assert [entity.id for entity in result.entities] == [1, 2, 3, 4]
+    assert [amo.leads[lead_id]["name"] for lead_id in range(1, 6)] == ["new 1", "new 2", "new 3", "new 4", "Lead 5"]
+
+
+def test_delete_many_reports_each_failed_entity(client, amo):
+    for lead_id in range(1, 5):
+        amo.put(lead_id, BASE)
+    amo.fail(500, when=lambda method, path, payload: path.endswith("/4"))
+
+    result = client.call("leads", "delete_many", [1, 99, 3, 4])
+    assert [(chunk.indexes, chunk.ok) for chunk in result.chunks] == [([0, 1], False), ([2, 3], False)]
+    assert errors_of(result) == [
+        (1, 99, 404, "Delete leads with id 99 failed: HTTP 404 Not Found"),
+        (3, 4, 500, "Delete leads with id 4 failed: HTTP 500 Internal Server Error"),
+    ]
+    assert [entity.id for entity in result.entities] == [1, 3]
+    assert list(amo.leads) == [2, 4]
+
+
+def test_error_detail_is_kept_when_present(client, amo):
+    amo.fail(400, body={"title": "Bad Request", "detail": "name is too long"})
+    result = client.call("leads", "create_many", [LeadSchema(name="x")])
+    assert errors_of(result) == [(0, None, 400, "name is too long")]
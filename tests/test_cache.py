@@ -0,0 +1,90 @@
+import pytest
+
+from conftest import BASE
+from py_amo import AsyncAmoSession, ResponseCache, RedisCacheBackend
+from py_amo.services.cache import CacheBackend, MemoryCacheBackend
+
+
+@pytest.fixture
+def session_kwargs(fake_time):
+    # Сделки кэшируются только в этих тестах: FakeAmo отдает лишь сделки и события
+    return {"cache": ResponseCache(ttl={"leads": 60})}
+
+
+def lead_names(client):
+    return [lead.name for lead in client.call("leads", "get_all")]
+
+
+def test_memory_backend_expires_records(fake_time):
+    backend = MemoryCacheBackend()
+    backend.set("a", "1", ttl=10)
+    fake_time.now += 9.9
+    assert backend.get("a") == "1"
+    fake_time.now += 0.1
+    assert backend.get("a") is None
+    # Устаревшая запись удаляется при чтении
+    assert len(backend) == 0
+
+
+def test_memory_backend_evicts_least_recently_used(fake_time):
+    backend = MemoryCacheBackend(maxsize=2)
+    backend.set("a", "1", 60)
+    backend.set("b", "2", 60)
+    assert backend.get("a") == "1"
+    backend.set("c", "3", 60)
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == ("1", None, "3")
+    # Перезапись тоже освежает запись
+    backend.set("a", "4", 60)
+    backend.set("d", "5", 60)
+    assert (backend.get("a"), backend.get("c"), backend.get("d")) == ("4", None, "5")
+
+
+def test_delete_prefix_invalidates_only_its_type():
+    backend = MemoryCacheBackend()
+    cache = ResponseCache(backend)
+    for entity_type in ("users", "user_roles"):
+        cache.set(cache.make_key("test", entity_type, "/url", {"page": 1}), {"type": entity_type}, 60)
+    cache.set(cache.make_key("other", "users", "/url"), {"type": "other"}, 60)
+
+    cache.invalidate("test", "users")
+    assert cache.get(cache.make_key("test", "users", "/url", {"page": 1})) is None
+    assert cache.get(cache.make_key("test", "user_roles", "/url", {"page": 1})) == {"type": "user_roles"}
+    assert cache.get(cache.make_key("other", "users", "/url")) == {"type": "other"}
+
+
+def test_session_reads_through_cache_until_ttl(client, amo, fake_time):
+    amo.put(1, BASE, name="Первая")
+    assert lead_names(client) == lead_names(client) == ["Первая"]
+    assert len(amo.queries) == 1
+
+    amo.leads[1]["name"] = "Переименована"
+    fake_time.now += 61
+    assert lead_names(client) == ["Переименована"]
+    assert len(amo.queries) == 2
+
+    # Сброс типа сущностей - следующий запрос снова идет в API
+    amo.leads[1]["name"] = "Снова"
+    client.session.leads._invalidate_cache()
+    assert lead_names(client) == ["Снова"]
+    assert len(amo.queries) == 3
+
+
+def test_backends_must_implement_every_method():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+    class WithoutDelete(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl):
+            pass
+
+    with pytest.raises(TypeError, match="delete_prefix"):
+        WithoutDelete()
+
+
+def test_async_session_refuses_blocking_backend():
+    with pytest.raises(ValueError, match="RedisCacheBackend blocks the event loop"):
+        AsyncAmoSession("token", "test", cache=ResponseCache(backend=RedisCacheBackend(client=None)))
+    assert not MemoryCacheBackend.BLOCKING
@@ -0,0 +1,73 @@
+import pytest
+
+from conftest import BASE
+from py_amo.schemas import CustomFieldShema, CustomFieldValues, LeadSchema
+
+FIELDS = [
+    {"field_id": 5, "field_code": "PHONE", "field_name": "Телефон", "values": [{"value": "+7 900"}, {"value": "+7 901"}]},
+    {"field_id": 6, "field_name": "Город", "values": [{"value": "Москва"}]},
+    {"field_id": 7, "field_name": "Источник", "values": [{"value": "Сайт", "enum_id": 70}]},
+]
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "trusted"])
+def session_kwargs(request):
+    return {"trusted": request.param}
+
+
+@pytest.fixture
+def lead(client, amo):
+    amo.put(1, BASE, custom_fields_values=FIELDS)
+    return client.call("leads", "get_all")[0]
+
+
+def test_read_by_id_code_and_name(lead):
+    cf = lead.cf
+    assert cf[5].field_code == "PHONE" and 5 in cf and 99 not in cf
+    assert cf.get(99) is None and cf.get(99, "default") == "default"
+    with pytest.raises(KeyError):
+        cf[99]
+    assert cf.by_code("PHONE") is cf[5] and cf.by_code("EMAIL") is None
+    assert cf.by_name("Город") is cf[6]
+    assert cf.value(5) == "+7 900" and cf.value(99, "нет") == "нет"
+    assert len(cf) == 3 and [field.field_id for field in cf] == [5, 6, 7]
+    # Доступ индексом: объект тот же, что в custom_fields_values
+    assert lead.custom_fields_values[1] is cf[6]
+
+
+def test_changes_go_to_payload_and_update(client, amo, lead):
+    cf = lead.cf
+    cf[6] = "Казань"
+    cf[7] = {"enum_id": 71}
+    cf[8] = ["a", CustomFieldValues(value="b")]
+    cf.set_by_code("EMAIL", "user@example.com")
+
+    payload = cf.payload()
+    assert payload == [
+        {"field_id": 6, "values": [{"value": "Казань"}]},
+        {"field_id": 7, "values": [{"enum_id": 71}]},
+        {"field_id": 8, "values": [{"value": "a"}, {"value": "b"}]},
+        {"field_code": "EMAIL", "values": [{"value": "user@example.com"}]},
+    ]
+    # Новые поля добавлены в сущность и доступны через индексы
+    assert cf.value(8) == "a" and cf.by_code("EMAIL").values[0].value == "user@example.com"
+    assert len(lead.custom_fields_values) == 5
+    assert cf.value(5) == "+7 900"
+
+    result = client.call("leads", "update_many", [LeadSchema(id=lead.id, custom_fields_values=payload)])
+    assert result.ok
+    assert amo.leads[1]["custom_fields_values"] == payload
+
+
+def test_indexes_follow_replaced_fields(lead):
+    assert lead.cf.value(6) == "Москва"
+    lead.custom_fields_values = [CustomFieldShema(field_id=9, values=[{"value": 1}])]
+    assert lead.cf.get(6) is None and lead.cf.value(9) == 1
+
+
+def test_entity_without_custom_fields():
+    lead = LeadSchema(id=1)
+    assert len(lead.cf) == 0 and lead.cf.get(1) is None and lead.cf.payload() == []
+    lead.cf[1] = 10
+    assert lead.custom_fields_values[0].field_id == 1
+    assert lead.cf.payload() == [{"field_id": 1, "values": [{"value": 10}]}]
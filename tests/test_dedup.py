@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from conftest import BASE
+from py_amo import DuplicateFinder, MemoryDedupIndex, SQLiteDedupIndex
+from py_amo.services.dedup import DedupIndex
+
+
+def contacts(phone=None, email=None):
+    fields = []
+    if phone:
+        fields.append({"field_id": 1, "field_code": "PHONE", "values": [{"value": phone}]})
+    if email:
+        fields.append({"field_id": 2, "field_code": "EMAIL", "values": [{"value": email}]})
+    return fields
+
+
+def scan(client, finder, **kwargs):
+    if not client.is_async:
+        return [(cluster.ids, cluster.keys) for cluster in finder.scan(client.session.leads, **kwargs)]
+
+    async def collect():
+        return [(cluster.ids, cluster.keys) async for cluster in finder.ascan(client.session.leads, **kwargs)]
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    index = MemoryDedupIndex() if request.param == "memory" else SQLiteDedupIndex(str(tmp_path / "dedup.db"), commit_every=2)
+    yield index
+    index.close()
+
+
+def test_clusters_are_yielded_as_they_grow(client, amo, index):
+    amo.put(1, BASE, custom_fields_values=contacts("+7 (900) 123-45-67"))
+    amo.put(2, BASE, custom_fields_values=contacts(email="Ivan@Example.ru"))
+    amo.put(3, BASE, custom_fields_values=contacts("89001234567"))
+    amo.put(4, BASE, custom_fields_values=contacts("+7 900 000-00-00"))
+    amo.put(5, BASE, custom_fields_values=contacts("9001234567", " ivan@example.ru"))
+    amo.put(6, BASE)
+
+    finder = DuplicateFinder(index=index)
+    assert scan(client, finder) == [
+        ([1, 3], ["phone:9001234567"]),
+        # Пятая сделка связала кластер по телефону со второй по email
+        ([1, 2, 3, 5], ["phone:9001234567", "email:ivan@example.ru"]),
+    ]
+    assert finder.entity_type == "leads"
+    assert [cluster.ids for cluster in finder.clusters()] == [[1, 2, 3, 5]]
+
+
+def test_bridge_joins_two_clusters(client, amo):
+    amo.put(1, BASE, custom_fields_values=contacts("+7 900 111-11-11"))
+    amo.put(2, BASE, custom_fields_values=contacts("8 900 111 11 11"))
+    amo.put(3, BASE, custom_fields_values=contacts(email="a@b.ru"))
+    amo.put(4, BASE, custom_fields_values=contacts(email="A@B.RU"))
+    amo.put(5, BASE, custom_fields_values=contacts("9001111111", "a@b.ru"))
+
+    finder = DuplicateFinder()
+    assert [ids for ids, _ in scan(client, finder)] == [[1, 2], [3, 4], [1, 2, 3, 4, 5]]
+    [cluster] = finder.clusters()
+    assert sorted(cluster.keys) == ["email:a@b.ru", "phone:9001111111"]
+
+
+def test_similar_names_within_block(client, amo):
+    for lead_id, name in enumerate(["Иванов Иван", "иван, ИВАНОВ", "Иваненко Ивар", "Иванов Иван"], start=1):
+        amo.put(lead_id, BASE, name=name)
+
+    assert scan(client, DuplicateFinder()) == []
+    finder = DuplicateFinder(name_similarity=0.9)
+    # Третья сделка в том же блоке "ива ива", но имя отличается сильнее порога
+    assert scan(client, finder) == [([1, 2], ["name:иван иванов"]), ([1, 2, 4], ["name:иван иванов"])]
+
+
+def test_sqlite_index_survives_restart(tmp_path):
+    path = str(tmp_path / "dedup.db")
+    index = SQLiteDedupIndex(path, commit_every=100)
+    assert index.setdefault("phone:1", 10) is None
+    assert index.setdefault("phone:1", 11) == (10, "")
+    index.close()
+
+    # Незафиксированные пачкой вставки фиксируются при close
+    index = SQLiteDedupIndex(path)
+    assert index.setdefault("phone:1", 12, "payload") == (10, "")
+    index.close()
+
+
+def test_dedup_index_requires_setdefault():
+    class Incomplete(DedupIndex):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,83 @@
+import asyncio
+
+from conftest import BASE
+from py_amo.services.sync import MemoryCursorStore
+
+KEY = "test:events"
+
+
+def put_events(amo, ids, created_at):
+    for event_id in ids:
+        # id событий не связаны с временем: по id (порядок ответа FakeAmo) они идут вперемешку
+        amo.put_event(f"e{event_id:02d}", created_at(event_id))
+
+
+def scattered(event_id):
+    return BASE + (event_id * 37 % 50) * 100
+
+
+def oldest(client, **params):
+    repository = client.session.events
+    if not client.is_async:
+        return repository._oldest_timestamp("created_at", params)
+    return asyncio.run(repository._oldest_timestamp("created_at", params))
+
+
+def test_changes_do_not_depend_on_server_order(client, amo, clock):
+    put_events(amo, range(1, 31), scattered)
+    store = MemoryCursorStore()
+
+    changes = client.changes(store, entity_type="events", window=1000)
+    assert sorted(changes) == sorted(amo.events) and len(changes) == 30
+    assert not any(key.startswith("order[") for query in amo.queries for key in query)
+    # Полностью прочитанное окно сдвигает отметку за свой конец
+    assert store.load(KEY).updated_at == clock.now
+
+    amo.queries.clear()
+    assert client.changes(store, entity_type="events", window=1000) == []
+    # Следующее окно еще не закрыто - запросов нет
+    assert amo.queries == []
+    clock.now += 1000
+    amo.put_event("new", clock.now - 1)
+    assert client.changes(store, entity_type="events", window=1000) == ["new"]
+
+
+def test_new_events_in_the_cursor_second_are_returned(client, amo, clock):
+    store = MemoryCursorStore()
+    clock.now = BASE + 1000
+    amo.put_event("a", BASE + 500)
+    amo.put_event("b", BASE + 999)
+    assert client.changes(store, entity_type="events", from_date=BASE, window=300) == ["a", "b"]
+    cursor = store.load(KEY)
+    assert (cursor.updated_at, cursor.ids) == (BASE + 999, {"b"})
+
+    # Событие в текущей секунде отдается только следующим запуском, когда секунда закрыта
+    amo.put_event("c", BASE + 999)
+    amo.put_event("d", BASE + 1000)
+    clock.now = BASE + 2000
+    assert client.changes(store, entity_type="events", window=300) == ["c", "d"]
+    assert client.changes(store, entity_type="events", window=300) == []
+
+
+def test_interrupted_run_repeats_only_current_window(client, amo, clock):
+    store = MemoryCursorStore()
+    clock.now = BASE + 400
+    for second in range(4):
+        for index in range(3):
+            amo.put_event(f"{second}{index}", BASE + second * 100 + index)
+
+    assert client.changes(store, limit=4, entity_type="events", from_date=BASE, window=100) == ["00", "01", "02", "10"]
+    assert store.load(KEY).updated_at == BASE + 100
+    assert client.changes(store, entity_type="events", window=100) == ["10", "11", "12", "20", "21", "22", "30", "31", "32"]
+
+
+def test_oldest_timestamp_without_order(client, amo, clock):
+    assert oldest(client) == clock.now
+    amo.put_event("late", BASE + 5000)
+    amo.put_event("early", BASE + 3000)
+    amo.queries.clear()
+
+    found = oldest(client)
+    assert BASE + 3000 - client.session.events.OLDEST_PRECISION < found <= BASE + 3000
+    assert not any(key.startswith("order[") for query in amo.queries for key in query)
+    assert len(amo.queries) < 20
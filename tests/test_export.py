@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import BASE
+from py_amo.services.export import ColumnarExport, ExportColumn
+from py_amo.schemas import LeadSchema
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def custom_field(field_id, value):
+    return [{"field_id": field_id, "values": [{"value": value}]}]
+
+
+def test_custom_field_changing_type_between_row_groups(session, amo, tmp_path):
+    for lead_id in range(1, 601):
+        amo.put(lead_id, BASE + lead_id, custom_fields_values=custom_field(9, lead_id if lead_id <= 300 else "abc"))
+    path = str(tmp_path / "leads.parquet")
+
+    rows = session.leads.export_parquet(path, columns=["id", "price"], custom_fields={"cf9": 9}, row_group_size=250)
+
+    table = pq.read_table(path)
+    assert rows == table.num_rows == 600
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("cf9").type == pa.string()
+    values = table.column("cf9").to_pylist()
+    assert values[0] == "1" and values[299] == "300" and values[300] == "abc"
+    assert table.column("price").null_count == 600
+
+
+def test_arrow_schema_does_not_depend_on_values():
+    schemas = []
+    for value in (1, "abc", {"a": 1}, None):
+        export = ColumnarExport(["id", "name"], {"cf": 1}, LeadSchema)
+        export.add({"id": 1, "name": "x", "custom_fields_values": custom_field(1, value)})
+        schemas.append(export.to_arrow().schema)
+    assert all(schema == schemas[0] == export.arrow_schema() for schema in schemas)
+    assert export.to_arrow().column("cf").to_pylist() == [None]
+    assert ColumnarExport(["id"], {"cf": 1}).to_arrow().num_rows == 0
+
+
+def test_objects_become_json_strings():
+    column = ExportColumn()
+    for value in ("text", 5, True, {"city": "Москва"}, None):
+        column.append(value)
+    assert column.to_arrow().to_pylist() == ["text", "5", "true", '{"city": "Москва"}', None]
+    # В NumPy значения остаются как есть
+    assert column.to_numpy().tolist() == ["text", 5, True, {"city": "Москва"}, None]
+
+
+def test_unconvertible_numbers_are_null():
+    column = ExportColumn(int)
+    for value in (1, "2", "abc", None, 2**70, float("nan")):
+        column.append(value)
+    assert column.to_arrow().to_pylist() == [1, 2, None, None, None, None]
+
+
+def test_fractions_in_int_column_are_not_truncated():
+    column = ExportColumn(int)
+    for value in (1999.99, "1999.99", 2000.0, True):
+        column.append(value)
+    assert column.to_arrow().to_pylist() == [None, None, 2000, 1]
+    assert column.to_numpy(fill_value=-1).tolist() == [-1, -1, 2000, 1]
+
+    floats = ExportColumn(float)
+    for value in (1999.99, "0.5", 3):
+        floats.append(value)
+    assert floats.to_arrow().to_pylist() == [1999.99, 0.5, 3.0]
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from conftest import BASE
+from py_amo import ParquetSink
+from py_amo.services.export_job import ExportSink
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def put_leads(amo, clock, count):
+    clock.now = BASE + count + 10
+    # Доп. поле 9 - число в первой половине сделок и строка во второй
+    for lead_id in range(1, count + 1):
+        value = lead_id if lead_id <= count // 2 else "abc"
+        amo.put(lead_id, BASE + lead_id, custom_fields_values=[{"field_id": 9, "values": [{"value": value}]}])
+
+
+def fail_after(requests_count):
+    def on_request(amo, query):
+        if len(amo.queries) > requests_count:
+            raise RuntimeError("connection lost")
+
+    return on_request
+
+
+def test_parquet_parts_share_one_schema_across_resume(session, amo, clock, tmp_path):
+    put_leads(amo, clock, 40)
+    directory = str(tmp_path / "leads")
+    checkpoint = str(tmp_path / "leads.checkpoint.json")
+
+    def new_job():
+        sink = ParquetSink(directory, columns=["id", "price"], custom_fields={"cf9": 9}, rows_per_file=10)
+        return session.leads.export_job(sink, checkpoint, window=5, concurrency=1)
+
+    amo.on_request = fail_after(6)
+    with pytest.raises(RuntimeError):
+        new_job().run()
+    # До падения готова хотя бы одна часть - продолжение дописывает к ней новые
+    assert "part-00000.parquet" in os.listdir(directory)
+
+    amo.on_request = None
+    assert new_job().run() == 40
+
+    parts = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+    schemas = [pq.read_schema(os.path.join(directory, name)) for name in parts]
+    assert len(parts) > 1 and all(schema.equals(schemas[0]) for schema in schemas)
+    table = ds.dataset(directory, format="parquet").to_table()
+    ids = table.column("id").to_pylist()
+    assert sorted(ids) == list(range(1, 41))
+    assert table.schema.field("cf9").type == pa.string()
+    assert set(table.column("cf9").to_pylist()) == {str(lead_id) for lead_id in range(1, 21)} | {"abc"}
+
+
+def test_parts_with_another_schema_are_not_resumed(session, amo, clock, tmp_path):
+    put_leads(amo, clock, 40)
+    directory = str(tmp_path / "leads")
+    checkpoint = str(tmp_path / "leads.checkpoint.json")
+    sink = ParquetSink(directory, columns=["id"], custom_fields={"cf9": 9}, rows_per_file=10)
+    amo.on_request = fail_after(6)
+    with pytest.raises(RuntimeError):
+        session.leads.export_job(sink, checkpoint, window=5, concurrency=1).run()
+    # Часть, записанная с другим типом доп. поля (как до закрепления схемы)
+    pq.write_table(pa.table({"id": [1], "cf9": [1]}), os.path.join(directory, "part-00000.parquet"))
+
+    amo.on_request = None
+    with pytest.raises(ValueError, match="another schema"):
+        session.leads.export_job(sink, checkpoint, window=5, concurrency=1).run()
+
+
+def test_sink_needs_only_write():
+    class Incomplete(ExportSink):
+        pass
+
+    class Collecting(ExportSink):
+        def write(self, items):
+            pass
+
+    with pytest.raises(TypeError, match="write"):
+        Incomplete()
+    assert Collecting().flush() == {} and list(Collecting().seen_ids()) == []
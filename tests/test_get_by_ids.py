@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+from conftest import BASE, PAGE_SIZE
+from py_amo import RetryPolicy
+from py_amo.exceptions import ServerError
+from py_amo.schemas import IdsResult
+
+
+@pytest.fixture
+def session_kwargs():
+    return {"retry_policy": RetryPolicy(max_attempts=1)}
+
+
+def test_found_in_input_order_and_missing_ids(client, amo):
+    for lead_id in range(1, 13):
+        amo.put(lead_id, BASE + lead_id)
+    ids = [12, 3, 404, 3, *range(1, 12), 500]
+
+    result = client.call("leads", "get_by_ids", ids)
+    assert [lead.id for lead in result] == [12, 3, 1, 2, *range(4, 12)]
+    assert result.missing_ids == [404, 500]
+    assert not result.ok
+    # Повторы схлопываются, пачки - не больше страницы
+    requested = [query["filter[id][]"] for query in amo.queries]
+    assert all(len(chunk) <= PAGE_SIZE for chunk in requested)
+    assert sorted(int(entity_id) for chunk in requested for entity_id in chunk) == sorted(set(ids))
+
+
+def test_empty_input_sends_nothing(client, amo):
+    result = client.call("leads", "get_by_ids", [])
+    assert result == [] and result.missing_ids == [] and result.ok
+    assert amo.queries == []
+
+
+def test_chunk_error_is_raised(client, amo):
+    amo.put(1, BASE)
+    amo.fail(500)
+    with pytest.raises(ServerError):
+        client.call("leads", "get_by_ids", [1, 2])
+
+
+def test_ids_result_is_a_list():
+    result = IdsResult(["a", "b"], [3])
+    assert result == ["a", "b"] and isinstance(result, list)
+    assert result.missing_ids == [3] and not result.ok
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == ["a", "b"] and restored.missing_ids == [3]
+    assert IdsResult(["a"]).ok
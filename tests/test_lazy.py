@@ -0,0 +1,128 @@
+import copy
+import json
+import pickle
+
+import pytest
+from pydantic import ValidationError
+from pydantic_core import PydanticSerializationError
+
+from py_amo.schemas import CompanySchema, CustomFieldShema, LazyList, LeadSchema
+from py_amo.services.parsing import construct
+
+FIELDS = [
+    {"field_id": 1, "field_code": "PHONE", "values": [{"value": "+7 900"}]},
+    {"field_id": 2, "field_name": "Город", "values": [{"value": "Москва"}]},
+]
+
+
+def lead(fields=FIELDS, **data):
+    return LeadSchema(id=1, custom_fields_values=fields, **data)
+
+
+@pytest.fixture(params=["validated", "trusted"])
+def make_lead(request):
+    if request.param == "validated":
+        return lambda fields=FIELDS: LeadSchema(id=1, custom_fields_values=fields)
+    return lambda fields=FIELDS: construct(LeadSchema, {"id": 1, "custom_fields_values": fields})
+
+
+def test_items_are_built_on_first_access(make_lead):
+    fields = make_lead().custom_fields_values
+    assert isinstance(fields, LazyList[CustomFieldShema])
+    assert not fields.is_materialized
+    # len и bool не разбирают элементы
+    assert len(fields) == 2 and fields
+    assert not fields.is_materialized
+    assert fields[0].field_code == "PHONE"
+    assert fields.is_materialized
+    assert all(isinstance(field, CustomFieldShema) for field in list.__iter__(fields))
+
+
+def test_iteration_and_reads(make_lead):
+    fields = make_lead().custom_fields_values
+    assert [field.field_id for field in fields] == [1, 2]
+    fields = make_lead().custom_fields_values
+    assert [field.field_id for field in reversed(fields)] == [2, 1]
+    fields = make_lead().custom_fields_values
+    assert CustomFieldShema(**FIELDS[1]) in fields
+    assert fields.index(CustomFieldShema(**FIELDS[1])) == 1
+    assert fields[-1:] == [CustomFieldShema(**FIELDS[1])]
+
+
+def test_equality_does_not_depend_on_reads(make_lead):
+    read, unread = make_lead(), make_lead()
+    list(read.custom_fields_values)
+    assert read.custom_fields_values.is_materialized and not unread.custom_fields_values.is_materialized
+    assert unread.custom_fields_values == read.custom_fields_values
+    assert read.custom_fields_values == unread.custom_fields_values
+    assert make_lead() == make_lead()
+    assert make_lead().custom_fields_values == [CustomFieldShema(**field) for field in FIELDS]
+    assert make_lead().custom_fields_values != make_lead(FIELDS[:1]).custom_fields_values
+
+
+def test_dump_does_not_depend_on_reads(make_lead):
+    read, unread = make_lead(), make_lead()
+    read.custom_fields_values[0]
+    assert unread.model_dump() == read.model_dump()
+    assert unread.model_dump_json() == read.model_dump_json()
+    dumped = json.loads(unread.model_dump_json(exclude_none=True))
+    assert dumped["custom_fields_values"] == FIELDS
+    assert unread.model_dump(exclude_none=True)["custom_fields_values"] == FIELDS
+
+
+def test_round_trip_through_json(make_lead):
+    original = make_lead()
+    assert LeadSchema.model_validate_json(original.model_dump_json()) == original
+
+
+@pytest.mark.parametrize("read_first", [False, True])
+def test_pickle_and_deepcopy(make_lead, read_first):
+    original = make_lead()
+    if read_first:
+        original.custom_fields_values[0]
+    for restored in (pickle.loads(pickle.dumps(original)), copy.deepcopy(original)):
+        fields = restored.custom_fields_values
+        assert type(fields) is type(original.custom_fields_values)
+        assert fields.is_materialized == read_first
+        assert restored == original
+        assert fields is not original.custom_fields_values
+    assert copy.copy(original.custom_fields_values) == original.custom_fields_values
+
+
+def test_invalid_item_raises_on_first_access_and_again():
+    fields = lead([{"field_id": "not a number"}]).custom_fields_values
+    for _ in range(2):
+        # Список остается неразобранным: каждое чтение снова выбрасывает ошибку, а не отдает словари
+        with pytest.raises(ValidationError):
+            fields[0]
+        assert not fields.is_materialized
+    # Выгрузка тоже разбирает список: pydantic оборачивает ошибку разбора в PydanticSerializationError
+    with pytest.raises(PydanticSerializationError, match="validation error for CustomFieldShema"):
+        lead([{"field_id": "not a number"}]).model_dump()
+
+
+def test_not_a_list_fails_validation():
+    with pytest.raises(ValidationError):
+        LeadSchema(id=1, custom_fields_values={"field_id": 1})
+    assert LeadSchema(id=1, custom_fields_values=None).custom_fields_values is None
+
+
+def test_mutation_keeps_list_usable():
+    fields = lead().custom_fields_values
+    fields.append(CustomFieldShema(field_id=3))
+    assert [field.field_id for field in fields] == [1, 2, 3]
+    assert fields.pop().field_id == 3
+    assert fields + [CustomFieldShema(field_id=4)] == [*fields, CustomFieldShema(field_id=4)]
+
+
+def test_nested_embedded_lists_are_lazy():
+    company = CompanySchema.model_validate({"id": 1, "_embedded": {"tags": [{"id": 5, "name": "vip"}]}})
+    tags = company.emb.tags
+    assert not tags.is_materialized
+    assert tags[0].name == "vip"
+    assert company.model_dump(by_alias=True)["_embedded"]["tags"][0]["name"] == "vip"
+
+
+def test_plain_lazy_list_class_is_cached_per_schema():
+    assert LazyList[CustomFieldShema] is LazyList[CustomFieldShema]
+    assert LazyList[CustomFieldShema]([1]).is_materialized
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from conftest import BASE, PAGE_SIZE
+from py_amo import RetryPolicy
+from py_amo.exceptions import ServerError
+from py_amo.services.loader import AsyncBatchLoader
+
+
+@pytest.fixture
+def session_kwargs():
+    return {"retry_policy": RetryPolicy(max_attempts=1)}
+
+
+def requested_ids(amo):
+    return [[int(value) for value in query.get("filter[id][]", [])] for query in amo.queries]
+
+
+def put_leads(amo, count):
+    for lead_id in range(1, count + 1):
+        amo.put(lead_id, BASE + lead_id)
+
+
+def test_loads_in_one_pass_share_a_request(async_session, amo):
+    put_leads(amo, 3)
+
+    async def load():
+        leads = async_session.leads
+        return await asyncio.gather(leads.load(3), leads.load(1), leads.load(3), leads.load(99))
+
+    three, one, three_again, missing = asyncio.run(load())
+    assert (three.id, one.id, three_again.id, missing) == (3, 1, 3, None)
+    # Повторы схлопнуты, ненайденный id получает None
+    assert requested_ids(amo) == [[3, 1, 99]]
+    assert async_session.leads._loaders == {}
+
+
+def test_load_many_splits_past_max_limit(async_session, amo):
+    put_leads(amo, 12)
+    ids = [12, 4, 100, *range(1, 12)]
+
+    leads = asyncio.run(async_session.leads.load_many(ids))
+    assert [lead.id if lead else None for lead in leads] == [12, 4, None, *range(1, 12)]
+    chunks = requested_ids(amo)
+    assert all(len(chunk) <= PAGE_SIZE for chunk in chunks)
+    assert sorted(sum(chunks, [])) == sorted(set(ids))
+    assert len(chunks) == 3
+
+
+def test_load_many_splits_by_query_length(async_session, amo):
+    put_leads(amo, 4)
+    async_session.leads.MAX_QUERY_LENGTH = len("filter%5Bid%5D%5B%5D=1&") * 2
+    assert [lead.id for lead in asyncio.run(async_session.leads.load_many([1, 2, 3, 4]))] == [1, 2, 3, 4]
+    assert requested_ids(amo) == [[1, 2], [3, 4]]
+
+
+def test_different_kwargs_are_separate_requests(async_session, amo):
+    put_leads(amo, 2)
+
+    async def load():
+        leads = async_session.leads
+        return await asyncio.gather(leads.load(1), leads.load(2, **{"with": "contacts"}), leads.load(2))
+
+    assert [lead.id for lead in asyncio.run(load())] == [1, 2, 2]
+    assert sorted(requested_ids(amo)) == [[1, 2], [2]]
+    assert sorted(query.get("with", "") for query in amo.queries) == ["", "contacts"]
+
+
+def test_chunk_error_reaches_only_its_keys(async_session, amo):
+    put_leads(amo, 10)
+    amo.fail(500)
+
+    async def load():
+        leads = async_session.leads
+        return await asyncio.gather(*(leads.load(lead_id) for lead_id in range(1, 11)), return_exceptions=True)
+
+    results = asyncio.run(load())
+    failed = [lead_id for lead_id, result in zip(range(1, 11), results) if isinstance(result, ServerError)]
+    loaded = [result.id for result in results if not isinstance(result, Exception)]
+    assert failed in ([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+    assert sorted(failed + loaded) == list(range(1, 11))
+
+
+def test_batch_loader_collects_keys_per_loop_pass():
+    batches, dispatched = [], []
+
+    async def batch_load(keys):
+        batches.append(keys)
+        return {key: key * 10 for key in keys if key != 0}
+
+    async def main():
+        def pairs(keys):
+            return [keys[start:start + 2] for start in range(0, len(keys), 2)]
+
+        loader = AsyncBatchLoader(batch_load, pairs, lambda: dispatched.append(1))
+        first = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(0), loader.load(3))
+        second = await loader.load_many([4, 5])
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == [10, 20, 10, None, 30]
+    assert second == [40, 50]
+    assert batches == [[1, 2], [0, 3], [4, 5]]
+    assert dispatched == [1, 1]
+
+
+def test_batch_loader_cancelled_waiter_keeps_batch():
+    async def main():
+        release = asyncio.Event()
+
+        async def batch_load(keys):
+            await release.wait()
+            return {key: str(key) for key in keys}
+
+        loader = AsyncBatchLoader(batch_load)
+        cancelled = asyncio.ensure_future(loader.load(1))
+        waiter = asyncio.ensure_future(loader.load(1))
+        other = asyncio.ensure_future(loader.load(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        return await asyncio.gather(waiter, other), cancelled.cancelled()
+
+    assert asyncio.run(main()) == (["1", "2"], True)
@@ -0,0 +1,102 @@
+import pytest
+
+from conftest import BASE
+from py_amo import SQLiteMirror
+from py_amo.schemas import ContactSchema, LeadSchema
+
+
+def phone(number):
+    return [{"field_id": 1, "field_code": "PHONE", "values": [{"value": number}]}]
+
+
+def put_leads(amo, count):
+    for lead_id in range(1, count + 1):
+        amo.put(lead_id, BASE + lead_id, custom_fields_values=phone(f"+7 900 000-00-{lead_id:02d}"))
+
+
+@pytest.fixture
+def mirror():
+    with SQLiteMirror() as mirror:
+        yield mirror
+
+
+def test_fill_then_refresh_writes_only_changes(client, amo, clock, mirror):
+    put_leads(amo, 12)
+    assert client.paired(mirror, "fill", client.session.leads) == 12
+    assert mirror.count("leads") == 12
+
+    amo.leads[3]["updated_at"] = BASE + 100
+    amo.leads[3]["name"] = "Переименована"
+    amo.put(13, BASE + 50)
+    amo.queries.clear()
+    assert client.paired(mirror, "refresh", client.session.leads) == 2
+    # Первый refresh после fill запрашивает только изменения
+    assert amo.queries[0]["filter[updated_at][from]"] == str(BASE + 12)
+    assert mirror.get_by_id("leads", 3).name == "Переименована"
+    assert mirror.count("leads") == 13
+    assert client.paired(mirror, "refresh", client.session.leads) == 0
+
+
+def test_entities_changed_during_fill_are_refreshed(client, amo, clock, mirror):
+    put_leads(amo, 12)
+    # Выгрузка стартовала, когда сделки 6-12 уже могли меняться: отметка ставится ниже старта
+    clock.now = BASE + 6
+    client.paired(mirror, "fill", client.session.leads)
+    assert client.paired(mirror, "refresh", client.session.leads) == 7
+
+
+def test_partial_fill_does_not_set_cursor(client, amo, clock, mirror):
+    put_leads(amo, 6)
+    client.paired(mirror, "fill", client.session.leads, **{"filter[updated_at][from]": BASE + 4})
+    assert mirror.count("leads") == 3
+    assert mirror.cursor_store.load(mirror.get_sync_key(client.session.leads)) is None
+    assert client.paired(mirror, "refresh", client.session.leads) == 6
+
+
+def test_queries(mirror):
+    mirror.upsert("leads", [
+        LeadSchema(id=1, name="a", pipeline_id=1, status_id=142, custom_fields_values=phone("8 (900) 123-45-67")),
+        LeadSchema(id=2, name="b", pipeline_id=1, status_id=143, custom_fields_values=[
+            {"field_id": 7, "values": [{"value": "Москва"}, {"value": {"city": "Казань"}}]},
+        ]),
+        LeadSchema(id=3, name="c", pipeline_id=2, status_id=142),
+    ])
+    assert [lead.id for lead in mirror.find("leads", pipeline_id=1)] == [1, 2]
+    assert [lead.id for lead in mirror.find("leads", status_id=[142, 143], pipeline_id=1)] == [1, 2]
+    assert [lead.id for lead in mirror.find("leads", status_id=142)] == [1, 3]
+    # Телефон ищется в любом формате записи
+    assert [lead.id for lead in mirror.find_by_phone("+7 900 123 45 67", "leads")] == [1]
+    assert [lead.id for lead in mirror.find_by_custom_field("leads", "Москва", field_id=7)] == [2]
+    assert [lead.id for lead in mirror.find_by_custom_field("leads", {"city": "Казань"}, field_id=7)] == [2]
+
+    with pytest.raises(ValueError, match="Unknown column"):
+        mirror.find("leads", email="x")
+    with pytest.raises(ValueError, match="not mirrored"):
+        mirror.count("tasks")
+    with pytest.raises(ValueError, match="field_id or field_code"):
+        mirror.find_by_custom_field("leads", "x")
+
+
+def test_upsert_replaces_custom_field_values_and_delete_removes_them(mirror):
+    for name, number in (("old", "+7 900 111-11-11"), ("new", "+7 900 222-22-22")):
+        contact = ContactSchema(id=1, name=name, custom_fields_values=phone(number), _embedded={})
+        mirror.upsert("contacts", [contact])
+    assert mirror.find_by_phone("89001111111") == []
+    assert [contact.name for contact in mirror.find_by_phone("89002222222")] == ["new"]
+
+    mirror.delete("contacts", [1])
+    assert mirror.count("contacts") == 0
+    assert mirror._connection.execute("SELECT COUNT(*) FROM custom_field_values").fetchone()[0] == 0
+
+
+def test_file_mirror_keeps_data_and_cursor(client, amo, clock, tmp_path):
+    put_leads(amo, 4)
+    path = str(tmp_path / "amo.db")
+    with SQLiteMirror(path) as mirror:
+        client.paired(mirror, "fill", client.session.leads)
+
+    amo.put(5, BASE + 20)
+    with SQLiteMirror(path) as mirror:
+        assert mirror.count("leads") == 4
+        assert client.paired(mirror, "refresh", client.session.leads) == 1
+        assert mirror.count("leads") == 5
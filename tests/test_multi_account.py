@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from conftest import BASE, mock_transport
+from py_amo import AsyncAmoSession, MultiAccountExecutor, RateLimiter, RetryPolicy
+
+ACCOUNTS = [("token-a", "alpha"), ("token-b", "beta")]
+
+
+@pytest.fixture
+def executor(amo, fake_time):
+    executor = MultiAccountExecutor(
+        ACCOUNTS, rate_limiter_factory=lambda: RateLimiter(rps=5), retry_policy=RetryPolicy(jitter=False)
+    )
+    # Общий пул соединений отвечает из FakeAmo
+    executor.transport.transport = mock_transport(amo)
+    yield executor
+    asyncio.run(executor.aclose())
+
+
+def collect(executor, job):
+    async def run():
+        return {result.subdomain: result async for result in executor.map(job)}
+
+    return asyncio.run(run())
+
+
+def test_each_account_gets_its_own_limiter(executor):
+    alpha, beta = executor.sessions["alpha"].rate_limiter, executor.sessions["beta"].rate_limiter
+    assert alpha is not beta
+    assert alpha.max_rps == beta.max_rps == 5
+
+    own = RateLimiter(rps=2)
+    assert executor.add_account("token-c", "gamma", rate_limiter=own).rate_limiter is own
+
+
+def test_rate_limit_of_one_account_does_not_slow_others(executor, amo):
+    amo.put(1, BASE)
+    amo.fail(429)
+
+    results = collect(executor, lambda session: session.leads.get_all())
+    assert {subdomain: [lead.id for lead in result.value] for subdomain, result in results.items()} == {
+        "alpha": [1],
+        "beta": [1],
+    }
+    rates = sorted(session.rate_limiter.rate for session in executor.sessions.values())
+    assert rates == [2.5, 5]
+
+
+def test_shared_rate_limiter_is_refused():
+    with pytest.raises(ValueError, match="rate_limiter is per account"):
+        MultiAccountExecutor(ACCOUNTS, rate_limiter=RateLimiter())
+
+
+def test_duplicate_account_is_refused(executor, amo):
+    with pytest.raises(ValueError, match="beta is already added"):
+        executor.add_account("other-token", "beta")
+    session = AsyncAmoSession("other-token", "alpha", transport=mock_transport(amo))
+    with pytest.raises(ValueError, match="alpha is already added"):
+        executor.add_session(session)
+    asyncio.run(session.aclose())
+    assert list(executor.sessions) == ["alpha", "beta"]
+    with pytest.raises(ValueError, match="alpha is already added"):
+        MultiAccountExecutor([*ACCOUNTS, ("token-c", "alpha")])
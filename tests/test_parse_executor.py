@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from conftest import BASE
+from py_amo import RetryPolicy
+from py_amo.exceptions import ServerError
+
+
+class CountingPool(ProcessPoolExecutor):
+    """Пул процессов, который считает переданные ему страницы"""
+
+    submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with CountingPool(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "trusted"])
+def session_kwargs(request, pool):
+    return {"parse_executor": pool, "trusted": request.param, "retry_policy": RetryPolicy(max_attempts=1)}
+
+
+@pytest.fixture(autouse=True)
+def leads(amo):
+    for lead_id in range(1, 13):
+        fields = [{"field_id": 5, "field_code": "PHONE", "values": [{"value": f"+7 900 {lead_id:07d}"}]}]
+        amo.put(lead_id, BASE + lead_id, price=lead_id * 100, custom_fields_values=fields)
+
+
+def without_pool(client, method, **kwargs):
+    client.session.leads.parse_executor = None
+    try:
+        return client.call("leads", method, **kwargs)
+    finally:
+        client.session.leads.parse_executor = client.session.parse_executor
+
+
+@pytest.mark.parametrize("raw", [False, True], ids=["schemas", "raw"])
+def test_pages_parsed_in_processes_match_local_parsing(client, pool, raw):
+    submitted = pool.submitted
+    entities = client.call("leads", "get_all", raw=raw, limit=100)
+    # 12 сделок - три страницы по PAGE_SIZE, каждая разобрана в пуле
+    assert pool.submitted - submitted == 3
+    assert entities == without_pool(client, "get_all", raw=raw, limit=100)
+    assert [lead["id"] if raw else lead.id for lead in entities] == list(range(1, 13))
+    if not raw:
+        assert entities[2].cf.value(5) == "+7 900 0000003" and entities[2].price == 300
+
+
+def test_filters_and_empty_page(client):
+    leads = client.call("leads", "get_all", **{"filter[created_at][from]": BASE + 11})
+    assert [lead.id for lead in leads] == [11, 12]
+    assert client.call("leads", "get_all", **{"filter[created_at][from]": BASE + 100}) == []
+
+
+def test_error_response_is_raised_before_parsing(client, amo, pool):
+    amo.fail(500)
+    submitted = pool.submitted
+    with pytest.raises(ServerError):
+        client.call("leads", "get_all")
+    assert pool.submitted == submitted
@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, List, Optional, Union, get_args, get_origin
+
+import pytest
+from pydantic import BaseModel, PrivateAttr, ValidationError
+
+import py_amo.schemas as schemas
+from py_amo.schemas import LazyList, LeadSchema, PipelineSchema
+from py_amo.services.parsing import UNION_TYPES, construct, parse_page
+
+SCHEMAS = sorted(
+    {value for value in vars(schemas).values() if isinstance(value, type) and issubclass(value, BaseModel)},
+    key=lambda schema: schema.__name__,
+)
+
+
+def sample(annotation: Any) -> Any:
+    """Значение для поля с аннотацией annotation, как в ответе amoCRM"""
+    origin = get_origin(annotation)
+    if origin in UNION_TYPES:
+        return sample(next(arg for arg in get_args(annotation) if arg is not type(None)))
+    if origin in (list, List):
+        return [sample((get_args(annotation) or (Any,))[0]), sample((get_args(annotation) or (Any,))[0])]
+    if isinstance(annotation, type) and issubclass(annotation, LazyList):
+        return [sample(annotation.ITEM_SCHEMA), sample(annotation.ITEM_SCHEMA)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_data(annotation)
+    if origin in (dict, Dict) or annotation is dict:
+        return {"key": [1, 2]}
+    return {bool: True, int: 7, float: 1.5, str: "text"}.get(annotation, "any")
+
+
+def sample_data(schema_class) -> Dict[str, Any]:
+    return {field.alias or name: sample(field.annotation) for name, field in schema_class.model_fields.items()}
+
+
+def assert_same(trusted: BaseModel, validated: BaseModel):
+    assert type(trusted) is type(validated)
+    assert trusted == validated
+    assert trusted.model_fields_set == validated.model_fields_set
+    assert trusted.__pydantic_private__ == validated.__pydantic_private__
+    assert trusted.model_dump(by_alias=True) == validated.model_dump(by_alias=True)
+    assert trusted.model_dump_json() == validated.model_dump_json()
+
+
+@pytest.mark.parametrize("schema_class", SCHEMAS, ids=lambda schema: schema.__name__)
+def test_trusted_equals_validated_for_full_data(schema_class):
+    data = sample_data(schema_class)
+    # Ключ не из схемы отбрасывается в обоих случаях
+    data["_links"] = {"self": {"href": "x"}}
+    assert_same(construct(schema_class, json.loads(json.dumps(data))), schema_class.model_validate(data))
+
+
+@pytest.mark.parametrize("schema_class", SCHEMAS, ids=lambda schema: schema.__name__)
+def test_trusted_equals_validated_for_partial_data(schema_class):
+    # Только обязательные поля: остальные получают значения по умолчанию
+    data = {
+        field.alias or name: sample(field.annotation)
+        for name, field in schema_class.model_fields.items()
+        if field.is_required()
+    }
+    assert_same(construct(schema_class, data), schema_class.model_validate(data))
+
+
+def test_pipeline_statuses_private_attribute():
+    data = {"id": 1, "name": "Воронка", "_embedded": {"statuses": [{"id": 142, "name": "Успешно"}, {"id": 143}]}}
+    trusted, validated = construct(PipelineSchema, data), PipelineSchema.model_validate(data)
+    assert trusted.__pydantic_private__ == validated.__pydantic_private__ == {"_statuses": None}
+    assert [status.id for status in trusted.statuses] == [142, 143]
+    assert trusted.statuses == validated.statuses
+    assert trusted.__pydantic_private__ == validated.__pydantic_private__
+    # Приватные атрибуты у каждой сущности свои
+    assert construct(PipelineSchema, data).__pydantic_private__ == {"_statuses": None}
+
+
+def test_custom_fields_accessor_private_attribute():
+    data = {"id": 1, "custom_fields_values": [{"field_id": 5, "field_code": "PHONE", "values": [{"value": "+7"}]}]}
+    trusted, validated = construct(LeadSchema, data), LeadSchema.model_validate(data)
+    assert_same(trusted, validated)
+    assert trusted.cf.value(5) == validated.cf.value(5) == "+7"
+    assert trusted.cf.by_code("PHONE") == validated.cf.by_code("PHONE")
+
+
+class WithPostInit(BaseModel):
+    id: Optional[int] = None
+    _seen: List[int] = PrivateAttr(default_factory=list)
+    _double: Optional[int] = PrivateAttr(default=None)
+
+    def model_post_init(self, context: Any):
+        self._double = (self.id or 0) * 2
+
+
+class WithMutableDefault(BaseModel):
+    tags: Union[List[str], None] = None
+    _cache: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+
+@pytest.mark.parametrize("schema_class", [WithPostInit, WithMutableDefault])
+def test_own_post_init_and_mutable_private_defaults(schema_class):
+    first, second = construct(schema_class, {"id": 4}), construct(schema_class, {"id": 4})
+    assert_same(first, schema_class.model_validate({"id": 4}))
+    # Изменяемые значения по умолчанию не общие между сущностями
+    private = next(name for name in schema_class.__private_attributes__ if name in ("_seen", "_cache"))
+    assert getattr(first, private) is not getattr(second, private)
+
+
+def test_parse_page_trusted_and_validated():
+    content = json.dumps({"_links": {}, "_embedded": {"leads": [sample_data(LeadSchema), {"id": 2}]}}).encode()
+    data, trusted = parse_page(content, "leads", LeadSchema, trusted=True)
+    _, validated = parse_page(content, "leads", LeadSchema)
+    assert data == {"_links": {}}
+    for left, right in zip(trusted, validated):
+        assert_same(left, right)
+
+
+def test_invalid_data_is_not_checked_in_trusted_mode():
+    with pytest.raises(ValidationError):
+        LeadSchema.model_validate({"id": "not a number"})
+    assert construct(LeadSchema, {"id": "not a number"}).id == "not a number"
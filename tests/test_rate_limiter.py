@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from conftest import BASE
+from py_amo import RateLimiter, RetryPolicy
+from py_amo.services import rate_limiter
+from py_amo.services.rate_limiter import parse_retry_after
+
+
+@pytest.fixture
+def session_kwargs(fake_time):
+    return {"rate_limiter": RateLimiter(rps=8), "retry_policy": RetryPolicy(jitter=False)}
+
+
+def acquire(limiter, times):
+    for _ in range(times):
+        limiter.acquire()
+
+
+def test_burst_then_steady_rate(fake_time):
+    limiter = RateLimiter(rps=4, burst=2)
+    acquire(limiter, 2)
+    assert fake_time.sleeps == []
+    acquire(limiter, 4)
+    assert fake_time.sleeps == pytest.approx([0.25] * 4)
+
+    # После простоя копится не больше burst токенов
+    fake_time.now += 100
+    fake_time.sleeps.clear()
+    acquire(limiter, 3)
+    assert fake_time.sleeps == pytest.approx([0.25])
+
+
+def test_rate_limited_halves_rate_down_to_min_rps(fake_time):
+    limiter = RateLimiter(rps=8, min_rps=1.5)
+    rates = []
+    for _ in range(4):
+        limiter.on_rate_limited()
+        rates.append(limiter.rate)
+    assert rates == [4, 2, 1.5, 1.5]
+
+
+def test_pause_after_rate_limited_then_one_request_at_new_rate(fake_time):
+    limiter = RateLimiter(rps=8)
+    limiter.on_rate_limited()
+    acquire(limiter, 3)
+    # Без Retry-After пауза - один интервал новой скорости, после нее ровно один запрос
+    assert fake_time.sleeps == pytest.approx([0.25, 0.25, 0.25])
+
+
+def test_retry_after_blocks_every_request(fake_time):
+    limiter = RateLimiter(rps=8)
+    limiter.on_rate_limited(5)
+    # Более короткий Retry-After не сокращает уже назначенную паузу
+    limiter.on_rate_limited(1)
+    assert limiter.rate == 2
+    acquire(limiter, 2)
+    assert fake_time.sleeps == pytest.approx([5, 0.5])
+
+
+def test_rate_recovers_by_step_each_interval(fake_time):
+    limiter = RateLimiter(rps=4, recovery_interval=10, recovery_step=1)
+    limiter.on_rate_limited(0)
+    rates = []
+    for elapsed in (9, 1, 5, 5, 10, 10):
+        fake_time.now += elapsed
+        limiter.acquire()
+        rates.append(limiter.rate)
+    assert rates == [2, 3, 3, 4, 4, 4]
+
+
+def test_async_acquire_does_not_block_thread(fake_time, monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "sleep", None)
+    limiter = RateLimiter(rps=2, burst=1)
+
+    async def acquire_three():
+        for _ in range(3):
+            await limiter.acquire_async()
+
+    asyncio.run(acquire_three())
+    assert fake_time.sleeps == pytest.approx([0.5, 0.5])
+
+
+def test_session_slows_down_on_429(client, amo, fake_time):
+    amo.put(1, BASE)
+    amo.fail(429, headers={"Retry-After": "3"})
+
+    assert [lead.id for lead in client.call("leads", "get_all")] == [1]
+    # Повтор ждет Retry-After, лимитер после паузы не добавляет своей
+    assert len(amo.queries) == 2
+    assert fake_time.sleeps == [3]
+    assert client.session.rate_limiter.rate == 4
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
@@ -0,0 +1,119 @@
+import random
+import time
+
+import httpx
+import pytest
+import requests
+
+from conftest import BASE
+from py_amo import RetryPolicy
+from py_amo.exceptions import RateLimitError, ServerError
+from py_amo.schemas import LeadSchema
+
+
+@pytest.fixture
+def session_kwargs(fake_time):
+    # Лимитер сессии создается уже с подмененным временем
+    return {}
+
+
+def use_policy(client, **kwargs):
+    kwargs.setdefault("jitter", False)
+    kwargs.setdefault("backoff_base", 1)
+    client.session.leads.retry_policy = RetryPolicy(**kwargs)
+
+
+def lead_ids(client):
+    return [lead.id for lead in client.call("leads", "get_all")]
+
+
+def test_transient_errors_are_retried_with_backoff(client, amo, fake_time):
+    use_policy(client, max_attempts=3)
+    amo.put(1, BASE)
+    amo.fail(502, times=2)
+    assert lead_ids(client) == [1]
+    assert fake_time.sleeps == [1, 2]
+
+
+def test_attempts_are_limited(client, amo, fake_time):
+    use_policy(client, max_attempts=3)
+    amo.fail(503, times=5)
+    with pytest.raises(ServerError):
+        lead_ids(client)
+    assert len(amo.queries) == 3
+    assert fake_time.sleeps == [1, 2]
+
+
+def test_deadline_stops_retries(client, amo, fake_time):
+    use_policy(client, max_attempts=10, deadline=2.5)
+    amo.fail(500, times=5)
+    with pytest.raises(ServerError):
+        lead_ids(client)
+    # Вторая пауза (2 с) вышла бы за deadline: 1 + 2 > 2.5
+    assert fake_time.sleeps == [1]
+    assert len(amo.queries) == 2
+
+
+def test_retry_after_takes_priority_over_backoff(client, amo, fake_time):
+    use_policy(client)
+    amo.put(1, BASE)
+    amo.fail(503, headers={"Retry-After": "7"})
+    assert lead_ids(client) == [1]
+    assert fake_time.sleeps == [7]
+
+
+def test_post_is_not_retried(client, amo, fake_time):
+    use_policy(client)
+    amo.fail(502)
+    with pytest.raises(ServerError):
+        client.call("leads", "create", [LeadSchema(name="Новая")])
+    amo.fail(429, headers={"Retry-After": "3"})
+    with pytest.raises(RateLimitError):
+        client.call("leads", "create", [LeadSchema(name="Новая")])
+    assert len(amo.queries) == 2
+    # Лимитер все равно учитывает 429: следующий запрос ждет Retry-After
+    assert fake_time.sleeps == []
+    assert client.session.rate_limiter._blocked_until == fake_time.now + 3
+
+
+def test_connection_errors_are_retried_for_get_only(client, amo, fake_time):
+    use_policy(client)
+    error = httpx.ConnectError("connection refused") if client.is_async else requests.ConnectionError("refused")
+    failures = [error]
+
+    def drop_connection(amo, query):
+        if failures:
+            raise failures.pop()
+
+    amo.on_request = drop_connection
+    amo.put(1, BASE)
+    assert lead_ids(client) == [1]
+    assert fake_time.sleeps == [1]
+
+    failures.append(error)
+    with pytest.raises(type(error)):
+        client.call("leads", "create", [LeadSchema(name="Новая")])
+
+
+def test_only_safe_methods_are_retried():
+    policy = RetryPolicy(jitter=False, deadline=None)
+    assert policy.next_delay("get", 0, 0) == 0.5
+    assert policy.next_delay("PATCH", 1, 0) == 1
+    for method in ("POST", "DELETE", "PUT"):
+        assert policy.next_delay(method, 0, 0) is None
+    assert RetryPolicy(retry_methods=["post"]).next_delay("POST", 0, time.monotonic()) is not None
+    assert RetryPolicy(max_attempts=1).next_delay("GET", 0, time.monotonic()) is None
+
+
+def test_backoff_grows_up_to_max_and_jitter_stays_in_bounds():
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=4, jitter=False)
+    assert [policy.get_backoff(attempt) for attempt in range(6)] == [0.5, 1, 2, 4, 4, 4]
+
+    random.seed(3)
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=4)
+    for attempt in range(6):
+        delays = [policy.get_backoff(attempt) for _ in range(500)]
+        cap = min(4, 0.5 * 2 ** attempt)
+        assert all(0 <= delay <= cap for delay in delays)
+        # Задержки разбросаны по всему диапазону, а не прижаты к границе
+        assert min(delays) < cap * 0.1 and max(delays) > cap * 0.9
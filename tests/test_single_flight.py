@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from conftest import BASE
+from py_amo import RetryPolicy
+from py_amo.exceptions import ServerError
+from py_amo.services import single_flight
+from py_amo.services.single_flight import AsyncSingleFlight
+
+WAITERS = 4
+
+
+@pytest.fixture
+def session_kwargs():
+    return {"retry_policy": RetryPolicy(max_attempts=1)}
+
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """Сколько вызовов SingleFlight ждут чужой запрос"""
+    lock, count = threading.Lock(), [0]
+
+    class CountingFuture(Future):
+        def result(self, timeout=None):
+            with lock:
+                count[0] += 1
+            return super().result(timeout)
+
+    monkeypatch.setattr(single_flight, "Future", CountingFuture)
+    return lambda: count[0]
+
+
+def hold_until(waiting, expected):
+    """on_request: первый запрос отвечает только когда остальные вызовы встали в ожидание"""
+
+    def on_request(amo, query):
+        deadline = time.monotonic() + 5
+        while waiting() < expected:
+            assert time.monotonic() < deadline, "callers did not join the request in flight"
+            time.sleep(0.001)
+
+    return on_request
+
+
+def concurrent_get_all(session, count=WAITERS + 1):
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(session.leads.get_all) for _ in range(count)]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_identical_concurrent_gets_share_one_request(session, amo, waiting):
+    amo.put(1, BASE)
+    amo.on_request = hold_until(waiting, WAITERS)
+
+    results = concurrent_get_all(session)
+    assert len(amo.queries) == 1
+    assert all([lead.id for lead in result] == [1] for result in results)
+
+    # Завершенный вызов не кэшируется: следующий идет в API заново
+    amo.on_request = None
+    session.leads.get_all()
+    assert len(amo.queries) == 2
+
+
+def test_error_reaches_every_waiter(session, amo, waiting):
+    amo.on_request = hold_until(waiting, WAITERS)
+    amo.fail(500)
+    errors = concurrent_get_all(session)
+    assert len(amo.queries) == 1
+    assert all(isinstance(error, ServerError) for error in errors)
+    assert len({id(error) for error in errors}) == 1
+
+
+def test_different_params_are_not_merged(session, amo):
+    amo.put(1, BASE)
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(lambda page: session.leads.get_all(page=page), (1, 2)))
+    assert sorted(query["page"] for query in amo.queries) == ["1", "2"]
+
+
+def test_async_identical_gets_share_one_request(async_session, amo):
+    amo.put(1, BASE)
+
+    async def run():
+        return await asyncio.gather(*(async_session.leads.get_all() for _ in range(WAITERS + 1)))
+
+    results = asyncio.run(run())
+    assert len(amo.queries) == 1
+    assert all([lead.id for lead in result] == [1] for result in results)
+
+
+def test_async_error_reaches_every_waiter(async_session, amo):
+    amo.fail(500)
+
+    async def run():
+        return await asyncio.gather(*(async_session.leads.get_all() for _ in range(WAITERS + 1)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert len(amo.queries) == 1
+    assert all(isinstance(error, ServerError) for error in errors)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return "data"
+
+        cancelled = asyncio.ensure_future(flight.do("key", fetch))
+        waiter = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        result = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return result
+
+    assert asyncio.run(run()) == "data"
+    assert calls == [1]
+
+
+def test_call_survives_when_its_only_waiter_is_cancelled():
+    flight = AsyncSingleFlight()
+
+    async def run():
+        release, finished = asyncio.Event(), []
+
+        async def fetch():
+            await release.wait()
+            finished.append(1)
+            return "data"
+
+        only = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        only.cancel()
+        await asyncio.sleep(0)
+        # Новый вызов присоединяется к той же задаче, а не запускает вторую
+        joined = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        release.set()
+        assert await joined == "data"
+        await asyncio.sleep(0)
+        return finished, flight._calls
+
+    finished, calls = asyncio.run(run())
+    assert finished == [1] and calls == {}
@@ -0,0 +1,107 @@
+from conftest import BASE
+
+
+def ids(pages):
+    return [item["id"] for page in pages for item in page]
+
+
+def window_queries(amo, field="created_at"):
+    return [query for query in amo.queries if f"filter[{field}][to]" in query]
+
+
+def test_dense_windows_are_split_and_single_second_is_paged(client, amo, clock):
+    for lead_id in range(1, 21):
+        amo.put(lead_id, BASE + lead_id)
+    for lead_id in range(21, 29):
+        amo.put(lead_id, BASE + 500)
+
+    result = ids(client.sliced_pages(concurrency=2))
+
+    assert sorted(result) == list(range(1, 29))
+    assert len(result) == len(set(result))
+    # Окна дробились, пока не уместились в страницу
+    assert len(window_queries(amo)) > 3
+    # Секунду с 8 сделками делить некуда - она дочитана второй страницей
+    assert any(
+        query.get("filter[created_at][from]") == query["filter[created_at][to]"] == str(BASE + 500)
+        and query["page"] == "2"
+        for query in window_queries(amo)
+    )
+
+
+def test_windows_start_at_oldest_entity(client, amo, clock):
+    for lead_id in range(1, 10):
+        amo.put(lead_id, BASE + lead_id * 1000)
+
+    result = ids(client.sliced_pages(window=1000))
+
+    assert sorted(result) == list(range(1, 10))
+    assert amo.queries[0] == {"order[created_at]": "asc", "page": "1", "limit": "1"}
+    # До самой ранней сделки - одно окно, а не окна по 1000 секунд от 1970 года
+    before_floor = [query for query in window_queries(amo) if int(query["filter[created_at][to]"]) < BASE + 1000]
+    assert len(before_floor) == 1
+    assert "filter[created_at][from]" not in before_floor[0]
+    # И окна от нее до момента запуска: [BASE + 1000, BASE + 10000] по 1000 секунд
+    assert len(window_queries(amo)) == 1 + 10
+
+
+def test_from_date_skips_oldest_lookup(client, amo, clock):
+    for lead_id in range(1, 11):
+        amo.put(lead_id, BASE + lead_id)
+
+    result = ids(client.sliced_pages(from_date=BASE + 6, to_date=BASE + 20))
+
+    assert sorted(result) == [6, 7, 8, 9, 10]
+    assert all("order[created_at]" not in query for query in amo.queries)
+
+
+def test_entities_repeated_by_child_windows_are_yielded_once(client, amo, clock):
+    for lead_id in range(1, 41):
+        amo.put(lead_id, BASE + lead_id)
+
+    result = ids(client.sliced_pages(concurrency=1, splits=2))
+
+    assert sorted(result) == list(range(1, 41))
+    # Первая страница родительского окна и его частей отдает одни и те же сделки
+    assert len(amo.served) > len(amo.leads) + 1
+    assert len(result) == len(set(result))
+
+
+def test_updated_at_catch_up_returns_entities_moved_during_export(client, amo, clock):
+    for lead_id in range(1, 21):
+        amo.put(lead_id, BASE + lead_id)
+    clock.now = snapshot_end = BASE + 30
+
+    def update_during_export(amo, query):
+        # Запросы: самая ранняя сделка, окно до нее, первое окно (сделки 1-5), затем следующее окно
+        if len(amo.queries) == 4:
+            clock.now = snapshot_end + 10
+            amo.leads[20]["updated_at"] = snapshot_end + 5  # Еще не прочитана: ушла из своего окна
+            amo.leads[1]["updated_at"] = snapshot_end + 5  # Уже отдана: в догоняющем окне - повтор
+
+    amo.on_request = update_during_export
+    result = ids(client.sliced_pages(field="updated_at", window=5, concurrency=1))
+
+    assert sorted(result) == list(range(1, 21))
+    assert len(result) == len(set(result))
+    catch_up = [query for query in amo.queries if query.get("filter[updated_at][from]") == str(snapshot_end + 1)]
+    assert len(catch_up) == 1
+    assert catch_up[0]["filter[updated_at][to]"] == str(snapshot_end + 10)
+
+
+def test_no_catch_up_with_fixed_to_date(client, amo, clock):
+    for lead_id in range(1, 21):
+        amo.put(lead_id, BASE + lead_id)
+    to_date = BASE + 30
+
+    def update_during_export(amo, query):
+        if len(amo.queries) == 4:
+            clock.now += 100
+            amo.leads[20]["updated_at"] = clock.now
+
+    amo.on_request = update_during_export
+    result = ids(client.sliced_pages(field="updated_at", to_date=to_date, window=5, concurrency=1))
+
+    # Граница to_date задана явно: сделка, измененная после нее, в выгрузку не входит
+    assert sorted(result) == list(range(1, 20))
+    assert all(int(query["filter[updated_at][to]"]) <= to_date for query in window_queries(amo, "updated_at"))
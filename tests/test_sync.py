@@ -0,0 +1,108 @@
+import pytest
+
+from conftest import BASE
+from py_amo.services.sync import CursorStore, FileCursorStore, MemoryCursorStore, SQLiteCursorStore
+
+KEY = "test:leads"
+
+
+def from_filters(amo):
+    return [query.get("filter[updated_at][from]") for query in amo.queries]
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def make_store(request, tmp_path):
+    """Новый экземпляр хранилища над теми же данными - как у следующего запуска процесса"""
+    if request.param == "memory":
+        store = MemoryCursorStore()
+        return lambda: store
+    if request.param == "file":
+        return lambda: FileCursorStore(str(tmp_path / "cursors.json"))
+    return lambda: SQLiteCursorStore(str(tmp_path / "cursors.db"))
+
+
+def test_cursor_persists_across_incremental_runs(client, amo, make_store):
+    for lead_id in range(1, 13):
+        amo.put(lead_id, BASE + lead_id)
+
+    assert client.changes(make_store()) == list(range(1, 13))
+    # Первый запуск - вся коллекция, дальше каждая страница запрашивается заново от сдвинутой отметки
+    assert from_filters(amo)[0] is None
+    assert all(query["page"] == "1" and query["order[updated_at]"] == "asc" for query in amo.queries)
+    cursor = make_store().load(KEY)
+    assert (cursor.updated_at, cursor.ids) == (BASE + 12, {12})
+
+    amo.leads[3]["updated_at"] = BASE + 20
+    amo.put(13, BASE + 15, BASE + 20)
+    amo.queries.clear()
+    assert client.changes(make_store()) == [3, 13]
+    assert from_filters(amo)[0] == str(BASE + 12)
+
+    amo.queries.clear()
+    assert client.changes(make_store()) == []
+    assert from_filters(amo) == [str(BASE + 20)]
+    cursor = make_store().load(KEY)
+    assert (cursor.updated_at, cursor.ids) == (BASE + 20, {3, 13})
+
+
+def test_entities_at_cursor_timestamp_are_not_repeated(client, amo):
+    store = MemoryCursorStore()
+    for lead_id in range(1, 4):
+        amo.put(lead_id, BASE + 100)
+    for lead_id in range(4, 6):
+        amo.put(lead_id, BASE + 200)
+    assert client.changes(store) == [1, 2, 3, 4, 5]
+
+    # Фильтр from включает границу: сделки 4 и 5 придут снова и должны быть пропущены,
+    # а новая сделка с тем же updated_at - отдана
+    amo.put(6, BASE + 150, BASE + 200)
+    amo.queries.clear()
+    assert client.changes(store) == [6]
+    assert from_filters(amo) == [str(BASE + 200)]
+    assert store.load(KEY).ids == {4, 5, 6}
+
+
+def test_entity_updated_after_cursor_second_is_returned(client, amo):
+    store = MemoryCursorStore()
+    amo.put(1, BASE + 100)
+    amo.put(2, BASE + 100)
+    assert client.changes(store) == [1, 2]
+
+    amo.leads[1]["updated_at"] = BASE + 101
+    assert client.changes(store) == [1]
+    cursor = store.load(KEY)
+    assert (cursor.updated_at, cursor.ids) == (BASE + 101, {1})
+
+
+def test_full_page_with_one_timestamp_moves_to_next_page(client, amo):
+    store = MemoryCursorStore()
+    for lead_id in range(1, 13):
+        amo.put(lead_id, BASE + 100)
+
+    assert client.changes(store) == list(range(1, 13))
+    # Первая страница ставит отметку и запрашивается заново от нее. Дальше отметка не сдвигается,
+    # поэтому страницы идут по номерам с тем же фильтром
+    assert [query["page"] for query in amo.queries] == ["1", "1", "2", "3"]
+    assert from_filters(amo) == [None] + [str(BASE + 100)] * 3
+
+
+def test_interrupted_run_resumes_from_last_saved_page(client, amo):
+    store = MemoryCursorStore()
+    for lead_id in range(1, 13):
+        amo.put(lead_id, BASE + lead_id)
+
+    # Падение на второй странице: сохранена отметка после первой
+    assert client.changes(store, limit=7) == list(range(1, 8))
+    assert store.load(KEY).updated_at == BASE + 5
+
+    assert client.changes(store) == list(range(6, 13))
+    assert client.changes(store) == []
+
+
+def test_store_must_implement_load_and_save():
+    class LoadOnly(CursorStore):
+        def load(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="save"):
+        LoadOnly()